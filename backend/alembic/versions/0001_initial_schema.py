@@ -0,0 +1,101 @@
+"""initial schema
+
+Baseline matching the tables previously created by ``Base.metadata.create_all``.
+Tables that already exist are left untouched so databases created before
+migrations were introduced can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "employees" not in existing:
+        op.create_table(
+            "employees",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("role", sa.String(100), nullable=False),
+            sa.Column("department", sa.String(100), nullable=True),
+            sa.Column("avatar", sa.String(500), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_employees_id", "employees", ["id"])
+        op.create_index("ix_employees_name", "employees", ["name"])
+
+    if "training_columns" not in existing:
+        op.create_table(
+            "training_columns",
+            sa.Column("id", sa.String(50), primary_key=True),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("category", sa.String(100), nullable=True),
+            sa.Column("target_level", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("sort_order", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_training_columns_id", "training_columns", ["id"])
+
+    if "scores" not in existing:
+        op.create_table(
+            "scores",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id"), nullable=False),
+            sa.Column("column_id", sa.String(50), sa.ForeignKey("training_columns.id"), nullable=False),
+            sa.Column("level", sa.Integer(), nullable=False),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("updated_by", sa.String(100), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index("ix_scores_id", "scores", ["id"])
+
+    if "settings" not in existing:
+        op.create_table(
+            "settings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("key", sa.String(100), nullable=False),
+            sa.Column("value", sa.JSON(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index("ix_settings_id", "settings", ["id"])
+        op.create_index("ix_settings_key", "settings", ["key"], unique=True)
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(50), nullable=False),
+            sa.Column("role", sa.String(20), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("users")
+    op.drop_table("settings")
+    op.drop_table("scores")
+    op.drop_table("training_columns")
+    op.drop_table("employees")
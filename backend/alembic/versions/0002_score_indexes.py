@@ -0,0 +1,49 @@
+"""score indexes
+
+Deduplicates (employee_id, column_id) pairs, then adds the unique index used
+for upserts, a covering index for per-column lookups and an updated_at index
+for recent-activity queries.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-20 09:30:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.dedupe import dedupe_scores
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Under "alembic" so the INFO level configured in alembic.ini applies
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    removed = dedupe_scores(op.get_bind())
+    if removed:
+        logger.info("Removed %s duplicate score rows", removed)
+
+    op.create_index(
+        "uq_scores_employee_column", "scores", ["employee_id", "column_id"],
+        unique=True, if_not_exists=True,
+    )
+    op.create_index(
+        "ix_scores_column_level", "scores", ["column_id", "level", "employee_id"],
+        if_not_exists=True,
+    )
+    op.create_index("ix_scores_updated_at", "scores", ["updated_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scores_updated_at", table_name="scores")
+    op.drop_index("ix_scores_column_level", table_name="scores")
+    op.drop_index("uq_scores_employee_column", table_name="scores")
@@ -0,0 +1,33 @@
+"""version counters
+
+Adds the version_counters table used to detect settings changes across
+worker processes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "version_counters",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("value", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("version_counters")
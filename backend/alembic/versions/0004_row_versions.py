@@ -0,0 +1,51 @@
+"""row versions
+
+Adds a data version column to employees, training columns, scores and
+settings, plus the score_tombstones table, for delta sync.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-22 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ("employees", "training_columns", "scores")
+
+
+def upgrade() -> None:
+    for table_name in VERSIONED_TABLES:
+        op.add_column(table_name, sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+        op.create_index(f"ix_{table_name}_version", table_name, ["version"])
+    op.add_column("settings", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "score_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("column_id", sa.String(50), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_score_tombstones_id", "score_tombstones", ["id"])
+    op.create_index("ix_score_tombstones_version", "score_tombstones", ["version"])
+
+
+def downgrade() -> None:
+    op.drop_table("score_tombstones")
+    with op.batch_alter_table("settings") as batch_op:
+        batch_op.drop_column("version")
+    for table_name in reversed(VERSIONED_TABLES):
+        op.drop_index(f"ix_{table_name}_version", table_name=table_name)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column("version")
@@ -0,0 +1,38 @@
+"""employee total score
+
+Adds the denormalized employees.total_score column with keyset pagination
+indexes, and backfills it from existing scores.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-23 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("employees", sa.Column("total_score", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        "UPDATE employees SET total_score = "
+        "(SELECT COALESCE(SUM(scores.level), 0) FROM scores WHERE scores.employee_id = employees.id)"
+    )
+    op.create_index("ix_employees_name_id", "employees", ["name", "id"])
+    op.create_index("ix_employees_total_score_id", "employees", ["total_score", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_employees_total_score_id", table_name="employees")
+    op.drop_index("ix_employees_name_id", table_name="employees")
+    with op.batch_alter_table("employees") as batch_op:
+        batch_op.drop_column("total_score")
@@ -0,0 +1,60 @@
+"""score summaries
+
+Adds the per-employee and per-column score summary tables and backfills
+them from existing scores.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-24 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEVELS = range(0, 6)
+COUNT_COLUMNS = ["total_scores"] + [f"level_{level}" for level in LEVELS] + ["completed"]
+
+
+def _count_columns():
+    return [sa.Column(name, sa.Integer(), nullable=False) for name in COUNT_COLUMNS]
+
+
+def _backfill(table_name: str, key: str) -> None:
+    counts = ", ".join(
+        ["COUNT(*)"]
+        + [f"SUM(CASE WHEN level = {level} THEN 1 ELSE 0 END)" for level in LEVELS]
+        + ["SUM(CASE WHEN level = 2 THEN 1 ELSE 0 END)"]
+    )
+    op.execute(
+        f"INSERT INTO {table_name} ({key}, {', '.join(COUNT_COLUMNS)}) "
+        f"SELECT {key}, {counts} FROM scores GROUP BY {key}"
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "employee_score_summaries",
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id"), primary_key=True),
+        *_count_columns(),
+    )
+    op.create_table(
+        "column_score_summaries",
+        sa.Column("column_id", sa.String(length=50), sa.ForeignKey("training_columns.id"), primary_key=True),
+        *_count_columns(),
+    )
+    _backfill("employee_score_summaries", "employee_id")
+    _backfill("column_score_summaries", "column_id")
+
+
+def downgrade() -> None:
+    op.drop_table("column_score_summaries")
+    op.drop_table("employee_score_summaries")
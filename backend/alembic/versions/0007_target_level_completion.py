@@ -0,0 +1,41 @@
+"""target level completion
+
+Recounts the summary ``completed`` columns against each training column's
+target level instead of the fixed level 2.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-10-25 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recount(condition: str) -> None:
+    op.execute(
+        "UPDATE employee_score_summaries SET completed = ("
+        "SELECT COUNT(*) FROM scores JOIN training_columns ON training_columns.id = scores.column_id "
+        f"WHERE scores.employee_id = employee_score_summaries.employee_id AND {condition})"
+    )
+    op.execute(
+        "UPDATE column_score_summaries SET completed = ("
+        "SELECT COUNT(*) FROM scores JOIN training_columns ON training_columns.id = scores.column_id "
+        f"WHERE scores.column_id = column_score_summaries.column_id AND {condition})"
+    )
+
+
+def upgrade() -> None:
+    _recount("scores.level >= COALESCE(training_columns.target_level, 2)")
+
+
+def downgrade() -> None:
+    _recount("scores.level = 2")
@@ -0,0 +1,65 @@
+"""score history
+
+Adds the append-only score_events log and score snapshots for point-in-time
+matrix queries. Existing scores are captured by a baseline snapshot on the
+next startup.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-10-28 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("column_id", sa.String(50), nullable=False),
+        sa.Column("level", sa.Integer(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("updated_by", sa.String(100), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_score_events_employee_id", "score_events", ["employee_id"])
+    op.create_index("ix_score_events_recorded_at", "score_events", ["recorded_at"])
+
+    op.create_table(
+        "score_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("taken_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_event_id", sa.Integer(), nullable=False),
+        sa.Column("score_count", sa.Integer(), nullable=False),
+        sa.Column("baseline", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_score_snapshots_taken_at", "score_snapshots", ["taken_at"])
+
+    op.create_table(
+        "score_snapshot_rows",
+        sa.Column("snapshot_id", sa.Integer(), sa.ForeignKey("score_snapshots.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), primary_key=True),
+        sa.Column("column_id", sa.String(50), primary_key=True),
+        sa.Column("level", sa.Integer(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("updated_by", sa.String(100), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("score_snapshot_rows")
+    op.drop_table("score_snapshots")
+    op.drop_table("score_events")
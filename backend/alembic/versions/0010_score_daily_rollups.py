@@ -0,0 +1,37 @@
+"""score daily rollups
+
+Adds score_daily_rollups, the per-day cell count deltas behind completion
+trends. Existing data is backfilled on the next startup (or with
+``python -m app.cli backfill-rollups``).
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-10-29 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_daily_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("department", sa.String(100), primary_key=True),
+        sa.Column("column_id", sa.String(50), primary_key=True),
+        sa.Column("level", sa.Integer(), primary_key=True),
+        sa.Column("delta", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("score_daily_rollups")
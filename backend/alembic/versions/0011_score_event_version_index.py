@@ -0,0 +1,28 @@
+"""score event version index
+
+Indexes score_events.version so the skill search index can catch up on the
+writes made since the data version it reflects.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-10-30 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_score_events_version", "score_events", ["version"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_score_events_version", table_name="score_events")
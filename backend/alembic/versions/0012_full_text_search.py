@@ -0,0 +1,31 @@
+"""full text search
+
+Adds FTS5 tables and sync triggers over employees and score notes on SQLite,
+or GIN tsvector expression indexes on PostgreSQL (see app/core/search.py).
+Existing rows are indexed during the upgrade.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-10-31 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
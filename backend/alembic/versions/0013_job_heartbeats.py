@@ -0,0 +1,38 @@
+"""job heartbeats
+
+Adds the owning process and heartbeat of each job, so only jobs whose worker
+stopped reporting are failed, and a unique key that allows one active job per
+dedupe key across all worker processes.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2025-11-01 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("owner", sa.String(100), nullable=True))
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column("active_key", sa.String(64), nullable=True))
+        batch_op.create_index("ix_jobs_active_key", ["active_key"], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_index("ix_jobs_active_key")
+        batch_op.drop_column("active_key")
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("owner")
@@ -6,19 +6,22 @@ Handles CRUD operations for training modules/skills
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..core.database import get_db
+from ..core.database import get_db, get_read_db
+from ..core.versions import DATA_VERSION, bump_version
+from ..core.aggregates import apply_target_change
+from ..core.events import event_hub, column_event
 from ..core.models import TrainingColumn
 from ..core.schemas import TrainingColumn as TrainingColumnSchema, TrainingColumnCreate, TrainingColumnUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TrainingColumnSchema])
-async def get_columns(
+def get_columns(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     category: Optional[str] = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of training columns with optional filtering"""
     query = db.query(TrainingColumn)
@@ -34,7 +37,7 @@ async def get_columns(
     return columns
 
 @router.get("/{column_id}", response_model=TrainingColumnSchema)
-async def get_column(column_id: str, db: Session = Depends(get_db)):
+def get_column(column_id: str, db: Session = Depends(get_read_db)):
     """Get a specific training column by ID"""
     column = db.query(TrainingColumn).filter(TrainingColumn.id == column_id).first()
     if not column:
@@ -42,7 +45,7 @@ async def get_column(column_id: str, db: Session = Depends(get_db)):
     return column
 
 @router.post("/", response_model=TrainingColumnSchema)
-async def create_column(column: TrainingColumnCreate, db: Session = Depends(get_db)):
+def create_column(column: TrainingColumnCreate, db: Session = Depends(get_db)):
     """Create a new training column"""
     # Generate ID if not provided
     if not column.id:
@@ -64,12 +67,14 @@ async def create_column(column: TrainingColumnCreate, db: Session = Depends(get_
     
     db_column = TrainingColumn(**column.dict())
     db.add(db_column)
+    db_column.version = bump_version(db, DATA_VERSION)
     db.commit()
     db.refresh(db_column)
+    event_hub.publish(column_event(db_column.id, db_column.version))
     return db_column
 
 @router.put("/{column_id}", response_model=TrainingColumnSchema)
-async def update_column(
+def update_column(
     column_id: str, 
     column_update: TrainingColumnUpdate, 
     db: Session = Depends(get_db)
@@ -80,16 +85,20 @@ async def update_column(
         raise HTTPException(status_code=404, detail="Training column not found")
     
     # Update only provided fields
+    old_target = db_column.target_level
     update_data = column_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_column, field, value)
     
+    db_column.version = bump_version(db, DATA_VERSION)
+    apply_target_change(db, column_id, old_target, db_column.target_level)
     db.commit()
     db.refresh(db_column)
+    event_hub.publish(column_event(db_column.id, db_column.version))
     return db_column
 
 @router.delete("/{column_id}")
-async def delete_column(column_id: str, db: Session = Depends(get_db)):
+def delete_column(column_id: str, db: Session = Depends(get_db)):
     """Delete a training column (soft delete by setting is_active=False)"""
     db_column = db.query(TrainingColumn).filter(TrainingColumn.id == column_id).first()
     if not db_column:
@@ -97,11 +106,14 @@ async def delete_column(column_id: str, db: Session = Depends(get_db)):
     
     # Soft delete
     db_column.is_active = False
+    version = bump_version(db, DATA_VERSION)
+    db_column.version = version
     db.commit()
+    event_hub.publish(column_event(column_id, version))
     return {"message": "Training column deleted successfully"}
 
 @router.get("/categories/list")
-async def get_categories(db: Session = Depends(get_db)):
+def get_categories(db: Session = Depends(get_read_db)):
     """Get list of all training categories"""
     categories = db.query(TrainingColumn.category).filter(
         TrainingColumn.category.isnot(None),
@@ -110,7 +122,7 @@ async def get_categories(db: Session = Depends(get_db)):
     return [cat[0] for cat in categories]
 
 @router.put("/{column_id}/reorder")
-async def reorder_column(
+def reorder_column(
     column_id: str, 
     new_order: int, 
     db: Session = Depends(get_db)
@@ -121,5 +133,8 @@ async def reorder_column(
         raise HTTPException(status_code=404, detail="Training column not found")
     
     db_column.sort_order = new_order
+    version = bump_version(db, DATA_VERSION)
+    db_column.version = version
     db.commit()
+    event_hub.publish(column_event(column_id, version))
     return {"message": "Column order updated successfully"}
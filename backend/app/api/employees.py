@@ -6,20 +6,28 @@ Handles CRUD operations for employees
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..core.database import get_db
-from ..core.models import Employee
-from ..core.schemas import Employee as EmployeeSchema, EmployeeCreate, EmployeeUpdate
+from ..core.database import get_db, get_read_db
+from ..core.versions import DATA_VERSION, bump_version
+from ..core.events import event_hub, employee_event
+from ..core.models import Employee, TrainingColumn
+from ..core.rollups import rollup_department_change
+from ..core.schemas import (
+    Employee as EmployeeSchema, EmployeeCreate, EmployeeUpdate, SimilarEmployee, SkillSearchRequest,
+    SkillSearchResult, TrainingRecommendation
+)
+from ..core.similarity import skill_matrix
+from ..core.skill_index import condition_columns, skill_index
 
 router = APIRouter()
 
 @router.get("/", response_model=List[EmployeeSchema])
-async def get_employees(
+def get_employees(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     department: Optional[str] = None,
     role: Optional[str] = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of employees with optional filtering"""
     query = db.query(Employee)
@@ -36,16 +44,78 @@ async def get_employees(
     employees = query.offset(skip).limit(limit).all()
     return employees
 
+@router.post("/search", response_model=SkillSearchResult)
+def search_employees(search: SkillSearchRequest, db: Session = Depends(get_read_db)):
+    """Find employees by skill levels, e.g. Python >= 2 AND Leadership >= 1, from the in-memory skill index"""
+    columns = condition_columns(search.query)
+    known = {column_id for (column_id,) in db.query(TrainingColumn.id).filter(TrainingColumn.id.in_(columns))}
+    if columns - known:
+        raise HTTPException(status_code=400, detail=f"Unknown training columns: {', '.join(sorted(columns - known))}")
+    
+    try:
+        total, employee_ids = skill_index.search(
+            db, search.query, department=search.department, role=search.role,
+            include_inactive=search.include_inactive, skip=search.skip, limit=search.limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    employees = db.query(Employee).filter(Employee.id.in_(employee_ids)).order_by(Employee.id).all() if employee_ids else []
+    return SkillSearchResult(total=total, employees=employees)
+
 @router.get("/{employee_id}", response_model=EmployeeSchema)
-async def get_employee(employee_id: int, db: Session = Depends(get_db)):
+def get_employee(employee_id: int, db: Session = Depends(get_read_db)):
     """Get a specific employee by ID"""
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
+@router.get("/{employee_id}/similar", response_model=List[SimilarEmployee])
+def get_similar_employees(
+    employee_id: int,
+    k: int = Query(10, ge=1, le=100),
+    # The skill matrix is one large copy per process, kept current from the primary (see SkillMatrix)
+    db: Session = Depends(get_db)
+):
+    """Get the active employees whose skill profiles are closest to this employee's"""
+    try:
+        neighbours = skill_matrix.similar(db, [employee_id], k=k)[employee_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    employees = {
+        employee.id: employee
+        for employee in db.query(Employee).filter(Employee.id.in_([n.employee_id for n in neighbours]))
+    } if neighbours else {}
+    return [
+        SimilarEmployee(employee=employees[n.employee_id], similarity=n.similarity)
+        for n in neighbours if n.employee_id in employees
+    ]
+
+@router.get("/{employee_id}/recommendations", response_model=List[TrainingRecommendation])
+def get_training_recommendations(
+    employee_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Get the training columns this employee should work on next, based on what similar employees have completed"""
+    try:
+        recommendations = skill_matrix.recommend(db, [employee_id], limit=limit)[employee_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    columns = {
+        column.id: column
+        for column in db.query(TrainingColumn).filter(TrainingColumn.id.in_([r.column_id for r in recommendations]))
+    } if recommendations else {}
+    return [
+        TrainingRecommendation(title=columns[r.column_id].title, category=columns[r.column_id].category, **r._asdict())
+        for r in recommendations if r.column_id in columns
+    ]
+
 @router.post("/", response_model=EmployeeSchema)
-async def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
+def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     """Create a new employee"""
     # Check if employee with same name already exists
     existing = db.query(Employee).filter(Employee.name == employee.name).first()
@@ -54,12 +124,14 @@ async def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db
     
     db_employee = Employee(**employee.dict())
     db.add(db_employee)
+    db_employee.version = bump_version(db, DATA_VERSION)
     db.commit()
     db.refresh(db_employee)
+    event_hub.publish(employee_event(db_employee.id, db_employee.version))
     return db_employee
 
 @router.put("/{employee_id}", response_model=EmployeeSchema)
-async def update_employee(
+def update_employee(
     employee_id: int, 
     employee_update: EmployeeUpdate, 
     db: Session = Depends(get_db)
@@ -71,15 +143,27 @@ async def update_employee(
     
     # Update only provided fields
     update_data = employee_update.dict(exclude_unset=True)
+    # Names are unique (the importer matches employees by name)
+    if update_data.get("name") not in (None, db_employee.name):
+        existing = db.query(Employee).filter(Employee.name == update_data["name"], Employee.id != employee_id).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="Employee with this name already exists")
+    old_department = db_employee.department
     for field, value in update_data.items():
         setattr(db_employee, field, value)
     
+    # Trend rollups count cells per department
+    if "department" in update_data:
+        rollup_department_change(db, employee_id, old_department, db_employee.department)
+    
+    db_employee.version = bump_version(db, DATA_VERSION)
     db.commit()
     db.refresh(db_employee)
+    event_hub.publish(employee_event(db_employee.id, db_employee.version))
     return db_employee
 
 @router.delete("/{employee_id}")
-async def delete_employee(employee_id: int, db: Session = Depends(get_db)):
+def delete_employee(employee_id: int, db: Session = Depends(get_db)):
     """Delete an employee (soft delete by setting is_active=False)"""
     db_employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if not db_employee:
@@ -87,11 +171,14 @@ async def delete_employee(employee_id: int, db: Session = Depends(get_db)):
     
     # Soft delete
     db_employee.is_active = False
+    version = bump_version(db, DATA_VERSION)
+    db_employee.version = version
     db.commit()
+    event_hub.publish(employee_event(employee_id, version))
     return {"message": "Employee deleted successfully"}
 
 @router.get("/departments/list")
-async def get_departments(db: Session = Depends(get_db)):
+def get_departments(db: Session = Depends(get_read_db)):
     """Get list of all departments"""
     departments = db.query(Employee.department).filter(
         Employee.department.isnot(None),
@@ -100,7 +187,7 @@ async def get_departments(db: Session = Depends(get_db)):
     return [dept[0] for dept in departments]
 
 @router.get("/roles/list")
-async def get_roles(db: Session = Depends(get_db)):
+def get_roles(db: Session = Depends(get_read_db)):
     """Get list of all roles"""
     roles = db.query(Employee.role).filter(
         Employee.is_active == True
@@ -0,0 +1,113 @@
+"""
+Jobs API endpoints
+Starts background exports and imports, reports their status and serves finished artifacts
+"""
+
+import hashlib
+import os
+import uuid
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+from ..core.database import get_db
+from ..core.models import Job
+from ..core.schemas import ExportFormat, ExportJobRequest, JobSchema
+from ..core.jobs import SUCCEEDED, JobQueueFull, job_runner, register_job_handler
+from ..core.importer import XLSX_CONTENT_TYPE, MatrixImporter, iter_csv_rows, iter_xlsx_rows
+from .matrix import build_matrix, iter_matrix_csv, matrix_csv_source
+
+router = APIRouter()
+
+EXPORT_JOB_KINDS = {ExportFormat.CSV: "matrix_export_csv", ExportFormat.JSON: "matrix_export_json"}
+IMPORT_JOB_KIND = "matrix_import"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _export_csv(db: Session, params: Dict[str, Any], output_path: str, **_) -> Dict[str, Any]:
+    with open(output_path, "wb") as output:
+        for chunk in iter_matrix_csv(*matrix_csv_source(db, **params)):
+            output.write(chunk)
+    return {"bytes": os.path.getsize(output_path)}
+
+def _export_json(db: Session, params: Dict[str, Any], output_path: str, **_) -> Dict[str, Any]:
+    matrix_data = build_matrix(db, **params)
+    with open(output_path, "w", encoding="utf-8") as output:
+        output.write(matrix_data.json())
+    return {
+        "bytes": os.path.getsize(output_path),
+        "employees": len(matrix_data.employees),
+        "scores": len(matrix_data.scores),
+    }
+
+def _import_matrix(db: Session, params: Dict[str, Any], input_path: str, progress, **_) -> Dict[str, Any]:
+    importer = MatrixImporter(db, updated_by=params.get("updated_by"), progress=lambda result: progress(result.dict()))
+    with open(input_path, "rb") as stream:
+        rows = iter_xlsx_rows(stream) if params["format"] == "xlsx" else iter_csv_rows(stream)
+        return importer.run(rows).dict()
+
+register_job_handler(EXPORT_JOB_KINDS[ExportFormat.CSV], _export_csv, suffix=".csv", media_type="text/csv")
+register_job_handler(EXPORT_JOB_KINDS[ExportFormat.JSON], _export_json, suffix=".json", media_type="application/json")
+register_job_handler(IMPORT_JOB_KIND, _import_matrix)
+
+def _job_response(job: Job) -> JobSchema:
+    response = JobSchema.from_orm(job)
+    if job.status == SUCCEEDED and job.artifact_path:
+        response.download_url = f"/api/jobs/{job.id}/download"
+    return response
+
+def _submit(db: Session, kind: str, params: Dict[str, Any], input_path: Optional[str] = None) -> JobSchema:
+    try:
+        job = job_runner.submit(db, kind, params, input_path=input_path)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return _job_response(job)
+
+@router.post("/exports", response_model=JobSchema, status_code=202)
+def start_export(payload: ExportJobRequest, db: Session = Depends(get_db)):
+    """Start (or join an identical) matrix export; poll the job, then download the artifact"""
+    params = {"department": payload.department, "role": payload.role}
+    return _submit(db, EXPORT_JOB_KINDS[payload.format], params)
+
+@router.post("/imports", response_model=JobSchema, status_code=202)
+def start_import(
+    file: UploadFile = File(...),
+    updated_by: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """Start a matrix import (same file formats as POST /api/matrix/import)"""
+    filename = (file.filename or "").lower()
+    file_format = "xlsx" if filename.endswith(".xlsx") or file.content_type == XLSX_CONTENT_TYPE else "csv"
+    
+    # The upload is only valid for this request, so copy it where the job can read it
+    os.makedirs(job_runner.artifact_dir, exist_ok=True)
+    input_path = os.path.join(job_runner.artifact_dir, f"{uuid.uuid4().hex}.upload")
+    digest = hashlib.sha256()
+    with open(input_path, "wb") as output:
+        while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            output.write(chunk)
+    
+    params = {"format": file_format, "sha256": digest.hexdigest(), "updated_by": updated_by}
+    return _submit(db, IMPORT_JOB_KIND, params, input_path=input_path)
+
+@router.get("/{job_id}", response_model=JobSchema)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    """Get the status, progress and result of a job"""
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@router.get("/{job_id}/download")
+def download_job_artifact(job_id: str, db: Session = Depends(get_db)):
+    """Download the artifact of a finished export job"""
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != SUCCEEDED or not job.artifact_path:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} and has no artifact to download")
+    if not os.path.exists(job.artifact_path):
+        raise HTTPException(status_code=410, detail="The artifact has expired")
+    
+    extension = os.path.splitext(job.artifact_path)[1]
+    return FileResponse(job.artifact_path, media_type=job.media_type, filename=f"matrix_export{extension}")
@@ -0,0 +1,46 @@
+"""
+Live updates API
+WebSocket channel that pushes matrix change events to collaborators
+"""
+
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from ..core.events import event_hub
+
+router = APIRouter()
+
+@router.websocket("/ws")
+async def matrix_updates(websocket: WebSocket):
+    """
+    Stream matrix change events as JSON arrays.
+
+    Each message is a batch of events (score, employee, column, settings,
+    bulk). A ``resync`` event means events were dropped because the client
+    fell behind; it should fetch /api/matrix/changes from its last version.
+    Idle subscribers cost no database work.
+    """
+    await websocket.accept()
+    subscriber = event_hub.subscribe()
+    # Clients never need to send; receiving only detects disconnects
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            batch = asyncio.ensure_future(subscriber.next_batch())
+            done, _ = await asyncio.wait({batch, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                batch.cancel()
+                break
+            await websocket.send_json(batch.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        event_hub.unsubscribe(subscriber)
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
@@ -3,162 +3,466 @@ Matrix API endpoints
 Provides complete matrix data and analytics
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
-from ..core.database import get_db
-from ..core.models import Employee, TrainingColumn, Score, Settings
-from ..core.schemas import MatrixData, MatrixCell, AnalyticsData, SkillDistribution
+from ..core.database import get_db, get_read_db
+from ..core.models import Employee, TrainingColumn, Score, ScoreTombstone, Settings
+from ..core.schemas import (
+    MatrixData, MatrixCell, MatrixChanges, MatrixPage, MatrixSort, ScoreKey, AnalyticsData, SkillDistribution,
+    MatrixImportResult, CompletionTrend, TrendGranularity, TrendGroupBy
+)
+from ..core.settings_cache import SETTINGS_KEY, get_app_settings, get_stored_settings
+from ..core.versions import DATA_VERSION, get_version
+from ..core.etag import check_not_modified, cache_headers
+from ..core.completion import completed_expr, completion_stats
+from ..core.importer import XLSX_CONTENT_TYPE, MatrixImporter, iter_csv_rows, iter_xlsx_rows
+from ..core.history import HistoryUnavailable, as_utc, scores_as_of
+from ..core.rollups import completion_trend, rollup_day
 
 router = APIRouter()
 
+# Rows fetched per round trip and bytes buffered per chunk when streaming exports
+EXPORT_BATCH_SIZE = 2000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Columnar matrix representation (see build_columnar_matrix)
+COLUMNAR_MEDIA_TYPE = "application/vnd.edm.matrix-columnar+json"
+MISSING_LEVEL = "."
+
+# Range of a completion trend when no start date is given
+DEFAULT_TREND_DAYS = 90
+
 @router.get("/", response_model=MatrixData)
-async def get_matrix(
+def get_matrix(
+    request: Request,
+    response: Response,
     department: Optional[str] = None,
     role: Optional[str] = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    output_format: Optional[str] = Query(None, alias="format", pattern="^(json|columnar)$"),
+    as_of: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get complete matrix data with optional filtering"""
-    # Get employees with filtering
+    """
+    Get complete matrix data with optional filtering
+
+    Pass `format=columnar` (or `Accept: application/vnd.edm.matrix-columnar+json`)
+    for the compact columnar representation, and `as_of` (ISO 8601, UTC if no
+    offset is given) for the scores as they were at that time.
+    """
+    etag, not_modified = check_not_modified(request, db)
+    if not_modified:
+        return not_modified
+    
+    try:
+        if output_format == "columnar" or (
+            output_format is None and COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+        ):
+            payload = build_columnar_matrix(db, department=department, role=role, active_only=active_only, as_of=as_of)
+            return Response(
+                content=json.dumps(payload, separators=(",", ":")),
+                media_type=COLUMNAR_MEDIA_TYPE,
+                headers=cache_headers(etag)
+            )
+        
+        matrix_data = build_matrix(db, department=department, role=role, active_only=active_only, as_of=as_of)
+    except HistoryUnavailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response.headers.update(cache_headers(etag))
+    return matrix_data
+
+def _filtered_employees(
+    db: Session, department: Optional[str], role: Optional[str], active_only: bool, as_of: Optional[datetime] = None
+):
+    """Employee query with the matrix filters applied"""
     employee_query = db.query(Employee)
+    if as_of is not None:
+        employee_query = employee_query.filter(Employee.created_at <= as_utc(as_of))
     if active_only:
         employee_query = employee_query.filter(Employee.is_active == True)
     if department:
         employee_query = employee_query.filter(Employee.department == department)
     if role:
         employee_query = employee_query.filter(Employee.role == role)
+    return employee_query
+
+def _active_columns(db: Session, *entities, as_of: Optional[datetime] = None):
+    """Active training columns in display order, limited to those created by ``as_of``"""
+    column_query = db.query(*entities).filter(TrainingColumn.is_active == True)
+    if as_of is not None:
+        column_query = column_query.filter(TrainingColumn.created_at <= as_utc(as_of))
+    return column_query.order_by(TrainingColumn.sort_order, TrainingColumn.title)
+
+def build_matrix(
+    db: Session,
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    active_only: bool = True,
+    as_of: Optional[datetime] = None
+) -> MatrixData:
+    """
+    Assemble the full matrix for the filtered employees
+
+    With ``as_of``, scores are rebuilt from the history (see
+    app/core/history.py) for the employees and columns that existed then.
+    """
+    # Read the version first: anything written while we read is replayed by /changes
+    version = get_version(db, DATA_VERSION)
     
+    # Get employees with filtering
+    employee_query = _filtered_employees(db, department, role, active_only, as_of)
     employees = employee_query.all()
     
     # Get training columns
-    columns = db.query(TrainingColumn).filter(TrainingColumn.is_active == True).order_by(
-        TrainingColumn.sort_order, TrainingColumn.title
-    ).all()
+    columns = _active_columns(db, TrainingColumn, as_of=as_of).all()
     
-    # Get all scores for the filtered employees
-    employee_ids = [emp.id for emp in employees]
-    scores = db.query(Score).filter(Score.employee_id.in_(employee_ids)).all()
-    
-    # Convert scores to MatrixCell format
-    matrix_cells = []
-    for score in scores:
-        matrix_cells.append(MatrixCell(
-            employee_id=score.employee_id,
-            column_id=score.column_id,
-            level=score.level,
-            notes=score.notes,
-            updated_by=score.updated_by,
-            updated_at=score.updated_at
-        ))
+    # Get all scores for the filtered employees (subquery avoids huge IN lists)
+    employee_ids = employee_query.with_entities(Employee.id).subquery()
+    if as_of is not None:
+        matrix_cells = [
+            MatrixCell(employee_id=employee_id, column_id=column_id, **cell._asdict())
+            for (employee_id, column_id), cell in scores_as_of(db, as_of, select(employee_ids.c.id)).items()
+        ]
+    else:
+        scores = db.query(Score).filter(Score.employee_id.in_(select(employee_ids.c.id))).all()
+        
+        # Convert scores to MatrixCell format
+        matrix_cells = []
+        for score in scores:
+            matrix_cells.append(MatrixCell(
+                employee_id=score.employee_id,
+                column_id=score.column_id,
+                level=score.level,
+                notes=score.notes,
+                updated_by=score.updated_by,
+                updated_at=score.updated_at
+            ))
     
     # Get settings
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
-    settings = settings_record.value if settings_record else {}
+    settings = get_stored_settings(db) or {}
     
     return MatrixData(
         employees=employees,
         columns=columns,
         scores=matrix_cells,
+        settings=settings,
+        version=version
+    )
+
+def build_columnar_matrix(
+    db: Session,
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    active_only: bool = True,
+    as_of: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Assemble the matrix in columnar form without per-cell objects.
+
+    Employee and column fields are parallel arrays. ``levels`` is a string
+    with one character per cell in row-major (employee, column) order: the
+    digit of the level, or ``MISSING_LEVEL`` when no score exists. Notes and
+    audit fields are omitted; fetch them per cell from /api/scores/.
+    """
+    version = get_version(db, DATA_VERSION)
+    
+    employee_query = _filtered_employees(db, department, role, active_only, as_of)
+    employees = employee_query.with_entities(
+        Employee.id, Employee.name, Employee.role, Employee.department, Employee.avatar, Employee.is_active
+    ).order_by(Employee.id).all()
+    columns = _active_columns(
+        db, TrainingColumn.id, TrainingColumn.title, TrainingColumn.category,
+        TrainingColumn.target_level, TrainingColumn.sort_order, as_of=as_of
+    ).all()
+    
+    employee_index = {row.id: position for position, row in enumerate(employees)}
+    column_index = {row.id: position for position, row in enumerate(columns)}
+    width = len(columns)
+    
+    # Only the three fields needed for the grid are fetched per score
+    cells = bytearray(MISSING_LEVEL.encode("ascii") * (len(employees) * width))
+    employee_ids = employee_query.with_entities(Employee.id).subquery()
+    if as_of is not None:
+        score_rows = (
+            (employee_id, column_id, cell.level)
+            for (employee_id, column_id), cell in scores_as_of(db, as_of, select(employee_ids.c.id)).items()
+        )
+    else:
+        score_rows = db.query(Score.employee_id, Score.column_id, Score.level).filter(
+            Score.employee_id.in_(select(employee_ids.c.id))
+        ).yield_per(EXPORT_BATCH_SIZE)
+    for employee_id, column_id, level in score_rows:
+        column_position = column_index.get(column_id)
+        if column_position is not None:
+            cells[employee_index[employee_id] * width + column_position] = ord("0") + level
+    
+    return {
+        "format": "columnar",
+        "version": version,
+        "employees": {
+            "id": [row.id for row in employees],
+            "name": [row.name for row in employees],
+            "role": [row.role for row in employees],
+            "department": [row.department for row in employees],
+            "avatar": [row.avatar for row in employees],
+            "is_active": [row.is_active for row in employees],
+        },
+        "columns": {
+            "id": [row.id for row in columns],
+            "title": [row.title for row in columns],
+            "category": [row.category for row in columns],
+            "target_level": [row.target_level for row in columns],
+            "sort_order": [row.sort_order for row in columns],
+        },
+        "levels": cells.decode("ascii"),
+        "settings": get_stored_settings(db) or {},
+    }
+
+@router.get("/page", response_model=MatrixPage)
+def get_matrix_page(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: MatrixSort = MatrixSort.NAME,
+    descending: bool = False,
+    search: Optional[str] = Query(None, max_length=100),
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    active_only: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """Get a window of matrix rows using a keyset cursor over (sort key, employee id)"""
+    etag, not_modified = check_not_modified(request, db)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers(etag))
+    
+    version = get_version(db, DATA_VERSION)
+    sort_column = Employee.name if sort == MatrixSort.NAME else Employee.total_score
+    sort_key = tuple_(sort_column, Employee.id)
+    
+    employee_query = db.query(Employee)
+    if active_only:
+        employee_query = employee_query.filter(Employee.is_active == True)
+    if department:
+        employee_query = employee_query.filter(Employee.department == department)
+    if role:
+        employee_query = employee_query.filter(Employee.role == role)
+    if search:
+        employee_query = employee_query.filter(Employee.name.icontains(search, autoescape=True))
+    
+    # Seek past the last row of the previous page instead of using OFFSET
+    if cursor:
+        last_key = tuple_(*_decode_cursor(cursor, sort))
+        employee_query = employee_query.filter(sort_key < last_key if descending else sort_key > last_key)
+    
+    if descending:
+        employee_query = employee_query.order_by(sort_column.desc(), Employee.id.desc())
+    else:
+        employee_query = employee_query.order_by(sort_column, Employee.id)
+    
+    # Fetch one extra row to know whether another page follows
+    employees = employee_query.limit(limit + 1).all()
+    has_more = len(employees) > limit
+    employees = employees[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = employees[-1]
+        next_cursor = _encode_cursor(sort, getattr(last, sort_column.key), last.id)
+    
+    columns = db.query(TrainingColumn).filter(TrainingColumn.is_active == True).order_by(
+        TrainingColumn.sort_order, TrainingColumn.title
+    ).all()
+    
+    scores = db.query(Score).filter(Score.employee_id.in_([emp.id for emp in employees])).all()
+    
+    return MatrixPage(
+        employees=employees,
+        columns=columns,
+        scores=[
+            MatrixCell(
+                employee_id=score.employee_id,
+                column_id=score.column_id,
+                level=score.level,
+                notes=score.notes,
+                updated_by=score.updated_by,
+                updated_at=score.updated_at
+            )
+            for score in scores
+        ],
+        next_cursor=next_cursor,
+        version=version
+    )
+
+def _encode_cursor(sort: MatrixSort, sort_value, employee_id: int) -> str:
+    """Opaque cursor holding the last row's sort key"""
+    payload = json.dumps([sort.value, sort_value, employee_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+def _decode_cursor(cursor: str, sort: MatrixSort):
+    """Return (sort value, employee id) from a cursor issued for the same sort"""
+    try:
+        cursor_sort, sort_value, employee_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort.value:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+    return sort_value, employee_id
+
+@router.get("/changes", response_model=MatrixChanges)
+def get_matrix_changes(
+    since: int = Query(..., ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """Get employees, columns, scores and settings changed after data version `since`"""
+    version = get_version(db, DATA_VERSION)
+    
+    # Every lookup is a range scan on an indexed version column
+    employees = db.query(Employee).filter(Employee.version > since).all()
+    columns = db.query(TrainingColumn).filter(TrainingColumn.version > since).all()
+    scores = db.query(Score).filter(Score.version > since).all()
+    
+    # A deleted cell that was re-created since is reported as a live score
+    live_keys = {(score.employee_id, score.column_id) for score in scores}
+    tombstones = db.query(ScoreTombstone.employee_id, ScoreTombstone.column_id).filter(
+        ScoreTombstone.version > since
+    ).distinct().all()
+    deleted_scores = [
+        ScoreKey(employee_id=employee_id, column_id=column_id)
+        for employee_id, column_id in tombstones
+        if (employee_id, column_id) not in live_keys
+    ]
+    
+    settings_version = db.query(Settings.version).filter(Settings.key == SETTINGS_KEY).scalar()
+    settings = get_stored_settings(db) if settings_version and settings_version > since else None
+    
+    return MatrixChanges(
+        since=since,
+        version=version,
+        employees=employees,
+        columns=columns,
+        scores=[
+            MatrixCell(
+                employee_id=score.employee_id,
+                column_id=score.column_id,
+                level=score.level,
+                notes=score.notes,
+                updated_by=score.updated_by,
+                updated_at=score.updated_at
+            )
+            for score in scores
+        ],
+        deleted_scores=deleted_scores,
         settings=settings
     )
 
 @router.get("/analytics", response_model=AnalyticsData)
-async def get_analytics(
+def get_analytics(
+    request: Request,
+    response: Response,
     department: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get analytics data for the dashboard"""
-    # Get all scores
-    query = db.query(Score)
-    if department:
-        # Filter by department through employees
-        employee_ids = db.query(Employee.id).filter(Employee.department == department).all()
-        employee_ids = [emp[0] for emp in employee_ids]
-        query = query.filter(Score.employee_id.in_(employee_ids))
+    etag, not_modified = check_not_modified(request, db)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers(etag))
     
-    scores = query.all()
+    # All aggregation happens in the database; score rows are never loaded
+    score_filters = []
+    if department:
+        department_employees = select(Employee.id).where(Employee.department == department)
+        score_filters.append(Score.employee_id.in_(department_employees))
     
     # Calculate skill distribution
-    level_counts = {}
-    for score in scores:
-        level = score.level
-        level_counts[level] = level_counts.get(level, 0) + 1
+    level_counts = dict(
+        db.query(Score.level, func.count(Score.id))
+        .filter(*score_filters)
+        .group_by(Score.level)
+        .all()
+    )
     
-    total_scores = len(scores)
+    total_scores = sum(level_counts.values())
     skill_distribution = []
     
-    # Get level configuration from settings
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
-    levels_config = []
-    if settings_record and settings_record.value and "levels" in settings_record.value:
-        levels_config = settings_record.value["levels"]
-    else:
-        # Default levels
-        levels_config = [
-            {"level": 0, "label": "Not Trained", "color": "#ef4444"},
-            {"level": 1, "label": "In Progress", "color": "#f59e0b"},
-            {"level": 2, "label": "Complete", "color": "#10b981"}
-        ]
+    # Get level configuration from settings (defaults if none are stored)
+    settings = get_app_settings(db)
+    levels_config = settings.levels
     
     for level_config in levels_config:
-        level = level_config["level"]
+        level = level_config.level
         count = level_counts.get(level, 0)
         percentage = (count / total_scores * 100) if total_scores > 0 else 0
         
         skill_distribution.append(SkillDistribution(
             level=level,
-            label=level_config["label"],
+            label=level_config.label,
             count=count,
             percentage=round(percentage, 2),
-            color=level_config["color"]
+            color=level_config.color
         ))
     
-    # Calculate completion rate
-    completed = level_counts.get(2, 0)
-    completion_rate = (completed / total_scores * 100) if total_scores > 0 else 0
+    # Completion against each column's target level, using the configured method
+    overall = completion_stats(db, settings, filters=score_filters).get(None)
+    completion_rate = overall.rate if overall else 0
     
     # Get total counts
-    total_employees = db.query(Employee).filter(Employee.is_active == True).count()
+    employee_query = db.query(func.count(Employee.id)).filter(Employee.is_active == True)
     if department:
-        total_employees = db.query(Employee).filter(
-            Employee.is_active == True,
-            Employee.department == department
-        ).count()
-    
-    total_trainings = db.query(TrainingColumn).filter(TrainingColumn.is_active == True).count()
-    
-    # Get top skills (most completed)
-    column_completion = {}
-    for score in scores:
-        if score.level == 2:  # Completed
-            column_completion[score.column_id] = column_completion.get(score.column_id, 0) + 1
-    
-    # Get column names for top skills
-    top_skills = []
-    for column_id, count in sorted(column_completion.items(), key=lambda x: x[1], reverse=True)[:5]:
-        column = db.query(TrainingColumn).filter(TrainingColumn.id == column_id).first()
-        if column:
-            top_skills.append({
-                "column_id": column_id,
-                "title": column.title,
-                "completed_count": count
-            })
-    
-    # Get recent activity (last 10 score updates)
-    recent_scores = db.query(Score).order_by(Score.updated_at.desc()).limit(10).all()
-    recent_activity = []
-    for score in recent_scores:
-        employee = db.query(Employee).filter(Employee.id == score.employee_id).first()
-        column = db.query(TrainingColumn).filter(TrainingColumn.id == score.column_id).first()
-        if employee and column:
-            recent_activity.append({
-                "employee_name": employee.name,
-                "column_title": column.title,
-                "level": score.level,
-                "updated_at": score.updated_at,
-                "updated_by": score.updated_by
-            })
+        employee_query = employee_query.filter(Employee.department == department)
+    total_employees = employee_query.scalar()
+    
+    total_trainings = db.query(func.count(TrainingColumn.id)).filter(TrainingColumn.is_active == True).scalar()
+    
+    # Get top skills (most completed) with their titles in one grouped query
+    completed_count = func.sum(completed_expr()).label("completed_count")
+    top_skill_rows = (
+        db.query(TrainingColumn.id, TrainingColumn.title, completed_count)
+        .join(Score, Score.column_id == TrainingColumn.id)
+        .filter(*score_filters)
+        .group_by(TrainingColumn.id, TrainingColumn.title)
+        .having(completed_count > 0)
+        .order_by(completed_count.desc(), TrainingColumn.id)
+        .limit(5)
+        .all()
+    )
+    top_skills = [
+        {"column_id": column_id, "title": title, "completed_count": count}
+        for column_id, title, count in top_skill_rows
+    ]
+    
+    # Get recent activity (last 10 score updates) joined to names and titles
+    recent_rows = (
+        db.query(Employee.name, TrainingColumn.title, Score.level, Score.updated_at, Score.updated_by)
+        .select_from(Score)
+        .join(Employee, Employee.id == Score.employee_id)
+        .join(TrainingColumn, TrainingColumn.id == Score.column_id)
+        .order_by(Score.updated_at.desc())
+        .limit(10)
+        .all()
+    )
+    recent_activity = [
+        {
+            "employee_name": employee_name,
+            "column_title": column_title,
+            "level": level,
+            "updated_at": updated_at,
+            "updated_by": updated_by
+        }
+        for employee_name, column_title, level, updated_at, updated_by in recent_rows
+    ]
     
     return AnalyticsData(
         skill_distribution=skill_distribution,
@@ -169,58 +473,135 @@ async def get_analytics(
         recent_activity=recent_activity
     )
 
+@router.get("/trends", response_model=CompletionTrend)
+def get_completion_trend(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: TrendGranularity = TrendGranularity.WEEK,
+    group_by: Optional[TrendGroupBy] = None,
+    department: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get completion over time (UTC days), one point per period and group"""
+    end = end or rollup_day()
+    start = start or end - timedelta(days=DEFAULT_TREND_DAYS)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    try:
+        points = completion_trend(
+            db, start, end, granularity=granularity.value,
+            group_by=group_by.value if group_by else None,
+            department=department, category=category, settings=get_app_settings(db)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return CompletionTrend(start=start, end=end, granularity=granularity, group_by=group_by, points=points)
+
 @router.get("/export/csv")
-async def export_matrix_csv(
+def export_matrix_csv(
+    request: Request,
     department: Optional[str] = None,
     role: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Export matrix data as CSV"""
-    import csv
-    import io
-    from fastapi.responses import StreamingResponse
-    
-    # Get matrix data
-    matrix_data = await get_matrix(department=department, role=role, db=db)
-    
-    # Create CSV content
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header row
-    header = ["Employee ID", "Name", "Role", "Department"]
-    for column in matrix_data.columns:
-        header.append(column.title)
-    writer.writerow(header)
-    
-    # Write data rows
-    for employee in matrix_data.employees:
-        row = [employee.id, employee.name, employee.role, employee.department or ""]
-        
-        # Get scores for this employee
-        employee_scores = {score.column_id: score.level for score in matrix_data.scores 
-                          if score.employee_id == employee.id}
-        
-        for column in matrix_data.columns:
-            level = employee_scores.get(column.id, 0)
-            row.append(level)
-        
-        writer.writerow(row)
-    
-    output.seek(0)
+    """Export matrix data as CSV, streamed one employee row at a time"""
+    etag, not_modified = check_not_modified(request, db)
+    if not_modified:
+        return not_modified
     
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode('utf-8')),
+        iter_matrix_csv(*matrix_csv_source(db, department=department, role=role)),
         media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=matrix_export.csv"}
+        headers={"Content-Disposition": "attachment; filename=matrix_export.csv", **cache_headers(etag)}
     )
 
+def matrix_csv_source(db: Session, department: Optional[str] = None, role: Optional[str] = None):
+    """Active columns and the employee-ordered (employee, column, level) rows for ``iter_matrix_csv``"""
+    # Get training columns (small) to fix the CSV layout up front
+    columns = db.query(TrainingColumn.id, TrainingColumn.title).filter(TrainingColumn.is_active == True).order_by(
+        TrainingColumn.sort_order, TrainingColumn.title
+    ).all()
+    
+    # Employees joined to their scores, ordered so each employee's cells are contiguous
+    rows = db.query(
+        Employee.id, Employee.name, Employee.role, Employee.department,
+        Score.column_id, Score.level
+    ).outerjoin(Score, Score.employee_id == Employee.id).filter(Employee.is_active == True)
+    if department:
+        rows = rows.filter(Employee.department == department)
+    if role:
+        rows = rows.filter(Employee.role == role)
+    return columns, rows.order_by(Employee.id).yield_per(EXPORT_BATCH_SIZE)
+
+def iter_matrix_csv(columns, rows, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Pivot (employee, column, level) rows into wide CSV lines.
+
+    ``rows`` must be ordered by employee id. Yields encoded chunks of roughly
+    ``chunk_size`` bytes, so memory stays bounded regardless of matrix size.
+    """
+    column_index = {column_id: position for position, (column_id, _) in enumerate(columns)}
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Employee ID", "Name", "Role", "Department"] + [title for _, title in columns])
+    
+    current_row = None
+    levels = None
+    for employee_id, name, role, department, column_id, level in rows:
+        if current_row is None or current_row[0] != employee_id:
+            if current_row is not None:
+                writer.writerow(current_row + levels)
+            current_row = [employee_id, name, role, department or ""]
+            levels = [0] * len(columns)
+        
+        position = column_index.get(column_id)
+        if position is not None:
+            levels[position] = level
+        
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    
+    if current_row is not None:
+        writer.writerow(current_row + levels)
+    yield buffer.getvalue().encode("utf-8")
+
+@router.post("/import", response_model=MatrixImportResult)
+def import_matrix(
+    file: UploadFile = File(...),
+    updated_by: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """Import a wide CSV/XLSX matrix (the CSV export layout), streamed in chunks"""
+    filename = (file.filename or "").lower()
+    if filename.endswith(".xlsx") or file.content_type == XLSX_CONTENT_TYPE:
+        rows = iter_xlsx_rows(file.file)
+    else:
+        rows = iter_csv_rows(file.file)
+    
+    try:
+        return MatrixImporter(db, updated_by=updated_by).run(rows)
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/export/json")
-async def export_matrix_json(
+def export_matrix_json(
+    request: Request,
+    response: Response,
     department: Optional[str] = None,
     role: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Export matrix data as JSON"""
-    matrix_data = await get_matrix(department=department, role=role, db=db)
+    etag, not_modified = check_not_modified(request, db)
+    if not_modified:
+        return not_modified
+    
+    response.headers.update(cache_headers(etag))
+    matrix_data = build_matrix(db, department=department, role=role)
     return matrix_data
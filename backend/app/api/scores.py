@@ -5,20 +5,63 @@ Handles CRUD operations for employee training scores
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..core.database import get_db
-from ..core.models import Score, Employee, TrainingColumn
-from ..core.schemas import Score as ScoreSchema, ScoreCreate, ScoreUpdate
+from typing import Dict, List, Optional
+from ..core.database import get_db, get_read_db
+from ..core.versions import DATA_VERSION, bump_version
+from ..core.events import event_hub, score_event, publish_score_changes
+from ..core.models import (
+    Score, ScoreTombstone, Employee, TrainingColumn, EmployeeScoreSummary, ColumnScoreSummary
+)
+from ..core.schemas import (
+    Score as ScoreSchema, ScoreCreate, ScoreUpdate,
+    ScoreBulkUpsert, ScoreBulkResult, ScoreBulkItemResult, ScoreBulkItemStatus,
+    EmployeeSummary, SummaryBatchRequest
+)
+from ..core.bulk import (
+    LOOKUP_CHUNK_SIZE, chunked, existing_employee_ids, existing_column_ids, existing_score_levels, upsert_scores
+)
+from ..core.aggregates import ScoreChange, apply_score_changes
+from ..core.history import record_score_events, score_state
+from ..core.completion import completion_stats, uses_weights
+from ..core.settings_cache import get_app_settings
 
 router = APIRouter()
 
+def _summary_response(summary, completion_rate: Optional[float] = None, **key) -> dict:
+    """Shape a summary row (or None for no scores) as the API payload"""
+    if summary is None:
+        return dict(key, total_scores=0, completed=0, in_progress=0, not_trained=0, completion_rate=0)
+    return dict(
+        key,
+        total_scores=summary.total_scores,
+        completed=summary.completed,
+        in_progress=summary.level_1,
+        not_trained=summary.level_0,
+        completion_rate=summary.completion_rate if completion_rate is None else completion_rate
+    )
+
+def _weighted_employee_rates(db: Session, employee_ids) -> Dict[int, float]:
+    """Category-weighted completion rates; empty when the plain summary rate applies"""
+    settings = get_app_settings(db)
+    if not uses_weights(settings):
+        return {}
+    rates = {}
+    for chunk in chunked(employee_ids, LOOKUP_CHUNK_SIZE):
+        stats = completion_stats(db, settings, group_by=Score.employee_id, filters=[Score.employee_id.in_(chunk)])
+        rates.update((employee_id, stat.rate) for employee_id, stat in stats.items())
+    return rates
+
+def _publish_score(score: Score):
+    """Push a committed score change to live subscribers"""
+    event_hub.publish(score_event(score.employee_id, score.column_id, score.level, score.version))
+
 @router.get("/", response_model=List[ScoreSchema])
-async def get_scores(
+def get_scores(
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=10000),
     employee_id: Optional[int] = None,
     column_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of scores with optional filtering"""
     query = db.query(Score)
@@ -33,7 +76,7 @@ async def get_scores(
     return scores
 
 @router.get("/{score_id}", response_model=ScoreSchema)
-async def get_score(score_id: int, db: Session = Depends(get_db)):
+def get_score(score_id: int, db: Session = Depends(get_read_db)):
     """Get a specific score by ID"""
     score = db.query(Score).filter(Score.id == score_id).first()
     if not score:
@@ -41,7 +84,7 @@ async def get_score(score_id: int, db: Session = Depends(get_db)):
     return score
 
 @router.post("/", response_model=ScoreSchema)
-async def create_or_update_score(score: ScoreCreate, db: Session = Depends(get_db)):
+def create_or_update_score(score: ScoreCreate, db: Session = Depends(get_db)):
     """Create or update a score for an employee and training column"""
     # Check if employee exists
     employee = db.query(Employee).filter(Employee.id == score.employee_id).first()
@@ -61,22 +104,99 @@ async def create_or_update_score(score: ScoreCreate, db: Session = Depends(get_d
     
     if existing_score:
         # Update existing score
+        old_level = existing_score.level
         update_data = score.dict(exclude={'employee_id', 'column_id'})
         for field, value in update_data.items():
             setattr(existing_score, field, value)
+        existing_score.version = bump_version(db, DATA_VERSION)
+        apply_score_changes(db, [ScoreChange(score.employee_id, score.column_id, old_level, existing_score.level)])
+        record_score_events(db, [score_state(existing_score)], existing_score.version)
         db.commit()
         db.refresh(existing_score)
+        _publish_score(existing_score)
         return existing_score
     else:
         # Create new score
         db_score = Score(**score.dict())
         db.add(db_score)
+        db_score.version = bump_version(db, DATA_VERSION)
+        apply_score_changes(db, [ScoreChange(score.employee_id, score.column_id, None, score.level)])
+        record_score_events(db, [score_state(db_score)], db_score.version)
         db.commit()
         db.refresh(db_score)
+        _publish_score(db_score)
         return db_score
 
+@router.post("/bulk", response_model=ScoreBulkResult)
+def bulk_upsert_scores(payload: ScoreBulkUpsert, db: Session = Depends(get_db)):
+    """Create or update many scores in a single transaction"""
+    items = payload.items
+
+    # Set-based existence checks instead of per-item lookups
+    employee_ids = existing_employee_ids(db, (item.employee_id for item in items))
+    column_ids = existing_column_ids(db, (item.column_id for item in items))
+
+    # Last item wins when the same cell appears more than once
+    last_index = {}
+    for index, item in enumerate(items):
+        last_index[(item.employee_id, item.column_id)] = index
+
+    valid_keys = [
+        key for key in last_index
+        if key[0] in employee_ids and key[1] in column_ids
+    ]
+    existing = existing_score_levels(db, valid_keys)
+
+    results = []
+    rows = []
+    created = updated = failed = 0
+    for index, item in enumerate(items):
+        key = (item.employee_id, item.column_id)
+        status = None
+        detail = None
+        if item.employee_id not in employee_ids:
+            status, detail = ScoreBulkItemStatus.ERROR, "Employee not found"
+        elif item.column_id not in column_ids:
+            status, detail = ScoreBulkItemStatus.ERROR, "Training column not found"
+        elif last_index[key] != index:
+            status, detail = ScoreBulkItemStatus.DUPLICATE, "Superseded by a later item for the same cell"
+        elif key in existing:
+            status = ScoreBulkItemStatus.UPDATED
+        else:
+            status = ScoreBulkItemStatus.CREATED
+
+        if status == ScoreBulkItemStatus.ERROR:
+            failed += 1
+        elif status == ScoreBulkItemStatus.UPDATED:
+            updated += 1
+        elif status == ScoreBulkItemStatus.CREATED:
+            created += 1
+
+        if status in (ScoreBulkItemStatus.CREATED, ScoreBulkItemStatus.UPDATED):
+            rows.append(item.dict())
+
+        results.append(ScoreBulkItemResult(
+            index=index,
+            employee_id=item.employee_id,
+            column_id=item.column_id,
+            status=status,
+            detail=detail
+        ))
+
+    version = bump_version(db, DATA_VERSION)
+    upsert_scores(db, rows, version=version)
+    apply_score_changes(db, (
+        ScoreChange(row["employee_id"], row["column_id"], existing.get((row["employee_id"], row["column_id"])), row["level"])
+        for row in rows
+    ))
+    record_score_events(db, rows, version)
+    db.commit()
+    publish_score_changes(rows, version)
+
+    return ScoreBulkResult(created=created, updated=updated, failed=failed, results=results)
+
 @router.put("/{score_id}", response_model=ScoreSchema)
-async def update_score(
+def update_score(
     score_id: int, 
     score_update: ScoreUpdate, 
     db: Session = Depends(get_db)
@@ -87,75 +207,77 @@ async def update_score(
         raise HTTPException(status_code=404, detail="Score not found")
     
     # Update only provided fields
+    old_level = db_score.level
     update_data = score_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_score, field, value)
     
+    db_score.version = bump_version(db, DATA_VERSION)
+    apply_score_changes(db, [ScoreChange(db_score.employee_id, db_score.column_id, old_level, db_score.level)])
+    record_score_events(db, [score_state(db_score)], db_score.version)
     db.commit()
     db.refresh(db_score)
+    _publish_score(db_score)
     return db_score
 
 @router.delete("/{score_id}")
-async def delete_score(score_id: int, db: Session = Depends(get_db)):
+def delete_score(score_id: int, db: Session = Depends(get_db)):
     """Delete a score"""
     db_score = db.query(Score).filter(Score.id == score_id).first()
     if not db_score:
         raise HTTPException(status_code=404, detail="Score not found")
     
     db.delete(db_score)
+    # Leave a tombstone so delta sync clients learn about the hard delete
+    event = score_event(db_score.employee_id, db_score.column_id, None, bump_version(db, DATA_VERSION))
+    db.add(ScoreTombstone(
+        employee_id=event["employee_id"],
+        column_id=event["column_id"],
+        version=event["version"]
+    ))
+    apply_score_changes(db, [ScoreChange(db_score.employee_id, db_score.column_id, db_score.level, None)])
+    record_score_events(db, [dict(score_state(db_score), level=None)], event["version"])
     db.commit()
+    event_hub.publish(event)
     return {"message": "Score deleted successfully"}
 
 @router.get("/employee/{employee_id}/summary")
-async def get_employee_summary(employee_id: int, db: Session = Depends(get_db)):
+def get_employee_summary(employee_id: int, db: Session = Depends(get_read_db)):
     """Get summary of all scores for an employee"""
     # Check if employee exists
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    scores = db.query(Score).filter(Score.employee_id == employee_id).all()
-    
-    # Calculate summary statistics
-    total_scores = len(scores)
-    completed = len([s for s in scores if s.level == 2])
-    in_progress = len([s for s in scores if s.level == 1])
-    not_trained = len([s for s in scores if s.level == 0])
-    
-    completion_rate = (completed / total_scores * 100) if total_scores > 0 else 0
-    
-    return {
-        "employee_id": employee_id,
-        "total_scores": total_scores,
-        "completed": completed,
-        "in_progress": in_progress,
-        "not_trained": not_trained,
-        "completion_rate": round(completion_rate, 2)
-    }
+    summary = db.get(EmployeeScoreSummary, employee_id)
+    rate = _weighted_employee_rates(db, [employee_id]).get(employee_id)
+    return _summary_response(summary, rate, employee_id=employee_id)
 
 @router.get("/column/{column_id}/summary")
-async def get_column_summary(column_id: str, db: Session = Depends(get_db)):
+def get_column_summary(column_id: str, db: Session = Depends(get_read_db)):
     """Get summary of all scores for a training column"""
     # Check if column exists
     column = db.query(TrainingColumn).filter(TrainingColumn.id == column_id).first()
     if not column:
         raise HTTPException(status_code=404, detail="Training column not found")
     
-    scores = db.query(Score).filter(Score.column_id == column_id).all()
-    
-    # Calculate summary statistics
-    total_scores = len(scores)
-    completed = len([s for s in scores if s.level == 2])
-    in_progress = len([s for s in scores if s.level == 1])
-    not_trained = len([s for s in scores if s.level == 0])
+    # All cells of a column share one category weight, so both methods agree
+    summary = db.get(ColumnScoreSummary, column_id)
+    return _summary_response(summary, column_id=column_id)
+
+@router.post("/summaries/employees", response_model=List[EmployeeSummary])
+def get_employee_summaries(request: SummaryBatchRequest, db: Session = Depends(get_read_db)):
+    """Get score summaries for many employees at once (unknown ids are skipped)"""
+    employee_ids = list(dict.fromkeys(request.ids))
+    found = existing_employee_ids(db, employee_ids)
     
-    completion_rate = (completed / total_scores * 100) if total_scores > 0 else 0
+    summaries = {}
+    for chunk in chunked(found, LOOKUP_CHUNK_SIZE):
+        for summary in db.query(EmployeeScoreSummary).filter(EmployeeScoreSummary.employee_id.in_(chunk)):
+            summaries[summary.employee_id] = summary
     
-    return {
-        "column_id": column_id,
-        "total_scores": total_scores,
-        "completed": completed,
-        "in_progress": in_progress,
-        "not_trained": not_trained,
-        "completion_rate": round(completion_rate, 2)
-    }
+    rates = _weighted_employee_rates(db, found)
+    return [
+        _summary_response(summaries.get(employee_id), rates.get(employee_id), employee_id=employee_id)
+        for employee_id in employee_ids if employee_id in found
+    ]
@@ -0,0 +1,31 @@
+"""
+Search API endpoints
+Ranked full-text search over employees and score notes
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..core.database import get_read_db
+from ..core.schemas import SearchHit, SearchHitType, SearchResults
+from ..core.search import search
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResults)
+def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[SearchHitType] = None,
+    include_inactive: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Search employee names, roles and departments and score notes; every word must match as a prefix"""
+    types = (type.value,) if type else tuple(hit_type.value for hit_type in SearchHitType)
+    try:
+        total, hits = search(db, q, types=types, include_inactive=include_inactive, skip=skip, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SearchResults(total=total, results=[SearchHit(type=hit.pop("kind"), **hit) for hit in hits])
@@ -8,36 +8,52 @@ from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 from typing import Dict, Any, List
 
-from ..core.database import get_db
+from ..core.database import get_db, get_read_db
 from ..core.models import Settings
 from ..core.schemas import AppSettings, SettingsUpdate
+from ..core.settings_cache import SETTINGS_KEY, settings_cache, get_app_settings, get_stored_settings
+from ..core.versions import DATA_VERSION, SETTINGS_VERSION, bump_version
+from ..core.events import event_hub, settings_event
 
 router = APIRouter()
 
+def _get_settings_record(db: Session) -> Settings:
+    """Load the settings row for writing, creating it if missing"""
+    settings_record = db.query(Settings).filter(Settings.key == SETTINGS_KEY).first()
+    
+    if not settings_record:
+        settings_record = Settings(key=SETTINGS_KEY, value={})
+        db.add(settings_record)
+    
+    return settings_record
+
+def _commit_settings(db: Session, settings_record: Settings):
+    """Commit a settings write and invalidate cached copies in every worker"""
+    bump_version(db, SETTINGS_VERSION)
+    version = bump_version(db, DATA_VERSION)
+    settings_record.version = version
+    db.commit()
+    settings_cache.invalidate()
+    event_hub.publish(settings_event(version))
+
 @router.get("/", response_model=Dict[str, Any])
-async def get_settings(db: Session = Depends(get_db)):
+def get_settings(db: Session = Depends(get_read_db)):
     """Get application settings"""
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
+    stored_settings = get_stored_settings(db)
     
-    if not settings_record:
+    if stored_settings is None:
         # Return default settings if none exist
-        default_settings = AppSettings()
-        return default_settings.dict()
+        return get_app_settings(db).dict()
     
-    return settings_record.value
+    return stored_settings
 
 @router.put("/", response_model=Dict[str, Any])
-async def update_settings(settings_update: SettingsUpdate, db: Session = Depends(get_db)):
+def update_settings(settings_update: SettingsUpdate, db: Session = Depends(get_db)):
     """Update application settings"""
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
-    
-    if not settings_record:
-        # Create new settings record
-        settings_record = Settings(key="app_settings", value={})
-        db.add(settings_record)
+    settings_record = _get_settings_record(db)
     
     # Get current settings
-    current_settings = settings_record.value or {}
+    current_settings = dict(settings_record.value or {})
     
     # Update with new values
     update_data = settings_update.dict(exclude_unset=True)
@@ -51,33 +67,21 @@ async def update_settings(settings_update: SettingsUpdate, db: Session = Depends
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid settings: {str(e)}")
     
-    db.commit()
+    _commit_settings(db, settings_record)
     return settings_record.value
 
 @router.get("/levels")
-async def get_levels(db: Session = Depends(get_db)):
+def get_levels(db: Session = Depends(get_read_db)):
     """Get training level configuration"""
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
-    
-    if not settings_record or not settings_record.value:
-        # Return default levels
-        default_settings = AppSettings()
-        return default_settings.levels
-    
-    settings = AppSettings(**settings_record.value)
-    return settings.levels
+    return get_app_settings(db).levels
 
 @router.put("/levels")
-async def update_levels(levels: List[Dict[str, Any]], db: Session = Depends(get_db)):
+def update_levels(levels: List[Dict[str, Any]], db: Session = Depends(get_db)):
     """Update training level configuration"""
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
-    
-    if not settings_record:
-        settings_record = Settings(key="app_settings", value={})
-        db.add(settings_record)
+    settings_record = _get_settings_record(db)
     
     # Get current settings
-    current_settings = settings_record.value or {}
+    current_settings = dict(settings_record.value or {})
     current_settings["levels"] = levels
     
     # Validate the updated settings
@@ -88,38 +92,35 @@ async def update_levels(levels: List[Dict[str, Any]], db: Session = Depends(get_
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid levels configuration: {str(e)}")
     
-    db.commit()
+    _commit_settings(db, settings_record)
     return {"message": "Levels updated successfully"}
 
 @router.get("/theme")
-async def get_theme(db: Session = Depends(get_db)):
+def get_theme(db: Session = Depends(get_read_db)):
     """Get current theme setting"""
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
+    stored_settings = get_stored_settings(db)
     
-    if not settings_record or not settings_record.value:
+    if not stored_settings:
         return "light"
     
-    return settings_record.value.get("theme", "light")
+    return stored_settings.get("theme", "light")
 
 @router.put("/theme")
-async def update_theme(theme_data: Dict[str, str], db: Session = Depends(get_db)):
+def update_theme(theme_data: Dict[str, str], db: Session = Depends(get_db)):
     """Update theme setting"""
     theme = theme_data.get("theme") if isinstance(theme_data, dict) else theme_data
     
     if theme not in ["light", "dark"]:
         raise HTTPException(status_code=400, detail="Theme must be 'light' or 'dark'")
     
-    settings_record = db.query(Settings).filter(Settings.key == "app_settings").first()
-    
-    if not settings_record:
-        settings_record = Settings(key="app_settings", value={})
-        db.add(settings_record)
+    settings_record = _get_settings_record(db)
     
     # Get current settings
-    current_settings = settings_record.value or {}
+    current_settings = dict(settings_record.value or {})
     current_settings["theme"] = theme
     
     settings_record.value = current_settings
-    db.commit()
+    flag_modified(settings_record, "value")
+    _commit_settings(db, settings_record)
     
     return {"message": "Theme updated successfully", "theme": theme}
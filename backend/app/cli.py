@@ -0,0 +1,141 @@
+"""
+Command line maintenance tasks
+Run with ``python -m app.cli <command>`` from the backend directory
+"""
+
+import argparse
+
+from app.core.database import engine
+
+
+def dedupe_scores_command(args):
+    """Remove duplicate (employee_id, column_id) score rows"""
+    from app.core.dedupe import count_duplicate_scores, dedupe_scores
+
+    with engine.begin() as connection:
+        if args.dry_run:
+            print(f"{count_duplicate_scores(connection)} duplicate score rows found")
+            return
+        removed = dedupe_scores(connection)
+    print(f"Removed {removed} duplicate score rows")
+
+
+def rebuild_summaries_command(args):
+    """Recompute score summaries and employee totals from the score table"""
+    from app.core.aggregates import rebuild_summaries
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as db:
+        rebuild_summaries(db)
+        db.commit()
+    print("Rebuilt score summaries")
+
+
+def generate_data_command(args):
+    """Append a synthetic organisation for benchmarking"""
+    from app.core.database import SessionLocal
+    from app.core.datagen import generate_org
+
+    with SessionLocal() as db:
+        result = generate_org(
+            db, employees=args.employees, columns=args.columns,
+            density=args.density, max_level=args.max_level, seed=args.seed, column_prefix=args.column_prefix
+        )
+        db.commit()
+    print(f"Generated {result.employees} employees, {result.columns} columns, {result.scores} scores")
+
+
+def seed_command(args):
+    """Bulk-load the sample data (or a custom seed file) into an empty database"""
+    from app.core.database import Base
+    from app.core.seed import seed_database
+
+    if args.create_schema:
+        Base.metadata.create_all(bind=engine)
+    seed_database(path=args.file)
+
+
+def snapshot_scores_command(args):
+    """Copy the score table into a history snapshot"""
+    from app.core.database import SessionLocal
+    from app.core.history import prune_snapshots, snapshot_if_due, take_snapshot
+
+    with SessionLocal() as db:
+        if args.force:
+            snapshot = take_snapshot(db)
+            prune_snapshots(db)
+        else:
+            snapshot = snapshot_if_due(db)
+        db.commit()
+        if snapshot is None:
+            print("No snapshot needed yet")
+        else:
+            print(f"Took snapshot {snapshot.id} with {snapshot.score_count} scores")
+
+
+def backfill_rollups_command(args):
+    """Rebuild the completion trend rollups from the score history"""
+    from app.core.database import SessionLocal
+    from app.core.rollups import backfill_rollups
+
+    with SessionLocal() as db:
+        written = backfill_rollups(db)
+        db.commit()
+    print(f"Wrote {written} rollup rows")
+
+
+def rebuild_search_index_command(args):
+    """Recreate the full-text search tables and triggers and re-index every row"""
+    from app.core.search import rebuild_search_index
+
+    with engine.begin() as connection:
+        rebuild_search_index(connection)
+    print("Rebuilt the search index")
+
+
+def build_parser():
+    """Build the argument parser with one sub-command per task"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Employee Development Matrix maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dedupe = subparsers.add_parser("dedupe-scores", help="Remove duplicate score rows before adding the unique index")
+    dedupe.add_argument("--dry-run", action="store_true", help="Only report how many rows would be removed")
+    dedupe.set_defaults(func=dedupe_scores_command)
+
+    rebuild = subparsers.add_parser("rebuild-summaries", help="Recompute the score summary tables from scratch")
+    rebuild.set_defaults(func=rebuild_summaries_command)
+
+    generate = subparsers.add_parser("generate-data", help="Bulk-load a synthetic organisation")
+    generate.add_argument("--employees", type=int, default=10000, help="Employees to create")
+    generate.add_argument("--columns", type=int, default=200, help="Training columns to create")
+    generate.add_argument("--density", type=float, default=0.3, help="Mean share of columns scored per employee")
+    generate.add_argument("--max-level", type=int, default=2, help="Highest level to assign")
+    generate.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    generate.add_argument("--column-prefix", default="gen", help="Prefix of the generated column ids (numbering continues after existing ones)")
+    generate.set_defaults(func=generate_data_command)
+
+    seed = subparsers.add_parser("seed", help="Seed an empty database from a JSON seed file")
+    seed.add_argument("--file", default=None, help="Seed file (defaults to SEED_FILE or the built-in sample)")
+    seed.add_argument("--create-schema", action="store_true", help="Create missing tables first")
+    seed.set_defaults(func=seed_command)
+
+    snapshot = subparsers.add_parser("snapshot-scores", help="Snapshot the score table for point-in-time queries")
+    snapshot.add_argument("--force", action="store_true", help="Snapshot even if few events were written since the last one")
+    snapshot.set_defaults(func=snapshot_scores_command)
+
+    backfill = subparsers.add_parser("backfill-rollups", help="Rebuild the completion trend rollups from the score history")
+    backfill.set_defaults(func=backfill_rollups_command)
+
+    reindex = subparsers.add_parser("rebuild-search-index", help="Re-index employees and score notes for full-text search")
+    reindex.set_defaults(func=rebuild_search_index_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
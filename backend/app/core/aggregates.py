@@ -0,0 +1,208 @@
+"""
+Derived per-employee and per-column figures
+Keeps denormalized aggregates in step with score writes
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import bindparam, case, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from .bulk import BULK_CHUNK_SIZE, LOOKUP_CHUNK_SIZE, chunked, insert_ignore
+from .completion import DEFAULT_TARGET_LEVEL, completed_expr, is_completed
+from .models import ColumnScoreSummary, Employee, EmployeeScoreSummary, Score, TrainingColumn
+from .rollups import rollup_score_changes
+
+# Levels with their own counter in the summary tables (ScoreCreate allows 0-5)
+SUMMARY_LEVELS = range(0, 6)
+SUMMARY_FIELDS = ("total_scores",) + tuple(f"level_{level}" for level in SUMMARY_LEVELS) + ("completed",)
+
+
+class ScoreChange(NamedTuple):
+    """One cell write, described by its level before and after"""
+    employee_id: int
+    column_id: str
+    old_level: Optional[int]  # None if the cell did not exist
+    new_level: Optional[int]  # None if the cell was deleted
+
+
+def _count_deltas(level: Optional[int], target_level: Optional[int], sign: int) -> Dict[str, int]:
+    if level is None:
+        return {}
+    deltas = {"total_scores": sign, "completed": sign if is_completed(level, target_level) else 0}
+    if level in SUMMARY_LEVELS:
+        deltas[f"level_{level}"] = sign
+    return deltas
+
+
+def _apply_summary_deltas(db: Session, model, key_name: str, deltas: Dict[object, Dict[str, int]]):
+    table = model.__table__
+    key = table.c[key_name]
+    insert_ignore(db, table, [
+        dict({key_name: summary_key}, **{field: 0 for field in SUMMARY_FIELDS})
+        for summary_key in deltas
+    ])
+    stmt = (
+        update(table)
+        .where(key == bindparam("summary_key"))
+        .values({field: table.c[field] + bindparam(f"d_{field}") for field in SUMMARY_FIELDS})
+    )
+    params = [
+        dict({"summary_key": summary_key}, **{f"d_{field}": counts.get(field, 0) for field in SUMMARY_FIELDS})
+        for summary_key, counts in deltas.items()
+    ]
+    for chunk in chunked(params, BULK_CHUNK_SIZE):
+        db.execute(stmt, chunk)
+
+
+def apply_score_changes(db: Session, changes: Iterable[ScoreChange]) -> None:
+    """
+    Fold cell writes into the summary tables, ``Employee.total_score`` and
+    the daily trend rollups.
+
+    Only the counters of the touched employees and columns move, so the cost
+    is proportional to the batch rather than to the score table. Runs in the
+    caller's transaction.
+    """
+    changes = [change for change in changes if change.old_level != change.new_level]
+    targets = _target_levels(db, {change.column_id for change in changes})
+
+    employee_deltas = defaultdict(lambda: defaultdict(int))
+    column_deltas = defaultdict(lambda: defaultdict(int))
+    score_deltas = defaultdict(int)
+    for change in changes:
+        target_level = targets.get(change.column_id)
+        for level, sign in ((change.old_level, -1), (change.new_level, 1)):
+            for field, delta in _count_deltas(level, target_level, sign).items():
+                employee_deltas[change.employee_id][field] += delta
+                column_deltas[change.column_id][field] += delta
+        score_deltas[change.employee_id] += (change.new_level or 0) - (change.old_level or 0)
+
+    if employee_deltas:
+        _apply_summary_deltas(db, EmployeeScoreSummary, "employee_id", employee_deltas)
+    if column_deltas:
+        _apply_summary_deltas(db, ColumnScoreSummary, "column_id", column_deltas)
+
+    totals = [
+        {"employee_key": employee_id, "delta": delta}
+        for employee_id, delta in score_deltas.items() if delta
+    ]
+    if totals:
+        employees = Employee.__table__
+        stmt = (
+            update(employees)
+            .where(employees.c.id == bindparam("employee_key"))
+            .values(total_score=employees.c.total_score + bindparam("delta"))
+        )
+        for chunk in chunked(totals, BULK_CHUNK_SIZE):
+            db.execute(stmt, chunk)
+
+    rollup_score_changes(db, changes)
+
+
+def _target_levels(db: Session, column_ids) -> Dict[str, Optional[int]]:
+    targets = {}
+    for chunk in chunked(column_ids, LOOKUP_CHUNK_SIZE):
+        targets.update(db.query(TrainingColumn.id, TrainingColumn.target_level).filter(TrainingColumn.id.in_(chunk)))
+    return targets
+
+
+def apply_target_change(db: Session, column_id: str, old_target: Optional[int], new_target: Optional[int]) -> None:
+    """
+    Re-evaluate ``completed`` counters after a column's target level changed.
+
+    Only cells whose level lies between the old and new target flip, so the
+    employee counters move by one UPDATE over the column's index range and
+    the column counter is re-derived from its level counts.
+    """
+    old_target = _effective_target(old_target)
+    new_target = _effective_target(new_target)
+    if old_target == new_target:
+        return
+
+    # Raising the target un-completes cells in [old, new); lowering completes [new, old)
+    low, high = sorted((old_target, new_target))
+    sign = -1 if new_target > old_target else 1
+    flipped = select(Score.employee_id).where(
+        Score.column_id == column_id, Score.level >= low, Score.level < high
+    )
+    summaries = EmployeeScoreSummary.__table__
+    db.execute(
+        update(summaries)
+        .where(summaries.c.employee_id.in_(flipped))
+        .values(completed=summaries.c.completed + sign)
+    )
+
+    columns = ColumnScoreSummary.__table__
+    db.execute(
+        update(columns)
+        .where(columns.c.column_id == column_id)
+        .values(completed=sum(
+            (columns.c[f"level_{level}"] for level in SUMMARY_LEVELS if level >= new_target), literal(0)
+        ))
+    )
+
+
+def _effective_target(target_level: Optional[int]) -> int:
+    return DEFAULT_TARGET_LEVEL if target_level is None else target_level
+
+
+def refresh_employee_totals(db: Session, employee_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recompute ``Employee.total_score`` for the given employees (all if None).
+
+    Runs in the caller's transaction; each employee's sum is read through the
+    (employee_id, column_id) index, so the cost is proportional to the rows
+    touched rather than the size of the score table.
+    """
+    total = (
+        select(func.coalesce(func.sum(Score.level), 0))
+        .where(Score.employee_id == Employee.id)
+        .scalar_subquery()
+    )
+    if employee_ids is None:
+        db.execute(update(Employee).values(total_score=total).execution_options(synchronize_session=False))
+        return
+    for chunk in chunked(set(employee_ids), LOOKUP_CHUNK_SIZE):
+        db.execute(
+            update(Employee)
+            .where(Employee.id.in_(chunk))
+            .values(total_score=total)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _summary_select(group_column):
+    """Aggregate scores into summary rows grouped by ``group_column``"""
+    counts = [func.count().label("total_scores")]
+    counts += [
+        func.sum(case((Score.level == level, 1), else_=0)).label(f"level_{level}")
+        for level in SUMMARY_LEVELS
+    ]
+    counts.append(func.sum(completed_expr()).label("completed"))
+    return (
+        select(group_column, *counts)
+        .join(TrainingColumn, TrainingColumn.id == Score.column_id)
+        .group_by(group_column)
+    )
+
+
+def rebuild_summaries(db: Session) -> None:
+    """
+    Recompute every summary row and employee total from the score table.
+
+    Used after out-of-band writes (imports, manual SQL) or if the tables are
+    suspected to have drifted. Runs in the caller's transaction.
+    """
+    for model, group_column in (
+        (EmployeeScoreSummary, Score.employee_id),
+        (ColumnScoreSummary, Score.column_id),
+    ):
+        table = model.__table__
+        db.execute(delete(table))
+        db.execute(insert(table).from_select(
+            [list(table.primary_key.columns)[0].name] + list(SUMMARY_FIELDS),
+            _summary_select(group_column),
+        ))
+    refresh_employee_totals(db)
@@ -0,0 +1,135 @@
+"""
+Bulk write helpers
+Set-based lookups and dialect-native upserts for large score batches
+"""
+
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from .models import Score, Employee, TrainingColumn
+
+# Rows per INSERT statement / ids per IN (...) list. Kept well below the
+# SQLite (32766) and PostgreSQL (65535) bound-parameter limits.
+BULK_CHUNK_SIZE = 1000
+LOOKUP_CHUNK_SIZE = 5000
+
+SCORE_UPSERT_FIELDS = ("level", "notes", "updated_by", "version")
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Yield successive lists of at most ``size`` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_ignore(db: Session, table, rows: List[dict]):
+    """INSERT rows, skipping primary keys that already exist"""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        for chunk in chunked(rows, BULK_CHUNK_SIZE):
+            db.execute(dialect_insert(table).on_conflict_do_nothing(), chunk)
+        return
+
+    keys = list(table.primary_key.columns)
+    for chunk in chunked(rows, LOOKUP_CHUNK_SIZE // len(keys)):
+        wanted = [tuple(row[key.name] for key in keys) for row in chunk]
+        present = {tuple(row) for row in db.execute(select(*keys).where(tuple_(*keys).in_(wanted)))}
+        missing = [row for row, key in zip(chunk, wanted) if key not in present]
+        if missing:
+            db.execute(insert(table), missing)
+
+
+def existing_employee_ids(db: Session, employee_ids: Iterable[int]) -> Set[int]:
+    """Return the subset of ``employee_ids`` that exist"""
+    found = set()
+    for chunk in chunked(set(employee_ids), LOOKUP_CHUNK_SIZE):
+        found.update(row[0] for row in db.query(Employee.id).filter(Employee.id.in_(chunk)))
+    return found
+
+
+def existing_column_ids(db: Session, column_ids: Iterable[str]) -> Set[str]:
+    """Return the subset of ``column_ids`` that exist"""
+    found = set()
+    for chunk in chunked(set(column_ids), LOOKUP_CHUNK_SIZE):
+        found.update(row[0] for row in db.query(TrainingColumn.id).filter(TrainingColumn.id.in_(chunk)))
+    return found
+
+
+def existing_score_levels(
+    db: Session, keys: Iterable[Tuple[int, str]]
+) -> Dict[Tuple[int, str], int]:
+    """Map each existing (employee_id, column_id) key to its current level"""
+    found = {}
+    # Composite IN uses two parameters per key
+    for chunk in chunked(set(keys), LOOKUP_CHUNK_SIZE // 2):
+        rows = db.query(Score.employee_id, Score.column_id, Score.level).filter(
+            tuple_(Score.employee_id, Score.column_id).in_(chunk)
+        )
+        found.update(((row[0], row[1]), row[2]) for row in rows)
+    return found
+
+
+def _native_upsert_statement(db: Session, fields: Sequence[str] = SCORE_UPSERT_FIELDS):
+    """Build an INSERT ... ON CONFLICT DO UPDATE for dialects that support it"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+
+    stmt = insert(Score.__table__)
+    update_set = {field: getattr(stmt.excluded, field) for field in fields}
+    update_set["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(
+        index_elements=[Score.employee_id, Score.column_id],
+        set_=update_set,
+    )
+
+
+def upsert_scores(
+    db: Session, rows: Sequence[dict], version: int, fields: Sequence[str] = SCORE_UPSERT_FIELDS
+) -> None:
+    """
+    Insert or update score rows keyed by (employee_id, column_id).
+
+    Rows must be unique per key and reference existing employees and columns;
+    every written row is stamped with the data ``version``. Existing rows only
+    have ``fields`` overwritten. Nothing is committed; the caller owns the
+    transaction.
+    """
+    rows = [dict(row, version=version) for row in rows]
+    stmt = _native_upsert_statement(db, fields)
+    if stmt is not None:
+        for chunk in chunked(rows, BULK_CHUNK_SIZE):
+            db.execute(stmt, chunk)
+        return
+
+    # Portable fallback: one lookup per chunk, then ORM updates/inserts
+    for chunk in chunked(rows, BULK_CHUNK_SIZE):
+        keys = [(row["employee_id"], row["column_id"]) for row in chunk]
+        existing = {
+            (score.employee_id, score.column_id): score
+            for score in db.query(Score).filter(tuple_(Score.employee_id, Score.column_id).in_(keys))
+        }
+        for row in chunk:
+            score = existing.get((row["employee_id"], row["column_id"]))
+            if score is None:
+                db.add(Score(**row))
+            else:
+                for field in fields:
+                    setattr(score, field, row.get(field))
+                score.updated_at = func.now()
+        db.flush()
@@ -0,0 +1,104 @@
+"""
+Completion engine
+Single definition of when a score counts as complete and how completion rates are combined
+"""
+
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.orm import Session
+
+from .models import Score, TrainingColumn
+from .schemas import AppSettings
+
+# Columns without a target (legacy rows) use the model default
+DEFAULT_TARGET_LEVEL = 2
+
+AVERAGE = "average"
+WEIGHTED = "weighted"
+
+
+class CompletionStats(NamedTuple):
+    """Completion figures for one group of scores"""
+    total: int  # Scored cells
+    completed: int  # Cells at or above their column's target level
+    rate: float  # Percentage, weighted by category under the "weighted" method
+
+
+def target_level_expr():
+    """SQL expression for a column's effective target level"""
+    return func.coalesce(TrainingColumn.target_level, DEFAULT_TARGET_LEVEL)
+
+
+def completed_expr(level=Score.level):
+    """SQL expression that is 1 for a completed cell and 0 otherwise; needs TrainingColumn joined"""
+    return case((level >= target_level_expr(), 1), else_=0)
+
+
+def is_completed(level: int, target_level: Optional[int]) -> bool:
+    """Python twin of ``completed_expr`` for incremental maintenance"""
+    return level >= (DEFAULT_TARGET_LEVEL if target_level is None else target_level)
+
+
+def uses_weights(settings: AppSettings) -> bool:
+    """Whether rates differ from plain completed/total under these settings"""
+    return settings.completion_method == WEIGHTED and any(
+        weight != 1 for weight in settings.category_weights.values()
+    )
+
+
+def weight_expr(settings: AppSettings):
+    """SQL expression for a cell's weight: its column category's weight (default 1)"""
+    if not uses_weights(settings):
+        return literal(1.0)
+    return case(settings.category_weights, value=TrainingColumn.category, else_=1.0)
+
+
+def category_weight(settings: AppSettings, category: Optional[str]) -> float:
+    """Python twin of ``weight_expr`` for figures summed outside SQL"""
+    if not uses_weights(settings):
+        return 1.0
+    return settings.category_weights.get(category, 1.0)
+
+
+def completion_rate(completed: float, total: float) -> float:
+    return round(completed / total * 100, 2) if total else 0
+
+
+def completion_stats(
+    db: Session,
+    settings: AppSettings,
+    group_by=None,
+    filters: Iterable[Any] = (),
+) -> Dict[Any, CompletionStats]:
+    """
+    Completion figures for the filtered scores in one grouped query.
+
+    Returns ``{group key: CompletionStats}``, or ``{None: ...}`` for the
+    whole selection when ``group_by`` is None. Groups without scores are
+    absent.
+    """
+    completed = completed_expr()
+    weight = weight_expr(settings)
+    columns = [
+        func.count().label("total"),
+        func.coalesce(func.sum(completed), 0).label("completed"),
+        func.coalesce(func.sum(weight * completed), 0).label("weighted_completed"),
+        func.coalesce(func.sum(weight), 0).label("weight_total"),
+    ]
+    query = select(*columns).select_from(Score).join(TrainingColumn, TrainingColumn.id == Score.column_id)
+    if group_by is not None:
+        query = query.add_columns(group_by.label("group_key")).group_by(group_by)
+    query = query.where(*filters)
+
+    stats = {}
+    for row in db.execute(query):
+        if not row.total:
+            continue
+        key = row.group_key if group_by is not None else None
+        stats[key] = CompletionStats(
+            total=row.total,
+            completed=int(row.completed),
+            rate=completion_rate(row.weighted_completed, row.weight_total),
+        )
+    return stats
@@ -3,34 +3,164 @@ Database configuration and session management
 Uses SQLite for simplicity, easily configurable for PostgreSQL
 """
 
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from typing import Any, Dict
 import os
+import time
 
 # Database URL - can be easily changed to PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/app.db")
+# Optional read-only replica for GET endpoints (see get_read_db)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
 
-# Create engine
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL, 
-        connect_args={"check_same_thread": False},
-        echo=False  # Set to True for SQL debugging
+# After a write, the same client reads from the primary for this many seconds
+READ_AFTER_WRITE_SECONDS = int(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+# Cookie / header carrying the epoch time until which reads stay on the primary
+READ_PRIMARY_COOKIE = "edm_read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+# Connection pool sizing (server databases and file-backed SQLite)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds before a connection is replaced
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Pragmas applied to every SQLite connection. WAL lets readers run alongside a
+# writer, and busy_timeout makes writers wait for the lock instead of failing
+# with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024))),  # Negative = KiB
+}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str, **kwargs) -> Engine:
+    """
+    Create an engine with the configured pool and, for SQLite, pragmas.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool since
+    each new connection would be a separate empty database.
+    """
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+        options = {"connect_args": {"check_same_thread": False}}
+        if not in_memory:
+            options.update(
+                poolclass=QueuePool,
+                pool_size=POOL_SIZE,
+                max_overflow=POOL_MAX_OVERFLOW,
+                pool_timeout=POOL_TIMEOUT,
+            )
+        options.update(kwargs)
+        sqlite_engine = create_engine(url, echo=False, **options)  # Set echo=True for SQL debugging
+        event.listen(sqlite_engine, "connect", _apply_sqlite_pragmas)
+        return sqlite_engine
+
+    options = dict(
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING,
     )
-else:
-    engine = create_engine(DATABASE_URL, echo=False)
+    options.update(kwargs)
+    return create_engine(url, echo=False, **options)
+
+
+def pool_stats(target: Engine) -> Dict[str, Any]:
+    """Current pool usage, for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW"""
+    pool = target.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=POOL_MAX_OVERFLOW,
+            timeout=pool.timeout(),
+        )
+    return stats
+
+
+# Create engine
+engine = create_db_engine(DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Replica engine and session factory (None when no replica is configured)
+read_engine = create_db_engine(DATABASE_READ_URL) if DATABASE_READ_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
+
 # Create base class for models
 Base = declarative_base()
 
 def get_db():
-    """Dependency to get database session"""
+    """
+    Dependency to get database session
+
+    Sessions are synchronous. Route handlers that use them are plain ``def``
+    functions, which FastAPI runs in its worker threadpool so a slow query
+    never blocks the event loop.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    """Whether this client wrote recently enough that a replica may not have caught up"""
+    value = request.headers.get(READ_PRIMARY_HEADER) or request.cookies.get(READ_PRIMARY_COOKIE)
+    try:
+        return value is not None and float(value) > time.time()
+    except ValueError:
+        return False
+
+def read_replica_configured() -> bool:
+    return ReadSessionLocal is not None
+
+def pin_reads_to_primary(response):
+    """Keep this client's reads on the primary for READ_AFTER_WRITE_SECONDS"""
+    until = f"{time.time() + READ_AFTER_WRITE_SECONDS:.3f}"
+    response.headers[READ_PRIMARY_HEADER] = until
+    response.set_cookie(READ_PRIMARY_COOKIE, until, max_age=READ_AFTER_WRITE_SECONDS, httponly=True, samesite="lax")
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependency for read-only handlers
+
+    Uses the replica when one is configured, unless the client wrote within
+    the last READ_AFTER_WRITE_SECONDS (cookie or header), in which case the
+    primary session is used so the client sees its own writes. Requests that
+    use it are marked read-only, so POSTs that only read (e.g. searches with
+    large bodies) do not pin the client to the primary.
+    """
+    request.state.read_only = True
+    if ReadSessionLocal is None or reads_pinned_to_primary(request):
+        yield db
+        return
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
@@ -0,0 +1,158 @@
+"""
+Synthetic data generator
+Bulk-loads large, realistically skewed organisations for benchmarks and load testing
+"""
+
+import random
+from typing import Iterator, List, NamedTuple, Sequence
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from .aggregates import rebuild_summaries
+from .bulk import chunked
+from .history import take_snapshot
+from .models import Employee, Score, TrainingColumn
+from .rollups import rollup_current_cells
+from .versions import DATA_VERSION, bump_version
+
+# Rows per executemany batch; large batches amortise per-statement overhead
+GENERATE_CHUNK_SIZE = 10000
+
+DEPARTMENTS = (
+    "Engineering", "Sales", "Operations", "Customer Success", "Product",
+    "Marketing", "Finance", "Human Resources", "Design", "Legal",
+)
+ROLES = ("Associate", "Specialist", "Senior Specialist", "Lead", "Manager", "Director")
+CATEGORIES = ("Technical", "Leadership", "Process", "Soft Skills", "Compliance", "Tools")
+# Relative frequency of each level; most cells sit at the bottom of the scale
+LEVEL_WEIGHTS = (30, 35, 25, 6, 3, 1)
+
+
+class GeneratedOrg(NamedTuple):
+    """Row counts written by ``generate_org``"""
+    employees: int
+    columns: int
+    scores: int
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Rank-based weights so the first items are much more common than the last"""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def _employee_rows(rng: random.Random, first_number: int, count: int) -> Iterator[dict]:
+    department_weights = _zipf_weights(len(DEPARTMENTS))
+    role_weights = _zipf_weights(len(ROLES), exponent=0.8)
+    for number in range(first_number, first_number + count):
+        yield {
+            "name": f"Employee {number:07d}",
+            "role": rng.choices(ROLES, role_weights)[0],
+            "department": rng.choices(DEPARTMENTS, department_weights)[0],
+            "is_active": rng.random() > 0.02,
+            "version": 0,
+            "total_score": 0,
+        }
+
+
+def _next_column_number(db: Session, prefix: str) -> int:
+    """One past the highest ``<prefix><number>`` column id, so repeated runs append new columns"""
+    numbers = [
+        int(column_id[len(prefix):])
+        for (column_id,) in db.query(TrainingColumn.id).filter(TrainingColumn.id.startswith(prefix, autoescape=True))
+        if column_id[len(prefix):].isdigit()
+    ]
+    return max(numbers, default=0) + 1
+
+
+def _column_rows(rng: random.Random, prefix: str, first_number: int, count: int) -> List[dict]:
+    category_weights = _zipf_weights(len(CATEGORIES), exponent=0.7)
+    return [
+        {
+            "id": f"{prefix}{index}",
+            "title": f"Training {index:04d}",
+            "category": rng.choices(CATEGORIES, category_weights)[0],
+            "target_level": 2,
+            "is_active": True,
+            "sort_order": index,
+            "version": 0,
+        }
+        for index in range(first_number, first_number + count)
+    ]
+
+
+def _score_rows(
+    rng: random.Random, employee_ids: Sequence[int], column_ids: Sequence[str], density: float, max_level: int
+) -> Iterator[dict]:
+    levels = list(range(max_level + 1))
+    level_weights = LEVEL_WEIGHTS[:max_level + 1]
+    for employee_id in employee_ids:
+        # Coverage varies per employee: long-tenured staff have far more cells filled
+        coverage = min(1.0, rng.expovariate(1 / density)) if density < 1 else 1.0
+        count = int(round(coverage * len(column_ids)))
+        if not count:
+            continue
+        picked = rng.sample(column_ids, count)
+        for column_id, level in zip(picked, rng.choices(levels, level_weights, k=count)):
+            yield {
+                "employee_id": employee_id,
+                "column_id": column_id,
+                "level": level,
+                "notes": None,
+                "updated_by": "generator",
+                "version": 0,
+            }
+
+
+def generate_org(
+    db: Session,
+    employees: int,
+    columns: int,
+    density: float = 0.3,
+    max_level: int = 2,
+    seed: int = 42,
+    column_prefix: str = "gen",
+) -> GeneratedOrg:
+    """
+    Append a synthetic organisation with bulk Core inserts.
+
+    ``density`` is the mean share of columns scored per employee; departments,
+    roles and categories follow skewed distributions. Employee ids are
+    assigned by the database (so PostgreSQL sequences stay in step) and read
+    back; column ids continue after the highest existing
+    ``<column_prefix><number>``, so generating again appends another set of
+    columns. Summaries are rebuilt, a history baseline is taken and the data
+    version bumped once at the end. Runs in the caller's transaction.
+    """
+    if not 0 < density <= 1:
+        raise ValueError("density must be in (0, 1]")
+    if not 0 <= max_level < len(LEVEL_WEIGHTS):
+        raise ValueError(f"max_level must be between 0 and {len(LEVEL_WEIGHTS) - 1}")
+
+    rng = random.Random(seed)
+    # Names are numbered after the current highest id, so they do not repeat across runs
+    first_number = (db.query(func.max(Employee.id)).scalar() or 0) + 1
+
+    employee_ids: List[int] = []
+    insert_employees = insert(Employee.__table__).returning(Employee.id, sort_by_parameter_order=True)
+    for chunk in chunked(_employee_rows(rng, first_number, employees), GENERATE_CHUNK_SIZE):
+        employee_ids.extend(db.execute(insert_employees, chunk).scalars())
+
+    column_rows = _column_rows(rng, column_prefix, _next_column_number(db, column_prefix), columns)
+    for chunk in chunked(column_rows, GENERATE_CHUNK_SIZE):
+        db.execute(insert(TrainingColumn.__table__), chunk)
+
+    column_ids = [row["id"] for row in column_rows]
+    scores = 0
+    if column_ids:
+        for chunk in chunked(_score_rows(rng, employee_ids, column_ids, density, max_level), GENERATE_CHUNK_SIZE):
+            db.execute(insert(Score.__table__), chunk)
+            scores += len(chunk)
+
+    rebuild_summaries(db)
+    if employee_ids:
+        rollup_current_cells(db, Employee.id >= min(employee_ids))
+    # Generated rows have no events; a baseline snapshot starts their history
+    take_snapshot(db, baseline=True)
+    bump_version(db, DATA_VERSION)
+    return GeneratedOrg(employees=employees, columns=columns, scores=scores)
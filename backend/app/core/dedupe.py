@@ -0,0 +1,54 @@
+"""
+Score deduplication
+Removes duplicate (employee_id, column_id) score rows so the unique index can be created
+"""
+
+from sqlalchemy import delete, func, select, table, column
+from sqlalchemy.engine import Connection
+
+# Lightweight table construct so migrations do not depend on the current models
+scores_table = table(
+    "scores",
+    column("id"),
+    column("employee_id"),
+    column("column_id"),
+    column("updated_at"),
+)
+
+
+def count_duplicate_scores(connection: Connection) -> int:
+    """Count score rows that would be removed by ``dedupe_scores``"""
+    groups = (
+        select(func.count().label("n"))
+        .select_from(scores_table)
+        .group_by(scores_table.c.employee_id, scores_table.c.column_id)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    extra = connection.execute(select(func.coalesce(func.sum(groups.c.n - 1), 0))).scalar()
+    return int(extra or 0)
+
+
+def dedupe_scores(connection: Connection) -> int:
+    """
+    Keep the most recently updated row for each (employee_id, column_id) pair.
+
+    Ties (or missing timestamps) are broken by the highest id. Returns the
+    number of rows deleted. The caller owns the transaction.
+    """
+    ranked = select(
+        scores_table.c.id,
+        func.row_number().over(
+            partition_by=(scores_table.c.employee_id, scores_table.c.column_id),
+            order_by=(
+                # NULL timestamps sort last on every dialect
+                scores_table.c.updated_at.is_(None),
+                scores_table.c.updated_at.desc(),
+                scores_table.c.id.desc(),
+            ),
+        ).label("rank"),
+    ).subquery()
+
+    stale_ids = select(ranked.c.id).where(ranked.c.rank > 1)
+    result = connection.execute(delete(scores_table).where(scores_table.c.id.in_(stale_ids)))
+    return result.rowcount or 0
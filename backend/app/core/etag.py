@@ -0,0 +1,50 @@
+"""
+Conditional GET support
+Strong ETags derived from the data version counter and the request variant
+"""
+
+import hashlib
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from .versions import DATA_VERSION, get_version
+
+
+def make_etag(version: int, request: Request) -> str:
+    """Build a strong ETag for ``request`` at data ``version``"""
+    # Different filters and formats are different representations and need distinct tags
+    query = urlencode(sorted(request.query_params.multi_items()))
+    accept = request.headers.get("accept", "")
+    variant = hashlib.sha1(f"{request.url.path}?{query}|{accept}".encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{variant}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def check_not_modified(request: Request, db: Session) -> Tuple[str, Optional[Response]]:
+    """
+    Compute the current ETag and, if the client already has it, a 304 response.
+
+    Only the data version counter is read, so unchanged requests never touch
+    the employee, column or score tables.
+    """
+    etag = make_etag(get_version(db, DATA_VERSION), request)
+    if etag_matches(request, etag):
+        return etag, Response(status_code=304, headers=cache_headers(etag))
+    return etag, None
+
+
+def cache_headers(etag: str) -> dict:
+    """Headers that make clients revalidate cached copies with If-None-Match"""
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
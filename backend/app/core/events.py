@@ -0,0 +1,151 @@
+"""
+Live update fan-out
+In-process hub that pushes compact matrix change events to connected subscribers
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+# Pending events held per subscriber before it is considered too slow
+MAX_PENDING_EVENTS = 1000
+# Bulk writes larger than this publish one "bulk" event instead of per-cell events
+BULK_EVENT_LIMIT = 500
+
+
+def score_event(employee_id: int, column_id: str, level: Optional[int], version: int) -> Dict[str, Any]:
+    """Cell change; ``level`` is None when the score was deleted"""
+    return {"type": "score", "employee_id": employee_id, "column_id": column_id, "level": level, "version": version}
+
+
+def employee_event(employee_id: int, version: int) -> Dict[str, Any]:
+    return {"type": "employee", "id": employee_id, "version": version}
+
+
+def column_event(column_id: str, version: int) -> Dict[str, Any]:
+    return {"type": "column", "id": column_id, "version": version}
+
+
+def settings_event(version: int) -> Dict[str, Any]:
+    return {"type": "settings", "version": version}
+
+
+def bulk_event(version: int) -> Dict[str, Any]:
+    """Many rows changed; clients should fetch /api/matrix/changes"""
+    return {"type": "bulk", "version": version}
+
+
+def event_key(event: Dict[str, Any]) -> Hashable:
+    """Events with the same key supersede each other"""
+    if event["type"] == "score":
+        return ("score", event["employee_id"], event["column_id"])
+    return (event["type"], event.get("id"))
+
+
+class Subscriber:
+    """
+    One connected client.
+
+    Pending events are coalesced by key, so a cell edited many times while
+    the client is busy is delivered once with its latest state. If more than
+    ``max_pending`` distinct keys pile up, they are dropped and the client is
+    told to resync instead. All methods run on the subscriber's event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = MAX_PENDING_EVENTS):
+        self.loop = loop
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._overflowed_at: Optional[int] = None
+        self._ready = asyncio.Event()
+
+    def offer(self, event: Dict[str, Any]):
+        key = event_key(event)
+        if self._overflowed_at is not None:
+            self._overflowed_at = max(self._overflowed_at, event.get("version", 0))
+        elif key in self._pending:
+            self._pending.pop(key)
+            self._pending[key] = event
+        elif len(self._pending) >= self.max_pending:
+            self._pending.clear()
+            self._overflowed_at = event.get("version", 0)
+        else:
+            self._pending[key] = event
+        self._ready.set()
+
+    async def next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for and drain pending events"""
+        await self._ready.wait()
+        self._ready.clear()
+        if self._overflowed_at is not None:
+            batch = [{"type": "resync", "version": self._overflowed_at}]
+            self._overflowed_at = None
+        else:
+            batch = list(self._pending.values())
+        self._pending.clear()
+        return batch
+
+
+class EventHub:
+    """Thread-safe publish/subscribe hub; writers publish from worker threads"""
+
+    def __init__(self, max_pending: int = MAX_PENDING_EVENTS):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers: Dict[asyncio.AbstractEventLoop, set] = {}
+
+    def subscribe(self) -> Subscriber:
+        """Register a subscriber; must be called from a running event loop"""
+        subscriber = Subscriber(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(subscriber.loop, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.loop)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.loop]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, *events: Dict[str, Any]):
+        """Deliver events to every subscriber without blocking the caller"""
+        if not events:
+            return
+        with self._lock:
+            targets = [(loop, list(subscribers)) for loop, subscribers in self._subscribers.items()]
+        for loop, subscribers in targets:
+            try:
+                # One callback per loop; the fan-out itself runs on that loop
+                loop.call_soon_threadsafe(self._deliver, subscribers, events)
+            except RuntimeError:
+                # Loop already closed; its subscribers are gone
+                with self._lock:
+                    self._subscribers.pop(loop, None)
+
+    @staticmethod
+    def _deliver(subscribers: List[Subscriber], events):
+        for subscriber in subscribers:
+            for event in events:
+                subscriber.offer(event)
+
+
+event_hub = EventHub()
+
+
+def publish_score_changes(changes: List[Dict[str, Any]], version: int):
+    """Publish cell events, collapsing large batches into a single bulk event"""
+    if len(changes) > BULK_EVENT_LIMIT:
+        event_hub.publish(bulk_event(version))
+    else:
+        event_hub.publish(*(
+            score_event(change["employee_id"], change["column_id"], change["level"], version)
+            for change in changes
+        ))
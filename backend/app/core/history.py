@@ -0,0 +1,238 @@
+"""
+Score history
+Append-only score events and periodic snapshots, replayed for point-in-time matrix queries
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from anyio import to_thread
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from .bulk import BULK_CHUNK_SIZE, chunked
+from .models import Score, ScoreEvent, ScoreSnapshot, ScoreSnapshotRow
+from .versions import STARTUP_LOCK, lock_counter
+
+logger = logging.getLogger(__name__)
+
+# Take a snapshot once this many events were written since the last one, which
+# bounds the replay behind recent point-in-time queries
+SNAPSHOT_MIN_EVENTS = int(os.getenv("SNAPSHOT_MIN_EVENTS", "10000"))
+# How often the background task checks whether a snapshot is due (0 = never)
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "600"))
+# Retention of periodic snapshots: the newest few, then the last one of each
+# recent month. Baselines are always kept; events are never pruned.
+SNAPSHOT_KEEP_RECENT = int(os.getenv("SNAPSHOT_KEEP_RECENT", "3"))
+SNAPSHOT_KEEP_MONTHS = int(os.getenv("SNAPSHOT_KEEP_MONTHS", "12"))
+
+
+class HistoryUnavailable(Exception):
+    """Raised for points in time before the recorded history starts"""
+
+
+class CellState(NamedTuple):
+    """A cell as it was at some point in time"""
+    level: int
+    notes: Optional[str]
+    updated_by: Optional[str]
+    updated_at: Optional[datetime]
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Treat naive datetimes as UTC and convert aware ones to UTC"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def score_state(score: Score) -> dict:
+    """The event fields describing ``score`` after a write"""
+    return {
+        "employee_id": score.employee_id,
+        "column_id": score.column_id,
+        "level": score.level,
+        "notes": score.notes,
+        "updated_by": score.updated_by,
+    }
+
+
+def record_score_events(db: Session, cells: Iterable[dict], version: int) -> None:
+    """
+    Append one event per written cell, in the caller's transaction.
+
+    Each dict holds the cell's state after the write (``employee_id``,
+    ``column_id``, ``level``, ``notes``, ``updated_by``); ``level`` None
+    records a deletion.
+    """
+    recorded_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "employee_id": cell["employee_id"],
+            "column_id": cell["column_id"],
+            "level": cell["level"],
+            "notes": cell.get("notes"),
+            "updated_by": cell.get("updated_by"),
+            "version": version,
+            "recorded_at": recorded_at,
+        }
+        for cell in cells
+    ]
+    for chunk in chunked(rows, BULK_CHUNK_SIZE):
+        db.execute(insert(ScoreEvent.__table__), chunk)
+
+
+def take_snapshot(db: Session, baseline: bool = False) -> ScoreSnapshot:
+    """
+    Copy the score table into a new snapshot with one INSERT ... SELECT.
+
+    ``baseline`` marks a snapshot of scores that were loaded without events
+    (existing data, seeds, generated data). Runs in the caller's transaction.
+    """
+    snapshot = ScoreSnapshot(
+        taken_at=datetime.now(timezone.utc),
+        last_event_id=db.query(func.max(ScoreEvent.id)).scalar() or 0,
+        baseline=baseline,
+    )
+    db.add(snapshot)
+    db.flush()
+    copied = db.execute(insert(ScoreSnapshotRow.__table__).from_select(
+        ["snapshot_id", "employee_id", "column_id", "level", "notes", "updated_by", "updated_at"],
+        select(literal(snapshot.id), Score.employee_id, Score.column_id, Score.level, Score.notes,
+               Score.updated_by, Score.updated_at),
+    ))
+    snapshot.score_count = copied.rowcount
+    return snapshot
+
+
+def prune_snapshots(
+    db: Session, keep_recent: int = SNAPSHOT_KEEP_RECENT, keep_months: int = SNAPSHOT_KEEP_MONTHS
+) -> List[int]:
+    """
+    Delete periodic snapshots that retention no longer needs; returns their ids.
+
+    Keeps the ``keep_recent`` newest periodic snapshots and the newest one of
+    each of the ``keep_months`` most recent months before them. Every
+    snapshot only shortcuts replaying the event log, so pruning never loses
+    history: older points in time replay from an earlier kept snapshot or
+    baseline. Baselines are needed for that and always kept.
+    """
+    snapshots = db.query(ScoreSnapshot.id, ScoreSnapshot.taken_at).filter(ScoreSnapshot.baseline == False).order_by(
+        ScoreSnapshot.taken_at.desc(), ScoreSnapshot.id.desc()
+    ).all()
+    months = set()
+    pruned = []
+    for snapshot_id, taken_at in snapshots[max(keep_recent, 0):]:
+        month = (taken_at.year, taken_at.month)
+        if month not in months and len(months) < keep_months:
+            months.add(month)
+        else:
+            pruned.append(snapshot_id)
+    for ids in chunked(pruned, BULK_CHUNK_SIZE):
+        db.query(ScoreSnapshotRow).filter(ScoreSnapshotRow.snapshot_id.in_(ids)).delete(synchronize_session=False)
+        db.query(ScoreSnapshot).filter(ScoreSnapshot.id.in_(ids)).delete(synchronize_session=False)
+    return pruned
+
+
+def snapshot_if_due(db: Session, min_events: int = SNAPSHOT_MIN_EVENTS) -> Optional[ScoreSnapshot]:
+    """Take a snapshot if at least ``min_events`` events were written since the last one, then prune old ones"""
+    last_folded = db.query(func.max(ScoreSnapshot.last_event_id)).scalar() or 0
+    last_event = db.query(func.max(ScoreEvent.id)).scalar() or 0
+    if last_event - last_folded < max(min_events, 1):
+        return None
+    snapshot = take_snapshot(db)
+    prune_snapshots(db)
+    return snapshot
+
+
+def ensure_history_baseline(db: Session) -> Optional[ScoreSnapshot]:
+    """
+    Snapshot scores that predate the event log, once; commits if it took one.
+
+    Workers starting together take the startup lock and check again under
+    it, so only one of them takes the baseline.
+    """
+    def needed() -> bool:
+        return not (db.query(ScoreSnapshot.id).first() or db.query(ScoreEvent.id).first()) and bool(
+            db.query(Score.id).first()
+        )
+
+    if not needed():
+        return None
+    db.rollback()
+    lock_counter(db, STARTUP_LOCK)
+    if not needed():
+        db.rollback()
+        return None
+    snapshot = take_snapshot(db, baseline=True)
+    db.commit()
+    return snapshot
+
+
+def scores_as_of(db: Session, as_of: datetime, employee_ids=None) -> Dict[Tuple[int, str], CellState]:
+    """
+    Rebuild the score cells as they were at ``as_of``.
+
+    Starts from the newest snapshot taken at or before ``as_of`` and replays
+    only the events written after it. Within the newest SNAPSHOT_KEEP_RECENT
+    snapshots that is at most about SNAPSHOT_MIN_EVENTS events; older points
+    replay from the month's kept snapshot or a baseline (see
+    ``prune_snapshots``), which can be many more. ``employee_ids`` (a select
+    of ids) restricts both reads.
+    """
+    as_of = as_utc(as_of)
+    snapshot = db.query(ScoreSnapshot).filter(ScoreSnapshot.taken_at <= as_of).order_by(
+        ScoreSnapshot.taken_at.desc(), ScoreSnapshot.id.desc()
+    ).first()
+    if snapshot is None:
+        first_baseline = db.query(func.min(ScoreSnapshot.taken_at)).filter(ScoreSnapshot.baseline == True).scalar()
+        if first_baseline is not None:
+            raise HistoryUnavailable(f"Score history starts at {first_baseline.isoformat()}")
+
+    cells: Dict[Tuple[int, str], CellState] = {}
+    if snapshot is not None:
+        rows = db.query(
+            ScoreSnapshotRow.employee_id, ScoreSnapshotRow.column_id, ScoreSnapshotRow.level,
+            ScoreSnapshotRow.notes, ScoreSnapshotRow.updated_by, ScoreSnapshotRow.updated_at
+        ).filter(ScoreSnapshotRow.snapshot_id == snapshot.id)
+        if employee_ids is not None:
+            rows = rows.filter(ScoreSnapshotRow.employee_id.in_(employee_ids))
+        for employee_id, column_id, level, notes, updated_by, updated_at in rows:
+            cells[(employee_id, column_id)] = CellState(level, notes, updated_by, updated_at)
+
+    events = db.query(
+        ScoreEvent.employee_id, ScoreEvent.column_id, ScoreEvent.level,
+        ScoreEvent.notes, ScoreEvent.updated_by, ScoreEvent.recorded_at
+    ).filter(
+        ScoreEvent.id > (snapshot.last_event_id if snapshot else 0),
+        ScoreEvent.recorded_at <= as_of
+    )
+    if employee_ids is not None:
+        events = events.filter(ScoreEvent.employee_id.in_(employee_ids))
+    for employee_id, column_id, level, notes, updated_by, recorded_at in events.order_by(ScoreEvent.id):
+        if level is None:
+            cells.pop((employee_id, column_id), None)
+        else:
+            cells[(employee_id, column_id)] = CellState(level, notes, updated_by, recorded_at)
+    return cells
+
+
+def _snapshot_if_due(session_factory: sessionmaker):
+    with session_factory() as db:
+        snapshot = snapshot_if_due(db)
+        db.commit()
+        if snapshot is not None:
+            logger.info("Took score snapshot %s (%s scores)", snapshot.id, snapshot.score_count)
+
+
+async def run_periodic_snapshots(session_factory: sessionmaker, interval: int = SNAPSHOT_INTERVAL_SECONDS):
+    """Background task: check every ``interval`` seconds whether a snapshot is due"""
+    while interval > 0:
+        await asyncio.sleep(interval)
+        try:
+            await to_thread.run_sync(_snapshot_if_due, session_factory)
+        except Exception:
+            logger.exception("Periodic score snapshot failed")
@@ -0,0 +1,320 @@
+"""
+Matrix import
+Streams wide CSV/XLSX files in the export layout into employees and scores, one transaction per chunk
+"""
+
+import csv
+import io
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .aggregates import ScoreChange, apply_score_changes
+from .bulk import LOOKUP_CHUNK_SIZE, chunked, upsert_scores
+from .events import BULK_EVENT_LIMIT, bulk_event, employee_event, event_hub, score_event
+from .history import record_score_events
+from .models import Employee, Score, TrainingColumn
+from .rollups import rollup_department_change
+from .schemas import EmployeeCreate, EmployeeUpdate, MatrixImportError, MatrixImportResult
+from .versions import DATA_VERSION, bump_version
+
+# Employee rows per transaction
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+# Imports set the level only; notes entered in the app are kept
+IMPORT_SCORE_FIELDS = ("level", "updated_by", "version")
+MIN_LEVEL, MAX_LEVEL = 0, 5
+
+EMPLOYEE_ID_HEADER = "employee id"
+EMPLOYEE_FIELD_HEADERS = {"name": "name", "role": "role", "department": "department"}
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    """Decode and split a CSV byte stream lazily (a BOM from Excel is ignored)"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        # Leave the underlying file open for its owner
+        if not stream.closed:
+            text.detach()
+
+
+def iter_xlsx_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    """Rows of the first worksheet; needs the optional ``openpyxl`` package"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package; upload a CSV file instead")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ["" if value is None else str(value) for value in row]
+    finally:
+        workbook.close()
+
+
+class _Layout:
+    """Where the employee fields and training columns sit in the header"""
+
+    def __init__(self, db: Session, header: Sequence[str]):
+        normalized = [cell.strip().lower() for cell in header]
+        self.id_position = normalized.index(EMPLOYEE_ID_HEADER) if EMPLOYEE_ID_HEADER in normalized else None
+        self.field_positions = {
+            field: normalized.index(name) for name, field in EMPLOYEE_FIELD_HEADERS.items() if name in normalized
+        }
+        if self.id_position is None and "name" not in self.field_positions:
+            raise ValueError("Header must contain an 'Employee ID' or a 'Name' column")
+
+        # Titles as exported; ids are accepted too. Active columns win on duplicate titles.
+        by_title: Dict[str, str] = {}
+        by_id: Dict[str, str] = {}
+        for column_id, title, is_active in db.query(
+            TrainingColumn.id, TrainingColumn.title, TrainingColumn.is_active
+        ).order_by(TrainingColumn.is_active):
+            by_title[title.strip().lower()] = column_id
+            by_id[column_id.lower()] = column_id
+
+        fixed = set(self.field_positions.values()) | {self.id_position}
+        self.columns: List[Tuple[int, str, str]] = []  # (position, column id, header)
+        self.unknown: List[str] = []
+        for position, name in enumerate(normalized):
+            if position in fixed or not name:
+                continue
+            column_id = by_title.get(name) or by_id.get(name)
+            if column_id is None:
+                self.unknown.append(header[position].strip())
+            else:
+                self.columns.append((position, column_id, header[position].strip()))
+
+
+def _parse_level(value: str) -> int:
+    number = float(value)
+    if not number.is_integer() or not MIN_LEVEL <= number <= MAX_LEVEL:
+        raise ValueError
+    return int(number)
+
+
+class MatrixImporter:
+    """
+    Import a wide matrix file chunk by chunk.
+
+    Rows with a known ``Employee ID`` update that employee; other rows update
+    the employee with the same name (names are unique, so renaming one to
+    another's name is a row error) or create one (name and role required,
+    the id is assigned by the database). Blank cells are skipped, cells that
+    already hold the same level are not rewritten, and level 0 in an
+    unscored cell (how exports write them) creates no score. Each chunk
+    commits on its own, so a failure only loses that chunk, which is
+    reported as errors.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        updated_by: Optional[str] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress: Optional[Callable[[MatrixImportResult], None]] = None,
+    ):
+        self.db = db
+        self.updated_by = updated_by
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.result = MatrixImportResult()
+
+    def run(self, rows: Iterable[Sequence[str]]) -> MatrixImportResult:
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("The file is empty")
+        layout = _Layout(self.db, header)
+        self.result.unknown_columns = layout.unknown
+
+        for chunk in chunked(enumerate(rows, start=2), self.chunk_size):
+            try:
+                self._import_chunk(layout, chunk)
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                self._error(chunk[0][0], f"Rows {chunk[0][0]}-{chunk[-1][0]} were not imported: {e.__class__.__name__}")
+            if self.progress:
+                self.progress(self.result)
+        return self.result
+
+    def _error(self, row: int, message: str, column: Optional[str] = None):
+        self.result.error_count += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(MatrixImportError(row=row, column=column, message=message))
+
+    def _parse_rows(self, layout: _Layout, chunk):
+        """Validate a chunk into (line, employee id or None, fields, {column_id: level})"""
+        parsed = []
+        for line, values in chunk:
+            if not any(value.strip() for value in values):
+                continue
+            self.result.rows += 1
+
+            def cell(position):
+                return values[position].strip() if position is not None and position < len(values) else ""
+
+            employee_id = None
+            if cell(layout.id_position):
+                try:
+                    employee_id = int(float(cell(layout.id_position)))
+                except ValueError:
+                    self._error(line, "Employee ID must be a number", "Employee ID")
+                    continue
+            fields = {field: cell(position) for field, position in layout.field_positions.items() if cell(position)}
+
+            levels = {}
+            for position, column_id, title in layout.columns:
+                value = cell(position)
+                if not value:
+                    continue
+                try:
+                    levels[column_id] = _parse_level(value)
+                except ValueError:
+                    self._error(line, f"Level must be a whole number from {MIN_LEVEL} to {MAX_LEVEL}", title)
+            parsed.append((line, employee_id, fields, levels))
+        return parsed
+
+    def _import_chunk(self, layout: _Layout, chunk):
+        db = self.db
+        parsed = self._parse_rows(layout, chunk)
+        if not parsed:
+            return
+
+        known_ids = [employee_id for _, employee_id, _, _ in parsed if employee_id is not None]
+        existing = {}
+        for ids in chunked(set(known_ids), LOOKUP_CHUNK_SIZE):
+            for row in db.query(Employee.id, Employee.name, Employee.role, Employee.department).filter(Employee.id.in_(ids)):
+                existing[row.id] = row
+        # Names are unique, so rows without a known id are matched by name and
+        # renames are checked against them
+        names = {fields["name"] for _, _, fields, _ in parsed if "name" in fields}
+        by_name: Dict[str, int] = {}
+        for chunk_names in chunked(names, LOOKUP_CHUNK_SIZE):
+            for row in db.query(Employee.id, Employee.name, Employee.role, Employee.department).filter(
+                Employee.name.in_(chunk_names)
+            ):
+                existing.setdefault(row.id, row)
+                by_name[row.name] = row.id
+
+        version = bump_version(db, DATA_VERSION)
+        updates: Dict[int, dict] = {}
+        # New employees by name, with their levels until they have ids
+        created: Dict[str, Tuple[Employee, Dict[str, int]]] = {}
+        cells: Dict[Tuple[int, str], int] = {}
+        for line, employee_id, fields, levels in parsed:
+            name = fields.get("name")
+            if employee_id not in existing:
+                employee_id = by_name.get(name)
+            if employee_id in existing:
+                try:
+                    EmployeeUpdate(**fields)
+                except ValidationError as e:
+                    self._error(line, _validation_message(e))
+                    continue
+                current = existing[employee_id]
+                changed = {field: value for field, value in fields.items() if getattr(current, field) != value}
+                if "name" in changed:
+                    if by_name.get(name, employee_id) != employee_id or name in created:
+                        self._error(line, "Employee with this name already exists", "Name")
+                        continue
+                    if by_name.get(current.name) == employee_id:
+                        del by_name[current.name]
+                    by_name[name] = employee_id
+                if changed:
+                    updates.setdefault(employee_id, {}).update(changed)
+                for column_id, level in levels.items():
+                    cells[(employee_id, column_id)] = level
+            elif name in created:
+                # Listed again in the same chunk: later rows win, as for existing employees
+                try:
+                    EmployeeUpdate(**fields)
+                except ValidationError as e:
+                    self._error(line, _validation_message(e))
+                    continue
+                employee, pending_levels = created[name]
+                for field, value in fields.items():
+                    setattr(employee, field, value)
+                pending_levels.update(levels)
+            else:
+                try:
+                    EmployeeCreate(**fields)
+                except ValidationError as e:
+                    self._error(line, _validation_message(e))
+                    continue
+                employee = Employee(version=version, **fields)
+                db.add(employee)
+                created[name] = (employee, dict(levels))
+
+        if created:
+            db.flush()
+        for employee, levels in created.values():
+            for column_id, level in levels.items():
+                cells[(employee.id, column_id)] = level
+
+        if updates:
+            table = Employee.__table__
+            for employee_id, changed in updates.items():
+                db.execute(
+                    update(table).where(table.c.id == bindparam("employee_key")).values(version=version, **{
+                        field: bindparam(field) for field in changed
+                    }),
+                    [dict(changed, employee_key=employee_id)]
+                )
+                if "department" in changed:
+                    rollup_department_change(db, employee_id, existing[employee_id].department, changed["department"])
+
+        # Only cells whose level actually changes are written
+        current = {}
+        for ids in chunked({employee_id for employee_id, _ in cells}, LOOKUP_CHUNK_SIZE):
+            current.update(
+                ((employee_id, column_id), (level, notes))
+                for employee_id, column_id, level, notes in db.query(
+                    Score.employee_id, Score.column_id, Score.level, Score.notes
+                ).filter(Score.employee_id.in_(ids))
+            )
+        rows = []
+        changes = []
+        for (employee_id, column_id), level in cells.items():
+            old_level, notes = current.get((employee_id, column_id), (None, None))
+            # Exports write unscored cells as 0
+            if old_level == level or (old_level is None and level == MIN_LEVEL):
+                continue
+            rows.append({"employee_id": employee_id, "column_id": column_id, "level": level, "updated_by": self.updated_by})
+            changes.append(ScoreChange(employee_id, column_id, old_level, level))
+
+        upsert_scores(db, rows, version=version, fields=IMPORT_SCORE_FIELDS)
+        apply_score_changes(db, changes)
+        # Notes are kept by the upsert, so the events carry the existing ones
+        record_score_events(db, (
+            dict(row, notes=current.get((row["employee_id"], row["column_id"]), (None, None))[1]) for row in rows
+        ), version)
+        created_ids = [employee.id for employee, _ in created.values()]
+        db.commit()
+
+        # Counted only once the chunk is committed
+        scores_created = sum(1 for change in changes if change.old_level is None)
+        self.result.scores_created += scores_created
+        self.result.scores_updated += len(changes) - scores_created
+        self.result.scores_unchanged += len(cells) - len(changes)
+        self.result.employees_created += len(created_ids)
+        self.result.employees_updated += len(updates)
+
+        events = [employee_event(employee_id, version) for employee_id in created_ids]
+        events += [employee_event(employee_id, version) for employee_id in updates]
+        events += [score_event(row["employee_id"], row["column_id"], row["level"], version) for row in rows]
+        if len(events) > BULK_EVENT_LIMIT:
+            event_hub.publish(bulk_event(version))
+        else:
+            event_hub.publish(*events)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
@@ -0,0 +1,309 @@
+"""
+Background jobs
+Runs long exports and imports on a small bounded worker pool, tracked in the jobs table
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from anyio import to_thread
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from .models import Job
+from .versions import DATA_VERSION, get_version
+
+logger = logging.getLogger(__name__)
+
+# Jobs running at once; each holds a database connection for its whole run
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Queued plus running jobs before new ones are refused
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "20"))
+JOB_ARTIFACT_DIR = os.getenv("JOB_ARTIFACT_DIR", "./data/jobs")
+# Finished jobs and their artifacts are removed after this many seconds
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+# How often a process refreshes the heartbeat of its active jobs (0 = never)
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+# Active jobs whose heartbeat is older than this are failed as interrupted
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobQueueFull(Exception):
+    """Raised when JOB_QUEUE_LIMIT jobs are already queued or running"""
+
+
+class JobHandler(NamedTuple):
+    """
+    How to run one kind of job.
+
+    ``run(db, params, input_path, output_path, progress)`` does the work in its
+    own session and returns a JSON-able result. Handlers with an artifact
+    ``suffix`` write it to ``output_path``.
+    """
+    run: Callable[..., Optional[Dict[str, Any]]]
+    suffix: Optional[str] = None
+    media_type: Optional[str] = None
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def register_job_handler(kind: str, run, suffix: Optional[str] = None, media_type: Optional[str] = None):
+    JOB_HANDLERS[kind] = JobHandler(run, suffix, media_type)
+
+
+def dedupe_key(kind: str, params: Dict[str, Any], data_version: int) -> str:
+    payload = json.dumps([kind, params, data_version], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _remove(path: Optional[str]):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class JobRunner:
+    """
+    In-process job queue on a bounded thread pool.
+
+    A request for the same kind and parameters at the same data version as a
+    queued, running or still-downloadable job returns that job instead of
+    starting another; a unique key on active jobs enforces that across
+    worker processes. Job state lives in the database so any worker process
+    can report status, but each job runs in the process that accepted it,
+    which records itself as the owner and keeps the job's heartbeat fresh.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        queue_limit: int = JOB_QUEUE_LIMIT,
+        artifact_dir: str = JOB_ARTIFACT_DIR,
+        retention_seconds: int = JOB_RETENTION_SECONDS,
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.artifact_dir = artifact_dir
+        self.retention_seconds = retention_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="edm-job")
+        return self._executor
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    def submit(
+        self,
+        db: Session,
+        kind: str,
+        params: Dict[str, Any],
+        session_factory: Optional[sessionmaker] = None,
+        input_path: Optional[str] = None,
+    ) -> Job:
+        """
+        Record a job and queue it, or return the matching existing job.
+
+        ``session_factory`` defaults to one bound like ``db``. If an existing
+        job is returned, ``input_path`` is deleted since it will not be read.
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        session_factory = session_factory or sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+
+        # Serializes the lookup and insert within this process; the unique active key covers the others
+        with self._lock:
+            self.prune(db)
+            version = get_version(db, DATA_VERSION)
+            key = dedupe_key(kind, params, version)
+            for job in db.query(Job).filter(Job.dedupe_key == key).order_by(Job.created_at.desc()):
+                if job.status in ACTIVE_STATUSES or (
+                    job.status == SUCCEEDED and (job.artifact_path is None or os.path.exists(job.artifact_path))
+                ):
+                    _remove(input_path)
+                    return job
+
+            if db.query(Job).filter(Job.status.in_(ACTIVE_STATUSES)).count() >= self.queue_limit:
+                _remove(input_path)
+                raise JobQueueFull(f"{self.queue_limit} jobs are already queued or running")
+
+            job = Job(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                status=QUEUED,
+                params=params,
+                dedupe_key=key,
+                active_key=key,
+                data_version=version,
+                input_path=input_path,
+                owner=self.owner,
+                heartbeat_at=datetime.now(timezone.utc),
+            )
+            db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another process queued the same job in the meantime
+                db.rollback()
+                existing = db.query(Job).filter(Job.active_key == key).first()
+                if existing is None:
+                    raise
+                _remove(input_path)
+                return existing
+            self._pool().submit(self._run, job.id, session_factory)
+        return job
+
+    def _update(self, session_factory: sessionmaker, job_id: str, **values) -> bool:
+        """Update a job this process still owns; False if it was failed as stale in the meantime"""
+        db = session_factory()
+        try:
+            updated = db.query(Job).filter(
+                Job.id == job_id, Job.owner == self.owner, Job.status.in_(ACTIVE_STATUSES)
+            ).update(dict(values, heartbeat_at=datetime.now(timezone.utc)), synchronize_session=False)
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+
+    def heartbeat(self, db: Session) -> int:
+        """Refresh the heartbeat of this process's active jobs, then fail other processes' stale ones"""
+        count = db.query(Job).filter(Job.owner == self.owner, Job.status.in_(ACTIVE_STATUSES)).update(
+            {Job.heartbeat_at: datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        db.commit()
+        fail_interrupted_jobs(db)
+        return count
+
+    def _run(self, job_id: str, session_factory: sessionmaker):
+        db = session_factory()
+        try:
+            job = db.get(Job, job_id)
+            kind, params, input_path = job.kind, job.params, job.input_path
+            db.rollback()  # The handler starts from a fresh transaction
+            try:
+                self._execute(db, session_factory, job_id, kind, params, input_path)
+            finally:
+                _remove(input_path)
+        except Exception:
+            logger.exception("Job %s could not be run", job_id)
+        finally:
+            db.close()
+
+    def _execute(self, db: Session, session_factory: sessionmaker, job_id: str, kind: str, params, input_path):
+        handler = JOB_HANDLERS[kind]
+        if not self._update(session_factory, job_id, status=RUNNING, started_at=datetime.now(timezone.utc)):
+            logger.warning("Job %s was failed as interrupted before it started", job_id)
+            return
+
+        output_path = partial_path = None
+        if handler.suffix:
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            output_path = os.path.join(self.artifact_dir, f"{job_id}{handler.suffix}")
+            # Written under a temporary name so a download never sees a partial file
+            partial_path = f"{output_path}.part"
+
+        def progress(values: Dict[str, Any]):
+            self._update(session_factory, job_id, progress=values)
+
+        try:
+            result = handler.run(db, params, input_path=input_path, output_path=partial_path, progress=progress)
+            if partial_path:
+                os.replace(partial_path, output_path)
+        except Exception as e:
+            db.rollback()
+            _remove(partial_path)
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            self._update(
+                session_factory, job_id,
+                status=FAILED, error=f"{type(e).__name__}: {e}", active_key=None,
+                finished_at=datetime.now(timezone.utc)
+            )
+            return
+
+        self._update(
+            session_factory, job_id,
+            status=SUCCEEDED,
+            result=result,
+            artifact_path=output_path,
+            media_type=handler.media_type,
+            active_key=None,
+            finished_at=datetime.now(timezone.utc),
+        )
+
+    def prune(self, db: Session) -> int:
+        """Delete finished jobs past the retention period, with their artifacts"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        expired = db.query(Job).filter(Job.status.notin_(ACTIVE_STATUSES), Job.finished_at < cutoff).all()
+        for job in expired:
+            _remove(job.artifact_path)
+            db.delete(job)
+        if expired:
+            db.commit()
+        return len(expired)
+
+
+def fail_interrupted_jobs(db: Session, stale_seconds: int = JOB_STALE_SECONDS) -> int:
+    """
+    Mark queued or running jobs whose owner stopped heartbeating as failed.
+
+    Jobs of live worker processes, including this one, keep a fresh
+    heartbeat and are left alone.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)
+    count = db.query(Job).filter(
+        Job.status.in_(ACTIVE_STATUSES), or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff)
+    ).update(
+        {
+            Job.status: FAILED,
+            Job.error: "Interrupted: the worker process stopped",
+            Job.active_key: None,
+            Job.finished_at: datetime.now(timezone.utc),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return count
+
+
+def _heartbeat(session_factory: sessionmaker):
+    with session_factory() as db:
+        job_runner.heartbeat(db)
+
+
+async def run_job_heartbeats(session_factory: sessionmaker, interval: int = JOB_HEARTBEAT_SECONDS):
+    """Background task: keep this process's jobs alive and fail the stale jobs of stopped processes"""
+    while interval > 0:
+        await asyncio.sleep(interval)
+        try:
+            await to_thread.run_sync(_heartbeat, session_factory)
+        except Exception:
+            logger.exception("Job heartbeat failed")
+
+
+job_runner = JobRunner()
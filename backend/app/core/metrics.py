@@ -0,0 +1,188 @@
+"""
+Request instrumentation
+Per-route latency histograms and SQL query counts, exported as Server-Timing headers and Prometheus text
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Log requests issuing more than this many queries, with their statements (0 = off)
+QUERY_COUNT_LOG_THRESHOLD = int(os.getenv("QUERY_COUNT_LOG_THRESHOLD", "0"))
+# Statements kept per request for the threshold log
+MAX_LOGGED_STATEMENTS = 50
+
+
+@dataclass
+class RequestStats:
+    """SQL activity of the request being served"""
+    query_count: int = 0
+    sql_time: float = 0.0
+    statements: List[str] = field(default_factory=list)
+
+
+# Set by the middleware; copied into the worker threads that run sync handlers
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("edm_request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("edm_query_start", []).append(time.perf_counter())
+
+
+def _record_query(conn, statement):
+    started = conn.info["edm_query_start"].pop()
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.query_count += 1
+    stats.sql_time += time.perf_counter() - started
+    if QUERY_COUNT_LOG_THRESHOLD and len(stats.statements) < MAX_LOGGED_STATEMENTS:
+        stats.statements.append(statement)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    # so it cannot pile up on the pooled connection or be paired with a later query
+    conn = context.connection
+    if conn is not None and conn.info.get("edm_query_start"):
+        _record_query(conn, context.statement)
+
+
+class _Series:
+    """Counters for one (method, route) pair"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.latency_sum = 0.0
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Thread-safe in-process store rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats):
+        with self._lock:
+            series = self._series.get((method, route))
+            if series is None:
+                series = self._series[(method, route)] = _Series()
+            index = bisect_left(LATENCY_BUCKETS, duration)
+            if index < len(LATENCY_BUCKETS):
+                series.bucket_counts[index] += 1
+            series.count += 1
+            series.latency_sum += duration
+            series.query_count += stats.query_count
+            series.sql_time += stats.sql_time
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        lines = [
+            "# HELP edm_http_requests_total HTTP requests by route and status.",
+            "# TYPE edm_http_requests_total counter",
+        ]
+        with self._lock:
+            series_items = sorted(self._series.items())
+            for (method, route), series in series_items:
+                for status, count in sorted(series.statuses.items()):
+                    lines.append(f'edm_http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+
+            lines += [
+                "# HELP edm_http_request_duration_seconds Request latency by route.",
+                "# TYPE edm_http_request_duration_seconds histogram",
+            ]
+            for (method, route), series in series_items:
+                labels = _labels(method, route)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, series.bucket_counts):
+                    cumulative += count
+                    lines.append(f'edm_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'edm_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+                lines.append(f"edm_http_request_duration_seconds_sum{{{labels}}} {series.latency_sum:.6f}")
+                lines.append(f"edm_http_request_duration_seconds_count{{{labels}}} {series.count}")
+
+            lines += [
+                "# HELP edm_db_queries_total SQL statements executed while serving requests.",
+                "# TYPE edm_db_queries_total counter",
+            ]
+            lines += [
+                f"edm_db_queries_total{{{_labels(method, route)}}} {series.query_count}"
+                for (method, route), series in series_items
+            ]
+            lines += [
+                "# HELP edm_db_query_seconds_total Time spent in SQL statements while serving requests.",
+                "# TYPE edm_db_query_seconds_total counter",
+            ]
+            lines += [
+                f"edm_db_query_seconds_total{{{_labels(method, route)}}} {series.sql_time:.6f}"
+                for (method, route), series in series_items
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _route_template(request) -> str:
+    """Route path template (e.g. /api/scores/{score_id}) to keep label cardinality bounded"""
+    route = request.scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+async def instrument_request(request, call_next):
+    """Time the request, count its SQL, add Server-Timing and record the metrics"""
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+    duration = time.perf_counter() - started
+
+    route = _route_template(request)
+    metrics_registry.observe(request.method, route, response.status_code, duration, stats)
+    response.headers["Server-Timing"] = (
+        f"app;dur={duration * 1000:.1f}, "
+        f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.query_count} queries"'
+    )
+
+    if QUERY_COUNT_LOG_THRESHOLD and stats.query_count > QUERY_COUNT_LOG_THRESHOLD:
+        logger.warning(
+            "%s %s issued %d queries (%.1f ms SQL):\n%s",
+            request.method, route, stats.query_count, stats.sql_time * 1000, "\n".join(stats.statements)
+        )
+    return response
@@ -3,7 +3,7 @@ SQLAlchemy models for the Employee Development Matrix
 Defines database schema for employees, training columns, scores, and settings
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -20,9 +20,19 @@ class Employee(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Data version of the last write to this row (see app/core/versions.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    # Sum of score levels, maintained by score writes (see app/core/aggregates.py)
+    total_score = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     scores = relationship("Score", back_populates="employee", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Keyset pagination by name and by total score
+        Index("ix_employees_name_id", "name", "id"),
+        Index("ix_employees_total_score_id", "total_score", "id"),
+    )
 
 class TrainingColumn(Base):
     """Training column model - represents training modules/skills"""
@@ -37,6 +47,8 @@ class TrainingColumn(Base):
     sort_order = Column(Integer, default=0)  # For column ordering
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Data version of the last write to this row (see app/core/versions.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0", index=True)
     
     # Relationships
     scores = relationship("Score", back_populates="training_column", cascade="all, delete-orphan")
@@ -44,6 +56,13 @@ class TrainingColumn(Base):
 class Score(Base):
     """Score model - represents employee progress on specific training"""
     __tablename__ = "scores"
+    __table_args__ = (
+        # One score per employee/training cell; also the conflict target for bulk
+        # upserts and the lookup path for employee_id filters (leading column)
+        Index("uq_scores_employee_column", "employee_id", "column_id", unique=True),
+        # Covers per-column lookups and level counts without touching the table
+        Index("ix_scores_column_level", "column_id", "level", "employee_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -51,12 +70,106 @@ class Score(Base):
     level = Column(Integer, nullable=False)  # 0=Not Trained, 1=In Progress, 2=Complete
     notes = Column(Text, nullable=True)
     updated_by = Column(String(100), nullable=True)  # Who updated this score
-    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Data version of the last write to this row (see app/core/versions.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0", index=True)
     
     # Relationships
     employee = relationship("Employee", back_populates="scores")
     training_column = relationship("TrainingColumn", back_populates="scores")
 
+class ScoreTombstone(Base):
+    """Marker left behind when a score is hard-deleted, for delta sync clients"""
+    __tablename__ = "score_tombstones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, nullable=False)
+    column_id = Column(String(50), nullable=False)
+    version = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ScoreEvent(Base):
+    """Append-only record of every score write, for point-in-time queries (see app/core/history.py)"""
+    __tablename__ = "score_events"
+    
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, nullable=False, index=True)
+    column_id = Column(String(50), nullable=False)
+    level = Column(Integer, nullable=True)  # None if the score was deleted
+    notes = Column(Text, nullable=True)
+    updated_by = Column(String(100), nullable=True)
+    version = Column(Integer, nullable=False, index=True)
+    recorded_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class ScoreSnapshot(Base):
+    """Full copy of the score table at a point in the event log"""
+    __tablename__ = "score_snapshots"
+    
+    id = Column(Integer, primary_key=True)
+    taken_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    last_event_id = Column(Integer, nullable=False, default=0)  # Events up to this id are included
+    score_count = Column(Integer, nullable=False, default=0)
+    # Captured scores that were written without events; history starts here
+    baseline = Column(Boolean, nullable=False, default=False)
+
+class ScoreSnapshotRow(Base):
+    """One cell of a score snapshot"""
+    __tablename__ = "score_snapshot_rows"
+    
+    snapshot_id = Column(Integer, ForeignKey("score_snapshots.id", ondelete="CASCADE"), primary_key=True)
+    employee_id = Column(Integer, primary_key=True)
+    column_id = Column(String(50), primary_key=True)
+    level = Column(Integer, nullable=False)
+    notes = Column(Text, nullable=True)
+    updated_by = Column(String(100), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+class EmployeeScoreSummary(Base):
+    """Per-employee score counts, maintained by score writes (see app/core/aggregates.py)"""
+    __tablename__ = "employee_score_summaries"
+    
+    employee_id = Column(Integer, ForeignKey("employees.id"), primary_key=True)
+    total_scores = Column(Integer, nullable=False, default=0)
+    level_0 = Column(Integer, nullable=False, default=0)
+    level_1 = Column(Integer, nullable=False, default=0)
+    level_2 = Column(Integer, nullable=False, default=0)
+    level_3 = Column(Integer, nullable=False, default=0)
+    level_4 = Column(Integer, nullable=False, default=0)
+    level_5 = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    
+    @property
+    def completion_rate(self) -> float:
+        return round(self.completed / self.total_scores * 100, 2) if self.total_scores else 0
+
+class ColumnScoreSummary(Base):
+    """Per-training-column score counts, maintained by score writes (see app/core/aggregates.py)"""
+    __tablename__ = "column_score_summaries"
+    
+    column_id = Column(String(50), ForeignKey("training_columns.id"), primary_key=True)
+    total_scores = Column(Integer, nullable=False, default=0)
+    level_0 = Column(Integer, nullable=False, default=0)
+    level_1 = Column(Integer, nullable=False, default=0)
+    level_2 = Column(Integer, nullable=False, default=0)
+    level_3 = Column(Integer, nullable=False, default=0)
+    level_4 = Column(Integer, nullable=False, default=0)
+    level_5 = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    
+    @property
+    def completion_rate(self) -> float:
+        return round(self.completed / self.total_scores * 100, 2) if self.total_scores else 0
+
+class ScoreDailyRollup(Base):
+    """Net change in score cells per day, department, column and level (see app/core/rollups.py)"""
+    __tablename__ = "score_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    department = Column(String(100), primary_key=True)  # "" for employees without a department
+    column_id = Column(String(50), primary_key=True)
+    level = Column(Integer, primary_key=True)
+    delta = Column(Integer, nullable=False, default=0)
+
 class Settings(Base):
     """Application settings model - stores customizable configuration"""
     __tablename__ = "settings"
@@ -66,6 +179,7 @@ class Settings(Base):
     value = Column(JSON, nullable=False)  # Store complex settings as JSON
     description = Column(Text, nullable=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Data version of the last write
 
 class User(Base):
     """User model - for authentication (simplified for demo)"""
@@ -76,3 +190,39 @@ class User(Base):
     role = Column(String(20), nullable=False, default="employee")  # admin, manager, employee
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Job(Base):
+    """Background export/import job, run by the in-process runner (see app/core/jobs.py)"""
+    __tablename__ = "jobs"
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    params = Column(JSON, nullable=False)
+    # Hash of kind, params and data version; identical requests share one job
+    dedupe_key = Column(String(64), nullable=False, index=True)
+    data_version = Column(Integer, nullable=False)
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    input_path = Column(String(500), nullable=True)  # Uploaded file, removed once the job finishes
+    artifact_path = Column(String(500), nullable=True)
+    media_type = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # Process running the job, which refreshes heartbeat_at while the job is active
+    owner = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    # The dedupe key while queued or running, NULL once finished: one active job per key
+    active_key = Column(String(64), nullable=True, unique=True, index=True)
+
+class VersionCounter(Base):
+    """Named monotonically increasing counters used for cheap change detection"""
+    __tablename__ = "version_counters"
+    
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+# Full-text search tables and triggers are created and dropped with this schema
+from . import search  # noqa: E402,F401
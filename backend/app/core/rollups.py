@@ -0,0 +1,330 @@
+"""
+Completion trend rollups
+Daily cell-count deltas per department, column and level, kept in step with score writes and summed into trends
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .bulk import BULK_CHUNK_SIZE, LOOKUP_CHUNK_SIZE, chunked, insert_ignore
+from .completion import category_weight, completion_rate, is_completed
+from .history import as_utc
+from .models import Employee, Score, ScoreDailyRollup, ScoreEvent, ScoreSnapshot, ScoreSnapshotRow, TrainingColumn
+from .schemas import AppSettings
+from .versions import STARTUP_LOCK, lock_counter
+
+# Department / category value for employees and columns without one
+UNASSIGNED = ""
+# Upper bound on the points of one trend query
+MAX_TREND_PERIODS = 1000
+# Events read per round trip during a backfill
+BACKFILL_BATCH_SIZE = 10000
+
+RollupKey = Tuple[date, str, str, int]  # (day, department, column_id, level)
+
+
+def rollup_day() -> date:
+    """Rollup rows are keyed by UTC day"""
+    return datetime.now(timezone.utc).date()
+
+
+def apply_rollup_deltas(db: Session, deltas: Dict[RollupKey, int]) -> None:
+    """Add ``deltas`` to the rollup rows, creating missing ones; runs in the caller's transaction"""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    table = ScoreDailyRollup.__table__
+    insert_ignore(db, table, [
+        {"day": day, "department": department, "column_id": column_id, "level": level, "delta": 0}
+        for day, department, column_id, level in deltas
+    ])
+    stmt = (
+        update(table)
+        .where(
+            table.c.day == bindparam("k_day"),
+            table.c.department == bindparam("k_department"),
+            table.c.column_id == bindparam("k_column_id"),
+            table.c.level == bindparam("k_level"),
+        )
+        .values(delta=table.c.delta + bindparam("d_delta"))
+    )
+    params = [
+        {"k_day": day, "k_department": department, "k_column_id": column_id, "k_level": level, "d_delta": delta}
+        for (day, department, column_id, level), delta in deltas.items()
+    ]
+    for chunk in chunked(params, BULK_CHUNK_SIZE):
+        db.execute(stmt, chunk)
+
+
+def _departments(db: Session, employee_ids: Iterable[int]) -> Dict[int, str]:
+    departments = {}
+    for chunk in chunked(set(employee_ids), LOOKUP_CHUNK_SIZE):
+        departments.update(
+            (employee_id, department or UNASSIGNED)
+            for employee_id, department in db.query(Employee.id, Employee.department).filter(Employee.id.in_(chunk))
+        )
+    return departments
+
+
+def rollup_score_changes(db: Session, changes) -> None:
+    """Count cell writes (``ScoreChange`` tuples) against today: the old level loses a cell, the new one gains it"""
+    changes = [change for change in changes if change.old_level != change.new_level]
+    if not changes:
+        return
+    departments = _departments(db, (change.employee_id for change in changes))
+    day = rollup_day()
+    deltas: Dict[RollupKey, int] = defaultdict(int)
+    for change in changes:
+        department = departments.get(change.employee_id, UNASSIGNED)
+        if change.old_level is not None:
+            deltas[(day, department, change.column_id, change.old_level)] -= 1
+        if change.new_level is not None:
+            deltas[(day, department, change.column_id, change.new_level)] += 1
+    apply_rollup_deltas(db, deltas)
+
+
+def rollup_department_change(
+    db: Session, employee_id: int, old_department: Optional[str], new_department: Optional[str]
+) -> None:
+    """Move an employee's cells from the old to the new department as of today"""
+    old_department, new_department = old_department or UNASSIGNED, new_department or UNASSIGNED
+    if old_department == new_department:
+        return
+    day = rollup_day()
+    deltas: Dict[RollupKey, int] = defaultdict(int)
+    for column_id, level, count in db.query(Score.column_id, Score.level, func.count()).filter(
+        Score.employee_id == employee_id
+    ).group_by(Score.column_id, Score.level):
+        deltas[(day, old_department, column_id, level)] -= count
+        deltas[(day, new_department, column_id, level)] += count
+    apply_rollup_deltas(db, deltas)
+
+
+def rollup_current_cells(db: Session, *employee_filters) -> None:
+    """Count the current cells of the matching employees as added today (for bulk loads)"""
+    day = rollup_day()
+    counts = db.query(
+        Employee.department, Score.column_id, Score.level, func.count()
+    ).join(Employee, Employee.id == Score.employee_id).filter(*employee_filters).group_by(
+        Employee.department, Score.column_id, Score.level
+    )
+    deltas: Dict[RollupKey, int] = defaultdict(int)
+    for department, column_id, level, count in counts:
+        deltas[(day, department or UNASSIGNED, column_id, level)] += count
+    apply_rollup_deltas(db, deltas)
+
+
+def backfill_rollups(db: Session) -> int:
+    """
+    Rebuild the rollups from the score history; returns the rows written.
+
+    Baseline snapshots and events are replayed in order, each cell change
+    dated by when it was recorded. The history has no departments, so
+    today's are used and employees that no longer exist are skipped. The
+    result is reconciled with the score table, so the rollups always sum to
+    the current cells. Runs in the caller's transaction.
+    """
+    db.execute(delete(ScoreDailyRollup.__table__))
+    departments = {
+        employee_id: department or UNASSIGNED
+        for employee_id, department in db.query(Employee.id, Employee.department)
+    }
+    columns = {column_id for (column_id,) in db.query(TrainingColumn.id)}
+    state: Dict[Tuple[int, str], int] = {}
+    deltas: Dict[RollupKey, int] = defaultdict(int)
+
+    def set_cell(employee_id: int, column_id: str, level: Optional[int], day: date):
+        key = (employee_id, column_id)
+        old_level = state.get(key)
+        if old_level == level or employee_id not in departments or column_id not in columns:
+            return
+        department = departments[employee_id]
+        if old_level is not None:
+            deltas[(day, department, column_id, old_level)] -= 1
+        if level is None:
+            del state[key]
+        else:
+            state[key] = level
+            deltas[(day, department, column_id, level)] += 1
+
+    def sync(cells: Dict[Tuple[int, str], int], day: date):
+        """Make the replayed state match a full copy of the score table"""
+        for key in [key for key in state if key not in cells]:
+            set_cell(*key, None, day)
+        for (employee_id, column_id), level in cells.items():
+            set_cell(employee_id, column_id, level, day)
+
+    baselines = db.query(ScoreSnapshot.id, ScoreSnapshot.last_event_id, ScoreSnapshot.taken_at).filter(
+        ScoreSnapshot.baseline == True
+    ).order_by(ScoreSnapshot.id).all()
+    events = iter(db.query(
+        ScoreEvent.id, ScoreEvent.employee_id, ScoreEvent.column_id, ScoreEvent.level, ScoreEvent.recorded_at
+    ).order_by(ScoreEvent.id).yield_per(BACKFILL_BATCH_SIZE))
+    pending = next(events, None)
+
+    for snapshot_id, last_event_id, taken_at in baselines + [(None, None, None)]:
+        while pending is not None and (last_event_id is None or pending.id <= last_event_id):
+            set_cell(pending.employee_id, pending.column_id, pending.level, as_utc(pending.recorded_at).date())
+            pending = next(events, None)
+        if snapshot_id is not None:
+            sync({
+                (employee_id, column_id): level
+                for employee_id, column_id, level in db.query(
+                    ScoreSnapshotRow.employee_id, ScoreSnapshotRow.column_id, ScoreSnapshotRow.level
+                ).filter(ScoreSnapshotRow.snapshot_id == snapshot_id)
+            }, as_utc(taken_at).date())
+
+    # Writes that left no events (e.g. cascaded deletes) are dated today
+    sync({
+        (employee_id, column_id): level
+        for employee_id, column_id, level in db.query(Score.employee_id, Score.column_id, Score.level)
+    }, rollup_day())
+
+    rows = [
+        {"day": day, "department": department, "column_id": column_id, "level": level, "delta": delta}
+        for (day, department, column_id, level), delta in deltas.items() if delta
+    ]
+    for chunk in chunked(rows, BULK_CHUNK_SIZE):
+        db.execute(insert(ScoreDailyRollup.__table__), chunk)
+    return len(rows)
+
+
+def ensure_rollups_backfilled(db: Session) -> Optional[int]:
+    """
+    Backfill once if scores exist but no rollups do (e.g. right after
+    upgrading); commits.
+
+    Safe to run from every worker: the backfill holds the startup lock and
+    checks again under it, and a worker that still collides with another's
+    rows treats the rollups as backfilled.
+    """
+    if db.query(ScoreDailyRollup.day).first() or not db.query(Score.id).first():
+        return None
+    db.rollback()
+    lock_counter(db, STARTUP_LOCK)
+    if db.query(ScoreDailyRollup.day).first():
+        db.rollback()
+        return None
+    try:
+        written = backfill_rollups(db)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return written
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period_start(period_start: date, granularity: str) -> date:
+    if granularity == "week":
+        return period_start + timedelta(days=7)
+    if granularity == "month":
+        return (period_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return period_start + timedelta(days=1)
+
+
+def trend_periods(start: date, end: date, granularity: str) -> List[Tuple[date, date]]:
+    """Calendar periods (weeks start on Monday) covering ``start``..``end``, clipped to the range"""
+    periods = []
+    period_start = _period_start(start, granularity)
+    while period_start <= end:
+        next_start = _next_period_start(period_start, granularity)
+        periods.append((max(period_start, start), min(next_start - timedelta(days=1), end)))
+        if len(periods) > MAX_TREND_PERIODS:
+            raise ValueError(f"The range spans more than {MAX_TREND_PERIODS} periods; use a coarser granularity")
+        period_start = next_start
+    return periods
+
+
+def completion_trend(
+    db: Session,
+    start: date,
+    end: date,
+    granularity: str = "week",
+    group_by: Optional[str] = None,
+    department: Optional[str] = None,
+    category: Optional[str] = None,
+    settings: Optional[AppSettings] = None,
+) -> List[dict]:
+    """
+    Cell counts and completion at the end of each period, summed from the rollups.
+
+    ``group_by`` is None, "department" or "category". Cells are completed
+    against the columns' current target levels, and the rate follows the
+    completion method in ``settings`` (default: every cell counts once),
+    as analytics and the summaries do.
+    The cost depends on the number of rollup rows (days x departments x
+    columns x levels), not on the size of the score table.
+    """
+    periods = trend_periods(start, end, granularity)
+    settings = settings or AppSettings()
+    columns = {
+        column_id: (column_category or UNASSIGNED, target_level, category_weight(settings, column_category))
+        for column_id, column_category, target_level in db.query(
+            TrainingColumn.id, TrainingColumn.category, TrainingColumn.target_level
+        )
+    }
+    filters = []
+    if department is not None:
+        filters.append(ScoreDailyRollup.department == department)
+    if category is not None:
+        columns = {column_id: column for column_id, column in columns.items() if column[0] == category}
+        filters.append(ScoreDailyRollup.column_id.in_(list(columns)))
+
+    totals: Dict[Optional[str], int] = defaultdict(int)
+    completed: Dict[Optional[str], int] = defaultdict(int)
+    weight_totals: Dict[Optional[str], float] = defaultdict(float)
+    weighted_completed: Dict[Optional[str], float] = defaultdict(float)
+
+    def add(row_department: str, column_id: str, level: int, count: int):
+        column = columns.get(column_id)
+        if column is None:
+            return
+        group = row_department if group_by == "department" else column[0] if group_by == "category" else None
+        totals[group] += count
+        weight_totals[group] += count * column[2]
+        if is_completed(level, column[1]):
+            completed[group] += count
+            weighted_completed[group] += count * column[2]
+
+    group_columns = (ScoreDailyRollup.department, ScoreDailyRollup.column_id, ScoreDailyRollup.level)
+    # Everything before the range collapses into one opening balance
+    for row in db.query(*group_columns, func.sum(ScoreDailyRollup.delta)).filter(
+        ScoreDailyRollup.day < start, *filters
+    ).group_by(*group_columns):
+        add(*row)
+
+    changes = iter(db.query(ScoreDailyRollup.day, *group_columns, func.sum(ScoreDailyRollup.delta)).filter(
+        ScoreDailyRollup.day >= start, ScoreDailyRollup.day <= end, *filters
+    ).group_by(ScoreDailyRollup.day, *group_columns).order_by(ScoreDailyRollup.day))
+    pending = next(changes, None)
+
+    points = []
+    for period_start, period_end in periods:
+        while pending is not None and pending[0] <= period_end:
+            add(*pending[1:])
+            pending = next(changes, None)
+        for group in sorted(totals, key=lambda value: value or ""):
+            if totals[group] <= 0:
+                continue
+            points.append({
+                "period_start": period_start,
+                "period_end": period_end,
+                "group": group,
+                "total": totals[group],
+                "completed": completed[group],
+                "completion_rate": completion_rate(weighted_completed[group], weight_totals[group]),
+            })
+    return points
@@ -5,7 +5,7 @@ Defines data models for API input/output
 
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 class UserRole(str, Enum):
@@ -44,6 +44,47 @@ class Employee(EmployeeBase):
     class Config:
         from_attributes = True
 
+class SkillCondition(BaseModel):
+    """Skill search condition: a level range on one column, or all / any / not of nested conditions"""
+    column_id: Optional[str] = None
+    min_level: int = Field(0, ge=0)  # 0 matches any score in the column
+    max_level: Optional[int] = Field(None, ge=0)
+    all: Optional[List["SkillCondition"]] = None
+    any: Optional[List["SkillCondition"]] = None
+    not_: Optional["SkillCondition"] = Field(None, alias="not")
+    
+    class Config:
+        populate_by_name = True
+
+class SkillSearchRequest(BaseModel):
+    """Schema for searching employees by skill levels"""
+    query: SkillCondition
+    department: Optional[str] = None
+    role: Optional[str] = None
+    include_inactive: bool = False
+    skip: int = Field(0, ge=0)
+    limit: int = Field(100, ge=1, le=1000)
+
+class SkillSearchResult(BaseModel):
+    """One page of employees matching a skill search, ordered by id"""
+    total: int
+    employees: List[Employee]
+
+class SimilarEmployee(BaseModel):
+    """An employee with a similar skill profile (cosine similarity of target-normalized levels)"""
+    employee: Employee
+    similarity: float
+
+class TrainingRecommendation(BaseModel):
+    """A training column suggested next, ranked by the employee's gap times how far similar employees got"""
+    column_id: str
+    title: str
+    category: Optional[str] = None
+    current_level: Optional[int] = None
+    target_level: int
+    gap: float
+    score: float
+
 # Training column schemas
 class TrainingColumnBase(BaseModel):
     """Base training column schema"""
@@ -94,6 +135,45 @@ class ScoreUpdate(BaseModel):
     notes: Optional[str] = None
     updated_by: Optional[str] = Field(None, max_length=100)
 
+class ScoreBulkUpsert(BaseModel):
+    """Schema for upserting many scores in one request"""
+    items: List[ScoreCreate] = Field(..., min_length=1, max_length=100000)
+
+class ScoreBulkItemStatus(str, Enum):
+    """Outcome of a single item in a bulk upsert"""
+    CREATED = "created"
+    UPDATED = "updated"
+    DUPLICATE = "duplicate"
+    ERROR = "error"
+
+class ScoreBulkItemResult(BaseModel):
+    """Per-item result of a bulk upsert"""
+    index: int
+    employee_id: int
+    column_id: str
+    status: ScoreBulkItemStatus
+    detail: Optional[str] = None
+
+class ScoreBulkResult(BaseModel):
+    """Summary and per-item results of a bulk upsert"""
+    created: int
+    updated: int
+    failed: int
+    results: List[ScoreBulkItemResult]
+
+class EmployeeSummary(BaseModel):
+    """Score counts and completion for one employee"""
+    employee_id: int
+    total_scores: int
+    completed: int
+    in_progress: int
+    not_trained: int
+    completion_rate: float
+
+class SummaryBatchRequest(BaseModel):
+    """Ids to fetch summaries for"""
+    ids: List[int] = Field(..., max_length=10000)
+
 class Score(ScoreBase):
     """Schema for score responses"""
     id: int
@@ -120,6 +200,53 @@ class MatrixData(BaseModel):
     columns: List[TrainingColumn]
     scores: List[MatrixCell]
     settings: Dict[str, Any]
+    version: int = 0  # Data version the payload reflects; pass to /changes as `since`
+
+class MatrixSort(str, Enum):
+    """Sort keys supported by the paginated matrix"""
+    NAME = "name"
+    TOTAL_SCORE = "total_score"
+
+class MatrixPage(BaseModel):
+    """One keyset page of matrix rows"""
+    employees: List[Employee]
+    columns: List[TrainingColumn]
+    scores: List[MatrixCell]  # Only cells for the employees on this page
+    next_cursor: Optional[str] = None  # Pass back as `cursor`; None on the last page
+    version: int = 0
+
+class ScoreKey(BaseModel):
+    """Identifies a single matrix cell"""
+    employee_id: int
+    column_id: str
+
+class MatrixChanges(BaseModel):
+    """Matrix rows changed since a data version"""
+    since: int
+    version: int
+    employees: List[Employee]  # Includes soft-deleted (is_active=False) rows
+    columns: List[TrainingColumn]  # Includes soft-deleted (is_active=False) rows
+    scores: List[MatrixCell]
+    deleted_scores: List[ScoreKey]
+    settings: Optional[Dict[str, Any]] = None  # Only present if settings changed
+
+class MatrixImportError(BaseModel):
+    """A rejected row or cell in a matrix import"""
+    row: int  # 1-based line number in the file (the header is row 1)
+    column: Optional[str] = None
+    message: str
+
+class MatrixImportResult(BaseModel):
+    """Progress and outcome of a matrix import"""
+    rows: int = 0
+    employees_created: int = 0
+    employees_updated: int = 0
+    scores_created: int = 0
+    scores_updated: int = 0
+    scores_unchanged: int = 0
+    unknown_columns: List[str] = Field(default_factory=list)
+    error_count: int = 0
+    errors: List[MatrixImportError] = Field(default_factory=list)  # First MAX_REPORTED_ERRORS only
 
 # Settings schemas
 class LevelConfig(BaseModel):
@@ -139,6 +266,7 @@ class AppSettings(BaseModel):
     theme: str = "light"  # light, dark
     default_target_level: int = 2
     completion_method: str = "average"  # average, weighted
+    category_weights: Dict[str, float] = Field(default_factory=dict)  # Used by "weighted"; missing categories weigh 1
     show_avatars: bool = True
     compact_view: bool = False
 
@@ -148,6 +276,7 @@ class SettingsUpdate(BaseModel):
     theme: Optional[str] = None
     default_target_level: Optional[int] = None
     completion_method: Optional[str] = None
+    category_weights: Optional[Dict[str, float]] = None
     show_avatars: Optional[bool] = None
     compact_view: Optional[bool] = None
 
@@ -187,3 +316,84 @@ class AnalyticsData(BaseModel):
     completion_rate: float
     top_skills: List[Dict[str, Any]]
     recent_activity: List[Dict[str, Any]]
+
+class TrendGranularity(str, Enum):
+    """Period length of completion trend points"""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class TrendGroupBy(str, Enum):
+    """Dimension completion trends can be split by"""
+    DEPARTMENT = "department"
+    CATEGORY = "category"
+
+class TrendPoint(BaseModel):
+    """Cell counts at the end of one period; group is None unless the trend is grouped"""
+    period_start: date
+    period_end: date
+    group: Optional[str] = None
+    total: int
+    completed: int
+    completion_rate: float
+
+class CompletionTrend(BaseModel):
+    """Completion over time, summed from the daily rollups"""
+    start: date
+    end: date
+    granularity: TrendGranularity
+    group_by: Optional[TrendGroupBy] = None
+    points: List[TrendPoint]
+
+# Search schemas
+class SearchHitType(str, Enum):
+    """What a full-text search hit matched"""
+    EMPLOYEE = "employee"  # name, role or department
+    SCORE_NOTE = "score_note"
+
+class SearchHit(BaseModel):
+    """One full-text search hit; column fields are set for score notes"""
+    type: SearchHitType
+    employee_id: int
+    employee_name: str
+    department: Optional[str] = None
+    column_id: Optional[str] = None
+    column_title: Optional[str] = None
+    level: Optional[int] = None
+    snippet: str  # Matched text with terms wrapped in [ and ]
+    rank: float  # Higher is more relevant
+
+class SearchResults(BaseModel):
+    """One page of full-text search hits, best first"""
+    total: int
+    results: List[SearchHit]
+
+# Background job schemas
+class ExportFormat(str, Enum):
+    """Artifact formats for export jobs"""
+    CSV = "csv"
+    JSON = "json"
+
+class ExportJobRequest(BaseModel):
+    """Schema for starting an export job"""
+    format: ExportFormat = ExportFormat.CSV
+    department: Optional[str] = None
+    role: Optional[str] = None
+
+class JobSchema(BaseModel):
+    """Status of a background job"""
+    id: str
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    data_version: int
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None  # Set once an artifact can be downloaded
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,253 @@
+"""
+Full-text search
+SQLite FTS5 tables (PostgreSQL: tsvector expression indexes) over employees and score notes
+"""
+
+import re
+from typing import List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .database import Base
+
+# FTS5 tables on SQLite; both use the base table as external content, so only
+# the token index is stored
+EMPLOYEE_FTS_TABLE = "employee_search"
+NOTE_FTS_TABLE = "score_note_search"
+# GIN expression indexes on PostgreSQL
+EMPLOYEE_SEARCH_INDEX = "ix_employees_search"
+NOTE_SEARCH_INDEX = "ix_scores_notes_search"
+# Schema objects managed here rather than by the models (skipped by Alembic autogenerate)
+SEARCH_SCHEMA_NAMES = (EMPLOYEE_FTS_TABLE, NOTE_FTS_TABLE, EMPLOYEE_SEARCH_INDEX, NOTE_SEARCH_INDEX)
+
+# Markers around matched terms in snippets
+HIGHLIGHT_START = "["
+HIGHLIGHT_END = "]"
+
+EMPLOYEE_HIT = "employee"
+NOTE_HIT = "score_note"
+
+_SQLITE_CREATE = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {EMPLOYEE_FTS_TABLE} USING fts5(
+        name, role, department, content='employees', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS employees_search_insert AFTER INSERT ON employees BEGIN
+        INSERT INTO {EMPLOYEE_FTS_TABLE}(rowid, name, role, department)
+        VALUES (new.id, new.name, new.role, new.department);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employees_search_delete AFTER DELETE ON employees BEGIN
+        INSERT INTO {EMPLOYEE_FTS_TABLE}({EMPLOYEE_FTS_TABLE}, rowid, name, role, department)
+        VALUES ('delete', old.id, old.name, old.role, old.department);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employees_search_update AFTER UPDATE OF name, role, department ON employees BEGIN
+        INSERT INTO {EMPLOYEE_FTS_TABLE}({EMPLOYEE_FTS_TABLE}, rowid, name, role, department)
+        VALUES ('delete', old.id, old.name, old.role, old.department);
+        INSERT INTO {EMPLOYEE_FTS_TABLE}(rowid, name, role, department)
+        VALUES (new.id, new.name, new.role, new.department);
+    END""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {NOTE_FTS_TABLE} USING fts5(
+        notes, content='scores', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    # Most cells have no notes; skipping them keeps bulk score loads cheap
+    f"""CREATE TRIGGER IF NOT EXISTS scores_search_insert AFTER INSERT ON scores
+    WHEN new.notes IS NOT NULL BEGIN
+        INSERT INTO {NOTE_FTS_TABLE}(rowid, notes) VALUES (new.id, new.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS scores_search_delete AFTER DELETE ON scores
+    WHEN old.notes IS NOT NULL BEGIN
+        INSERT INTO {NOTE_FTS_TABLE}({NOTE_FTS_TABLE}, rowid, notes) VALUES ('delete', old.id, old.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS scores_search_update AFTER UPDATE OF notes ON scores BEGIN
+        INSERT INTO {NOTE_FTS_TABLE}({NOTE_FTS_TABLE}, rowid, notes)
+        SELECT 'delete', old.id, old.notes WHERE old.notes IS NOT NULL;
+        INSERT INTO {NOTE_FTS_TABLE}(rowid, notes) SELECT new.id, new.notes WHERE new.notes IS NOT NULL;
+    END""",
+]
+
+_SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS employees_search_insert",
+    "DROP TRIGGER IF EXISTS employees_search_delete",
+    "DROP TRIGGER IF EXISTS employees_search_update",
+    "DROP TRIGGER IF EXISTS scores_search_insert",
+    "DROP TRIGGER IF EXISTS scores_search_delete",
+    "DROP TRIGGER IF EXISTS scores_search_update",
+    f"DROP TABLE IF EXISTS {EMPLOYEE_FTS_TABLE}",
+    f"DROP TABLE IF EXISTS {NOTE_FTS_TABLE}",
+]
+
+def _pg_employee_vector(alias: str = "") -> str:
+    prefix = f"{alias}." if alias else ""
+    return (
+        f"setweight(to_tsvector('simple', coalesce({prefix}name, '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce({prefix}role, '')), 'B') || "
+        f"setweight(to_tsvector('simple', coalesce({prefix}department, '')), 'C')"
+    )
+
+
+def _pg_note_vector(alias: str = "") -> str:
+    prefix = f"{alias}." if alias else ""
+    return f"to_tsvector('simple', coalesce({prefix}notes, ''))"
+
+
+# PostgreSQL needs no triggers: the indexes are on expressions of the base
+# tables, and queries repeat the same expressions so the planner uses them
+_PG_CREATE = [
+    f"CREATE INDEX IF NOT EXISTS {EMPLOYEE_SEARCH_INDEX} ON employees USING gin (({_pg_employee_vector()}))",
+    f"CREATE INDEX IF NOT EXISTS {NOTE_SEARCH_INDEX} ON scores USING gin (({_pg_note_vector()}))",
+]
+
+_PG_DROP = [
+    f"DROP INDEX IF EXISTS {EMPLOYEE_SEARCH_INDEX}",
+    f"DROP INDEX IF EXISTS {NOTE_SEARCH_INDEX}",
+]
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create the search tables and triggers (or indexes) if missing.
+
+    Idempotent. A newly created FTS5 table is filled from its base table,
+    so this also indexes existing data, and it restores the triggers after
+    a migration that rebuilt the employees or scores table.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        existing = {
+            name for (name,) in connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (:employees, :notes)"),
+                {"employees": EMPLOYEE_FTS_TABLE, "notes": NOTE_FTS_TABLE},
+            )
+        }
+        for statement in _SQLITE_CREATE:
+            connection.execute(text(statement))
+        for table in (EMPLOYEE_FTS_TABLE, NOTE_FTS_TABLE):
+            if table not in existing:
+                connection.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in _PG_CREATE:
+            connection.execute(text(statement))
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Drop the search tables and triggers (or indexes)"""
+    dialect = connection.dialect.name
+    statements = _SQLITE_DROP if dialect == "sqlite" else _PG_DROP if dialect == "postgresql" else []
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Re-tokenize everything from the base tables (SQLite; PostgreSQL indexes need no rebuild)"""
+    if connection.dialect.name == "sqlite":
+        create_search_index(connection)
+        for table in (EMPLOYEE_FTS_TABLE, NOTE_FTS_TABLE):
+            connection.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index_with_schema(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index_with_schema(target, connection, **kw):
+    drop_search_index(connection)
+
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _hits_sql(dialect: str, types: Tuple[str, ...], include_inactive: bool) -> str:
+    """A query of all hits with kind, ids, names, rank (higher is better) and the text to highlight"""
+    active = "" if include_inactive else " AND e.is_active"
+    parts = []
+    if dialect == "sqlite":
+        if EMPLOYEE_HIT in types:
+            parts.append(f"""
+                SELECT '{EMPLOYEE_HIT}' AS kind, e.id AS employee_id, e.name AS employee_name,
+                       e.department AS department, NULL AS column_id, NULL AS column_title, NULL AS level,
+                       -bm25({EMPLOYEE_FTS_TABLE}, 10.0, 4.0, 2.0) AS rank,
+                       snippet({EMPLOYEE_FTS_TABLE}, -1, :start, :end, '...', 12) AS snippet
+                FROM {EMPLOYEE_FTS_TABLE} JOIN employees e ON e.id = {EMPLOYEE_FTS_TABLE}.rowid
+                WHERE {EMPLOYEE_FTS_TABLE} MATCH :match{active}""")
+        if NOTE_HIT in types:
+            parts.append(f"""
+                SELECT '{NOTE_HIT}' AS kind, e.id AS employee_id, e.name AS employee_name,
+                       e.department AS department, c.id AS column_id, c.title AS column_title, s.level AS level,
+                       -bm25({NOTE_FTS_TABLE}) AS rank,
+                       snippet({NOTE_FTS_TABLE}, 0, :start, :end, '...', 12) AS snippet
+                FROM {NOTE_FTS_TABLE} JOIN scores s ON s.id = {NOTE_FTS_TABLE}.rowid
+                JOIN employees e ON e.id = s.employee_id JOIN training_columns c ON c.id = s.column_id
+                WHERE {NOTE_FTS_TABLE} MATCH :match AND c.is_active{active}""")
+    else:
+        if EMPLOYEE_HIT in types:
+            parts.append(f"""
+                SELECT '{EMPLOYEE_HIT}' AS kind, e.id AS employee_id, e.name AS employee_name,
+                       e.department AS department, NULL::varchar AS column_id, NULL::varchar AS column_title,
+                       NULL::integer AS level,
+                       ts_rank({_pg_employee_vector("e")}, q.query) AS rank,
+                       concat_ws(' ', e.name, e.role, e.department) AS body
+                FROM employees e, to_tsquery('simple', :match) AS q(query)
+                WHERE {_pg_employee_vector("e")} @@ q.query{active}""")
+        if NOTE_HIT in types:
+            parts.append(f"""
+                SELECT '{NOTE_HIT}' AS kind, e.id AS employee_id, e.name AS employee_name,
+                       e.department AS department, c.id AS column_id, c.title AS column_title, s.level AS level,
+                       ts_rank({_pg_note_vector("s")}, q.query) AS rank, s.notes AS body
+                FROM scores s JOIN employees e ON e.id = s.employee_id
+                JOIN training_columns c ON c.id = s.column_id, to_tsquery('simple', :match) AS q(query)
+                WHERE {_pg_note_vector("s")} @@ q.query AND c.is_active{active}""")
+    return " UNION ALL ".join(parts)
+
+
+def search(
+    db: Session,
+    query: str,
+    types: Tuple[str, ...] = (EMPLOYEE_HIT, NOTE_HIT),
+    include_inactive: bool = False,
+    skip: int = 0,
+    limit: int = 20,
+) -> Tuple[int, List[dict]]:
+    """
+    Ranked full-text search over employees and score notes.
+
+    Every word of ``query`` must match, as a prefix, so partial input works
+    for type-ahead. Returns the total number of hits and one page, best
+    first. Only SQLite and PostgreSQL are supported.
+    """
+    terms = _terms(query)
+    dialect = db.get_bind().dialect.name
+    if not terms or not types:
+        return 0, []
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        snippet = "snippet"
+        params = {"match": match, "start": HIGHLIGHT_START, "end": HIGHLIGHT_END}
+    elif dialect == "postgresql":
+        match = " & ".join(f"{term}:*" for term in terms)
+        snippet = (
+            "ts_headline('simple', body, to_tsquery('simple', :match), "
+            f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=24, MinWords=8')"
+        )
+        params = {"match": match}
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+    hits = _hits_sql(dialect, types, include_inactive)
+    rows = db.execute(text(f"""
+        WITH hits AS ({hits})
+        SELECT kind, employee_id, employee_name, department, column_id, column_title, level, rank,
+               {snippet} AS snippet, count(*) OVER () AS total
+        FROM hits ORDER BY rank DESC, employee_id, column_id LIMIT :limit OFFSET :skip
+    """), dict(params, limit=limit, skip=skip)).mappings().all()
+
+    if rows:
+        total = rows[0]["total"]
+    elif skip:
+        total = db.execute(text(f"WITH hits AS ({hits}) SELECT count(*) FROM hits"), params).scalar()
+    else:
+        total = 0
+    return total, [{key: value for key, value in row.items() if key != "total"} for row in rows]
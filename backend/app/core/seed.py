@@ -3,125 +3,255 @@ Database seeding functionality
 Populates the database with sample data for development and demo purposes
 """
 
+import io
 import json
 import os
-from sqlalchemy.orm import Session
-from .database import SessionLocal, engine
+from typing import Iterator, List, Optional, TextIO, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from .database import SessionLocal
 from .models import Employee, TrainingColumn, Score, Settings, User
 from .schemas import AppSettings
+from .aggregates import rebuild_summaries
+from .bulk import BULK_CHUNK_SIZE
+from .history import take_snapshot
+from .rollups import rollup_current_cells
+from .versions import DATA_VERSION, SETTINGS_VERSION, bump_version
 
-def get_sample_data():
-    """Get sample data from JSON file or return default data"""
-    seed_file = "/app/seed/sample_data.json"
-    
-    if os.path.exists(seed_file):
-        with open(seed_file, 'r') as f:
-            return json.load(f)
-    
-    # Default sample data if file doesn't exist
+SEED_FILE = os.getenv("SEED_FILE", "/app/seed/sample_data.json")
+# Characters read from the seed file at a time
+SEED_READ_SIZE = 64 * 1024
+
+# Default sample data if the seed file doesn't exist
+DEFAULT_SAMPLE_DATA = {
+    "employees": [
+        {"id": 1, "name": "Alexandra Mattson", "role": "Software Engineer", "dept": "Engineering", "avatar": "/avatars/a1.png"},
+        {"id": 2, "name": "Aaron Katou", "role": "Business Analyst", "dept": "Product"},
+        {"id": 3, "name": "Sarah Johnson", "role": "UX Designer", "dept": "Design", "avatar": "/avatars/sarah.jpg"},
+        {"id": 4, "name": "Michael Chen", "role": "Data Scientist", "dept": "Engineering", "avatar": "/avatars/michael.jpg"},
+        {"id": 5, "name": "Emily Rodriguez", "role": "Product Manager", "dept": "Product", "avatar": "/avatars/emily.jpg"},
+        {"id": 6, "name": "David Wilson", "role": "DevOps Engineer", "dept": "Engineering"},
+        {"id": 7, "name": "Lisa Thompson", "role": "Marketing Manager", "dept": "Marketing", "avatar": "/avatars/lisa.jpg"},
+        {"id": 8, "name": "James Brown", "role": "QA Engineer", "dept": "Engineering"},
+        {"id": 9, "name": "Maria Garcia", "role": "HR Specialist", "dept": "Human Resources", "avatar": "/avatars/maria.jpg"},
+        {"id": 10, "name": "Robert Taylor", "role": "Sales Director", "dept": "Sales"},
+        {"id": 11, "name": "Jennifer Lee", "role": "Frontend Developer", "dept": "Engineering", "avatar": "/avatars/jennifer.jpg"},
+        {"id": 12, "name": "Christopher Davis", "role": "Backend Developer", "dept": "Engineering"}
+    ],
+    "columns": [
+        {"id": "c1", "title": "Python Programming", "category": "Technical", "targetLevel": 2},
+        {"id": "c2", "title": "Leadership Skills", "category": "Leadership", "targetLevel": 2},
+        {"id": "c3", "title": "Agile Methodology", "category": "Process", "targetLevel": 2},
+        {"id": "c4", "title": "Data Analysis", "category": "Technical", "targetLevel": 2},
+        {"id": "c5", "title": "Communication", "category": "Soft Skills", "targetLevel": 2}
+    ],
+    "scores": [
+        {"employeeId": 1, "columnId": "c1", "level": 2, "notes": "Completed advanced Python course", "updatedBy": "admin"},
+        {"employeeId": 1, "columnId": "c2", "level": 1, "notes": "Attended leadership workshop", "updatedBy": "manager"},
+        {"employeeId": 1, "columnId": "c3", "level": 2, "notes": "Certified Scrum Master", "updatedBy": "admin"},
+        {"employeeId": 2, "columnId": "c1", "level": 0, "notes": "", "updatedBy": "admin"},
+        {"employeeId": 2, "columnId": "c2", "level": 2, "notes": "Natural leader", "updatedBy": "manager"},
+        {"employeeId": 2, "columnId": "c3", "level": 1, "notes": "Learning agile practices", "updatedBy": "manager"},
+        {"employeeId": 3, "columnId": "c1", "level": 1, "notes": "Learning Python for data visualization", "updatedBy": "manager"},
+        {"employeeId": 3, "columnId": "c2", "level": 2, "notes": "Excellent team leadership", "updatedBy": "admin"},
+        {"employeeId": 3, "columnId": "c3", "level": 2, "notes": "Agile expert", "updatedBy": "admin"},
+        {"employeeId": 4, "columnId": "c1", "level": 2, "notes": "Python expert", "updatedBy": "admin"},
+        {"employeeId": 4, "columnId": "c2", "level": 1, "notes": "Developing leadership skills", "updatedBy": "manager"},
+        {"employeeId": 4, "columnId": "c4", "level": 2, "notes": "Data analysis specialist", "updatedBy": "admin"},
+        {"employeeId": 5, "columnId": "c2", "level": 2, "notes": "Strong product leadership", "updatedBy": "admin"},
+        {"employeeId": 5, "columnId": "c3", "level": 2, "notes": "Agile product management", "updatedBy": "admin"},
+        {"employeeId": 5, "columnId": "c5", "level": 2, "notes": "Excellent communication", "updatedBy": "manager"},
+        {"employeeId": 6, "columnId": "c1", "level": 2, "notes": "Python for automation", "updatedBy": "admin"},
+        {"employeeId": 6, "columnId": "c3", "level": 2, "notes": "DevOps agile practices", "updatedBy": "admin"},
+        {"employeeId": 7, "columnId": "c2", "level": 2, "notes": "Marketing leadership", "updatedBy": "admin"},
+        {"employeeId": 7, "columnId": "c5", "level": 2, "notes": "Strong communication skills", "updatedBy": "manager"},
+        {"employeeId": 8, "columnId": "c1", "level": 1, "notes": "Learning Python for testing", "updatedBy": "manager"},
+        {"employeeId": 8, "columnId": "c3", "level": 2, "notes": "QA agile processes", "updatedBy": "admin"},
+        {"employeeId": 9, "columnId": "c2", "level": 2, "notes": "HR leadership", "updatedBy": "admin"},
+        {"employeeId": 9, "columnId": "c5", "level": 2, "notes": "Excellent people skills", "updatedBy": "manager"},
+        {"employeeId": 10, "columnId": "c2", "level": 2, "notes": "Sales leadership", "updatedBy": "admin"},
+        {"employeeId": 10, "columnId": "c5", "level": 2, "notes": "Strong sales communication", "updatedBy": "manager"},
+        {"employeeId": 11, "columnId": "c1", "level": 2, "notes": "Python for frontend tools", "updatedBy": "admin"},
+        {"employeeId": 11, "columnId": "c3", "level": 1, "notes": "Learning agile frontend practices", "updatedBy": "manager"},
+        {"employeeId": 12, "columnId": "c1", "level": 2, "notes": "Python backend expert", "updatedBy": "admin"},
+        {"employeeId": 12, "columnId": "c3", "level": 2, "notes": "Agile backend development", "updatedBy": "admin"},
+        {"employeeId": 12, "columnId": "c4", "level": 1, "notes": "Learning data analysis", "updatedBy": "manager"}
+    ]
+}
+
+
+def iter_seed_records(stream: TextIO, read_size: int = SEED_READ_SIZE) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield ``(section, record)`` pairs from ``{"section": [record, ...], ...}``.
+
+    The document is decoded incrementally, so memory use is bounded by the
+    largest single record rather than by the file size. Non-list sections
+    are skipped.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = stream.read(read_size) if not eof else ""
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    def expect(chars: str) -> str:
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] not in chars:
+            found = buffer[pos] if pos < len(buffer) else "end of file"
+            raise ValueError(f"Invalid seed file: expected one of {chars!r}, found {found!r}")
+        pos += 1
+        return buffer[pos - 1]
+
+    def peek() -> str:
+        skip_whitespace()
+        return buffer[pos] if pos < len(buffer) else ""
+
+    def decode():
+        nonlocal pos
+        skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(buffer) and fill():
+                continue
+            pos = end
+            return value
+
+    expect("{")
+    if peek() == "}":
+        return
+    while True:
+        section = decode()
+        expect(":")
+        if peek() == "[":
+            expect("[")
+            if peek() == "]":
+                expect("]")
+            else:
+                while True:
+                    yield section, decode()
+                    if expect(",]") == "]":
+                        break
+        else:
+            decode()
+        if expect(",}") == "}":
+            return
+
+
+def _employee_row(data: dict) -> dict:
     return {
-        "employees": [
-            {"id": 1, "name": "Alexandra Mattson", "role": "Software Engineer", "dept": "Engineering", "avatar": "/avatars/a1.png"},
-            {"id": 2, "name": "Aaron Katou", "role": "Business Analyst", "dept": "Product"},
-            {"id": 3, "name": "Sarah Johnson", "role": "UX Designer", "dept": "Design", "avatar": "/avatars/sarah.jpg"},
-            {"id": 4, "name": "Michael Chen", "role": "Data Scientist", "dept": "Engineering", "avatar": "/avatars/michael.jpg"},
-            {"id": 5, "name": "Emily Rodriguez", "role": "Product Manager", "dept": "Product", "avatar": "/avatars/emily.jpg"},
-            {"id": 6, "name": "David Wilson", "role": "DevOps Engineer", "dept": "Engineering"},
-            {"id": 7, "name": "Lisa Thompson", "role": "Marketing Manager", "dept": "Marketing", "avatar": "/avatars/lisa.jpg"},
-            {"id": 8, "name": "James Brown", "role": "QA Engineer", "dept": "Engineering"},
-            {"id": 9, "name": "Maria Garcia", "role": "HR Specialist", "dept": "Human Resources", "avatar": "/avatars/maria.jpg"},
-            {"id": 10, "name": "Robert Taylor", "role": "Sales Director", "dept": "Sales"},
-            {"id": 11, "name": "Jennifer Lee", "role": "Frontend Developer", "dept": "Engineering", "avatar": "/avatars/jennifer.jpg"},
-            {"id": 12, "name": "Christopher Davis", "role": "Backend Developer", "dept": "Engineering"}
-        ],
-        "columns": [
-            {"id": "c1", "title": "Python Programming", "category": "Technical", "targetLevel": 2},
-            {"id": "c2", "title": "Leadership Skills", "category": "Leadership", "targetLevel": 2},
-            {"id": "c3", "title": "Agile Methodology", "category": "Process", "targetLevel": 2},
-            {"id": "c4", "title": "Data Analysis", "category": "Technical", "targetLevel": 2},
-            {"id": "c5", "title": "Communication", "category": "Soft Skills", "targetLevel": 2}
-        ],
-        "scores": [
-            {"employeeId": 1, "columnId": "c1", "level": 2, "notes": "Completed advanced Python course", "updatedBy": "admin"},
-            {"employeeId": 1, "columnId": "c2", "level": 1, "notes": "Attended leadership workshop", "updatedBy": "manager"},
-            {"employeeId": 1, "columnId": "c3", "level": 2, "notes": "Certified Scrum Master", "updatedBy": "admin"},
-            {"employeeId": 2, "columnId": "c1", "level": 0, "notes": "", "updatedBy": "admin"},
-            {"employeeId": 2, "columnId": "c2", "level": 2, "notes": "Natural leader", "updatedBy": "manager"},
-            {"employeeId": 2, "columnId": "c3", "level": 1, "notes": "Learning agile practices", "updatedBy": "manager"},
-            {"employeeId": 3, "columnId": "c1", "level": 1, "notes": "Learning Python for data visualization", "updatedBy": "manager"},
-            {"employeeId": 3, "columnId": "c2", "level": 2, "notes": "Excellent team leadership", "updatedBy": "admin"},
-            {"employeeId": 3, "columnId": "c3", "level": 2, "notes": "Agile expert", "updatedBy": "admin"},
-            {"employeeId": 4, "columnId": "c1", "level": 2, "notes": "Python expert", "updatedBy": "admin"},
-            {"employeeId": 4, "columnId": "c2", "level": 1, "notes": "Developing leadership skills", "updatedBy": "manager"},
-            {"employeeId": 4, "columnId": "c4", "level": 2, "notes": "Data analysis specialist", "updatedBy": "admin"},
-            {"employeeId": 5, "columnId": "c2", "level": 2, "notes": "Strong product leadership", "updatedBy": "admin"},
-            {"employeeId": 5, "columnId": "c3", "level": 2, "notes": "Agile product management", "updatedBy": "admin"},
-            {"employeeId": 5, "columnId": "c5", "level": 2, "notes": "Excellent communication", "updatedBy": "manager"},
-            {"employeeId": 6, "columnId": "c1", "level": 2, "notes": "Python for automation", "updatedBy": "admin"},
-            {"employeeId": 6, "columnId": "c3", "level": 2, "notes": "DevOps agile practices", "updatedBy": "admin"},
-            {"employeeId": 7, "columnId": "c2", "level": 2, "notes": "Marketing leadership", "updatedBy": "admin"},
-            {"employeeId": 7, "columnId": "c5", "level": 2, "notes": "Strong communication skills", "updatedBy": "manager"},
-            {"employeeId": 8, "columnId": "c1", "level": 1, "notes": "Learning Python for testing", "updatedBy": "manager"},
-            {"employeeId": 8, "columnId": "c3", "level": 2, "notes": "QA agile processes", "updatedBy": "admin"},
-            {"employeeId": 9, "columnId": "c2", "level": 2, "notes": "HR leadership", "updatedBy": "admin"},
-            {"employeeId": 9, "columnId": "c5", "level": 2, "notes": "Excellent people skills", "updatedBy": "manager"},
-            {"employeeId": 10, "columnId": "c2", "level": 2, "notes": "Sales leadership", "updatedBy": "admin"},
-            {"employeeId": 10, "columnId": "c5", "level": 2, "notes": "Strong sales communication", "updatedBy": "manager"},
-            {"employeeId": 11, "columnId": "c1", "level": 2, "notes": "Python for frontend tools", "updatedBy": "admin"},
-            {"employeeId": 11, "columnId": "c3", "level": 1, "notes": "Learning agile frontend practices", "updatedBy": "manager"},
-            {"employeeId": 12, "columnId": "c1", "level": 2, "notes": "Python backend expert", "updatedBy": "admin"},
-            {"employeeId": 12, "columnId": "c3", "level": 2, "notes": "Agile backend development", "updatedBy": "admin"},
-            {"employeeId": 12, "columnId": "c4", "level": 1, "notes": "Learning data analysis", "updatedBy": "manager"}
-        ]
+        "id": data["id"],
+        "name": data["name"],
+        "role": data["role"],
+        "department": data.get("dept"),
+        "avatar": data.get("avatar"),
     }
 
-async def seed_database():
-    """Seed the database with sample data"""
-    db = SessionLocal()
+
+def _column_row(data: dict) -> dict:
+    return {
+        "id": data["id"],
+        "title": data["title"],
+        "category": data.get("category"),
+        "target_level": data.get("targetLevel", 2),
+    }
+
+
+def _score_row(data: dict) -> dict:
+    return {
+        "employee_id": data["employeeId"],
+        "column_id": data["columnId"],
+        "level": data["level"],
+        "notes": data.get("notes", ""),
+        "updated_by": data.get("updatedBy", "admin"),
+    }
+
+
+SEED_SECTIONS = {
+    "employees": (Employee.__table__, _employee_row),
+    "columns": (TrainingColumn.__table__, _column_row),
+    "scores": (Score.__table__, _score_row),
+}
+
+
+def load_seed_records(db: Session, records: Iterator[Tuple[str, dict]]) -> dict:
+    """Bulk insert streamed seed records in batches; returns rows inserted per section"""
+    counts = {section: 0 for section in SEED_SECTIONS}
+    batch: List[dict] = []
+    batch_section = None
+
+    def flush():
+        if batch:
+            db.execute(insert(SEED_SECTIONS[batch_section][0]), batch)
+            counts[batch_section] += len(batch)
+            batch.clear()
+
+    for section, record in records:
+        if section not in SEED_SECTIONS:
+            continue
+        if section != batch_section or len(batch) >= BULK_CHUNK_SIZE:
+            flush()
+            batch_section = section
+        batch.append(SEED_SECTIONS[section][1](record))
+    flush()
+    return counts
+
+
+def _open_seed_source(path: Optional[str]) -> TextIO:
+    path = path or SEED_FILE
+    if os.path.exists(path):
+        return open(path, "r", encoding="utf-8")
+    return io.StringIO(json.dumps(DEFAULT_SAMPLE_DATA))
+
+
+def seed_database(session_factory: sessionmaker = SessionLocal, path: Optional[str] = None) -> bool:
+    """
+    Seed an empty database with sample data in one transaction.
+
+    Returns False without writing if employees already exist, including when
+    another worker seeds at the same time and its inserts win.
+    """
+    db = session_factory()
     
     try:
         # Check if data already exists
-        existing_employees = db.query(Employee).count()
-        if existing_employees > 0:
+        if db.query(Employee.id).first() is not None:
             print("Database already seeded, skipping...")
-            return
+            return False
         
         print("Seeding database with sample data...")
         
-        # Get sample data
-        data = get_sample_data()
-        
-        # Create employees
-        for emp_data in data["employees"]:
-            employee = Employee(
-                id=emp_data["id"],
-                name=emp_data["name"],
-                role=emp_data["role"],
-                department=emp_data.get("dept"),
-                avatar=emp_data.get("avatar")
-            )
-            db.add(employee)
+        with _open_seed_source(path) as stream:
+            counts = load_seed_records(db, iter_seed_records(stream))
         
-        # Create training columns
-        for col_data in data["columns"]:
-            column = TrainingColumn(
-                id=col_data["id"],
-                title=col_data["title"],
-                category=col_data["category"],
-                target_level=col_data["targetLevel"]
-            )
-            db.add(column)
-        
-        # Create scores
-        for score_data in data["scores"]:
-            score = Score(
-                employee_id=score_data["employeeId"],
-                column_id=score_data["columnId"],
-                level=score_data["level"],
-                notes=score_data.get("notes", ""),
-                updated_by=score_data.get("updatedBy", "admin")
-            )
-            db.add(score)
+        # Summaries, totals, trend rollups and a history baseline for the seeded scores
+        rebuild_summaries(db)
+        rollup_current_cells(db)
+        take_snapshot(db, baseline=True)
         
         # Create default settings
         default_settings = AppSettings()
@@ -131,6 +261,8 @@ async def seed_database():
             description="Default application settings"
         )
         db.add(settings_record)
+        bump_version(db, SETTINGS_VERSION)
+        bump_version(db, DATA_VERSION)
         
         # Create default users
         users = [
@@ -142,8 +274,19 @@ async def seed_database():
             db.add(user)
         
         db.commit()
-        print("Database seeded successfully!")
+        print(
+            f"Database seeded successfully! ({counts['employees']} employees, "
+            f"{counts['columns']} columns, {counts['scores']} scores)"
+        )
+        return True
         
+    except IntegrityError:
+        db.rollback()
+        # Another worker seeded concurrently and committed first
+        if db.query(Employee.id).first() is not None:
+            print("Database already seeded, skipping...")
+            return False
+        raise
     except Exception as e:
         print(f"Error seeding database: {e}")
         db.rollback()
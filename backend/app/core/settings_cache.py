@@ -0,0 +1,83 @@
+"""
+In-process settings cache
+Holds the validated AppSettings and revalidates against the settings version counter
+"""
+
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from .models import Settings
+from .schemas import AppSettings
+from .versions import SETTINGS_VERSION, get_version
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_KEY = "app_settings"
+
+
+class CachedSettings(NamedTuple):
+    """Snapshot of the settings row at a given version"""
+    version: int
+    value: Optional[Dict[str, Any]]  # Raw stored JSON, None if no row exists
+    settings: AppSettings  # Validated settings (defaults if no row exists)
+
+
+class SettingsCache:
+    """
+    Process-wide cache of the ``app_settings`` row.
+
+    Each lookup reads only the settings version counter; the JSON row is
+    re-read and re-validated when the version moved (a write in this or any
+    other worker) or after ``invalidate``. Cached values are shared and must
+    be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # engine -> CachedSettings
+
+    def get(self, db: Session) -> CachedSettings:
+        bind = db.get_bind()
+        version = get_version(db, SETTINGS_VERSION)
+        entry = self._entries.get(bind)
+        if entry is not None and entry.version == version:
+            return entry
+
+        entry = self._load(db, version)
+        with self._lock:
+            self._entries[bind] = entry
+        return entry
+
+    def invalidate(self):
+        """Drop all cached settings; called by settings writers after commit"""
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _load(db: Session, version: int) -> CachedSettings:
+        record = db.query(Settings).filter(Settings.key == SETTINGS_KEY).first()
+        value = record.value if record else None
+        if not value:
+            return CachedSettings(version, value, AppSettings())
+        try:
+            settings = AppSettings(**value)
+        except ValueError as e:
+            logger.warning("Stored settings are invalid, using defaults: %s", e)
+            settings = AppSettings()
+        return CachedSettings(version, value, settings)
+
+
+settings_cache = SettingsCache()
+
+
+def get_app_settings(db: Session) -> AppSettings:
+    """Validated application settings (defaults if none are stored)"""
+    return settings_cache.get(db).settings
+
+
+def get_stored_settings(db: Session) -> Optional[Dict[str, Any]]:
+    """Raw stored settings JSON, or None if no settings row exists"""
+    return settings_cache.get(db).value
@@ -0,0 +1,317 @@
+"""
+Skill similarity
+Dense employee x column progress matrix for similar-employee and next-training suggestions
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .completion import DEFAULT_TARGET_LEVEL
+from .models import Employee, Score, ScoreEvent, ScoreSnapshot, TrainingColumn
+from .versions import DATA_VERSION, get_version
+
+logger = logging.getLogger(__name__)
+
+# Employees compared against the whole matrix per matrix product; bounds the
+# (batch x employees) similarity block held in memory at once
+SIMILARITY_BATCH_SIZE = int(os.getenv("SIMILARITY_BATCH_SIZE", "256"))
+# Neighbours whose profiles drive recommendations
+RECOMMENDATION_NEIGHBOURS = int(os.getenv("RECOMMENDATION_NEIGHBOURS", "20"))
+# Catching up on more events than this rebuilds the matrix instead
+SIMILARITY_MAX_REPLAY = int(os.getenv("SIMILARITY_MAX_REPLAY", "100000"))
+
+# Stored level of an unscored cell
+MISSING = -1
+# Spare rows allocated when employees are added, as a share of the current size
+ROW_HEADROOM = 0.25
+
+
+class Neighbour(NamedTuple):
+    """An employee with a similar skill profile"""
+    employee_id: int
+    similarity: float
+
+
+class Recommendation(NamedTuple):
+    """A training column worth assigning next"""
+    column_id: str
+    current_level: Optional[int]
+    target_level: int
+    gap: float  # Share of the target still missing, 0..1
+    score: float  # gap x how far similar employees got (higher first)
+
+
+def progress(levels: np.ndarray, targets: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """
+    Levels normalized against their columns' target levels, capped at 1.
+
+    Unscored cells and inactive columns are 0; a target of 0 counts any
+    score as complete. Arguments broadcast like ``levels / targets``.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(targets > 0, levels / np.maximum(targets, 1), 1.0)
+    return np.where((levels != MISSING) & active, np.minimum(ratio, 1.0), 0.0).astype(np.float32)
+
+
+class SkillMatrix:
+    """
+    Employee x column matrix of target-normalized levels, cached per process.
+
+    Rows cover every employee and columns every training column, with
+    inactive ones masked out. ``refresh`` compares the data version and
+    patches only what changed since: new or edited employees and columns
+    and the cells named by score events. A new baseline snapshot or a long
+    backlog rebuilds it. Memory is about 5 bytes per cell (int8 levels plus
+    float32 progress), e.g. 250 MB at 50k x 1k.
+
+    Refresh it from primary sessions only. A lagging replica's older data
+    version would force a rebuild, and a copy per engine (as the skill index
+    keeps) would double the memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything; the next refresh rebuilds"""
+        self.version = -1
+        self.baseline_id: Optional[int] = None
+        self.rows: Dict[int, int] = {}  # employee_id -> row
+        self.employee_ids = np.zeros(0, dtype=np.int64)  # row -> employee_id
+        self.active = np.zeros(0, dtype=bool)
+        self.columns: Dict[str, int] = {}  # column_id -> column
+        self.column_ids: List[str] = []
+        self.targets = np.zeros(0, dtype=np.int64)
+        self.column_active = np.zeros(0, dtype=bool)
+        # Rows beyond len(self.rows) are spare capacity
+        self.levels = np.full((0, 0), MISSING, dtype=np.int8)
+        self.progress = np.zeros((0, 0), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+
+    # Maintenance
+
+    def refresh(self, db: Session) -> None:
+        """Bring the matrix up to the current data version"""
+        with self._lock:
+            self._refresh(db)
+
+    def _refresh(self, db: Session) -> None:
+        version = get_version(db, DATA_VERSION)
+        if version == self.version:
+            return
+        baseline_id = db.query(func.max(ScoreSnapshot.id)).filter(ScoreSnapshot.baseline == True).scalar()
+        if self.version < 0 or version < self.version or baseline_id != self.baseline_id:
+            self._build(db, version, baseline_id)
+            return
+
+        events = db.query(ScoreEvent.employee_id, ScoreEvent.column_id, ScoreEvent.level).filter(
+            ScoreEvent.version > self.version, ScoreEvent.version <= version
+        ).order_by(ScoreEvent.id).limit(SIMILARITY_MAX_REPLAY + 1).all()
+        if len(events) > SIMILARITY_MAX_REPLAY:
+            self._build(db, version, baseline_id)
+            return
+        self._set_columns(db.query(TrainingColumn.id, TrainingColumn.target_level, TrainingColumn.is_active).filter(
+            TrainingColumn.version > self.version, TrainingColumn.version <= version
+        ).all())
+        self._set_employees(db.query(Employee.id, Employee.is_active).filter(
+            Employee.version > self.version, Employee.version <= version
+        ).all())
+        # Only the last write to each cell matters
+        self._set_cells({(employee_id, column_id): level for employee_id, column_id, level in events})
+        self.version = version
+
+    def _build(self, db: Session, version: int, baseline_id: Optional[int]) -> None:
+        self.reset()
+        self._set_columns(db.query(TrainingColumn.id, TrainingColumn.target_level, TrainingColumn.is_active).all())
+        self._set_employees(db.query(Employee.id, Employee.is_active).order_by(Employee.id).all())
+        # One query per column, read in (column, level) index order and assigned as whole arrays
+        row_of = np.full(int(self.employee_ids[:len(self.rows)].max(initial=0)) + 1, -1, dtype=np.int64)
+        row_of[self.employee_ids[:len(self.rows)]] = np.arange(len(self.rows))
+        for column_id, column in self.columns.items():
+            cells = np.array(
+                db.query(Score.employee_id, Score.level).filter(Score.column_id == column_id).all(), dtype=np.int64
+            ).reshape(-1, 2)
+            rows = row_of[cells[:, 0]]
+            known = rows >= 0
+            self.levels[rows[known], column] = cells[known, 1]
+        self._recompute(range(len(self.columns)))
+        self.version, self.baseline_id = version, baseline_id
+        logger.info("Built skill matrix at data version %s (%s x %s)", version, len(self.rows), len(self.columns))
+
+    def _set_columns(self, columns: Sequence[Tuple[str, Optional[int], Optional[bool]]]) -> None:
+        """Add or update (id, target_level, is_active) columns"""
+        if not columns:
+            return
+        added = [column_id for column_id, _, _ in columns if column_id not in self.columns]
+        if added:
+            # Columns are added rarely, so the matrices stay exactly as wide as needed
+            width = len(self.columns) + len(added)
+            for column_id in added:
+                self.columns[column_id] = len(self.column_ids)
+                self.column_ids.append(column_id)
+            self.levels = np.pad(self.levels, ((0, 0), (0, len(added))), constant_values=MISSING)
+            self.progress = np.pad(self.progress, ((0, 0), (0, len(added))))
+            self.targets = np.resize(self.targets, width)
+            self.column_active = np.resize(self.column_active, width)
+        indexes = [self.columns[column_id] for column_id, _, _ in columns]
+        self.targets[indexes] = [DEFAULT_TARGET_LEVEL if target is None else target for _, target, _ in columns]
+        self.column_active[indexes] = [bool(is_active) for _, _, is_active in columns]
+        self._recompute(indexes)
+
+    def _set_employees(self, employees: Sequence[Tuple[int, Optional[bool]]]) -> None:
+        """Add or update (id, is_active) employees"""
+        if not employees:
+            return
+        added = [employee_id for employee_id, _ in employees if employee_id not in self.rows]
+        needed = len(self.rows) + len(added)
+        if needed > len(self.employee_ids):
+            capacity = needed + int(needed * ROW_HEADROOM)
+            grow = capacity - len(self.employee_ids)
+            self.employee_ids = np.pad(self.employee_ids, (0, grow))
+            self.active = np.pad(self.active, (0, grow))
+            self.norms = np.pad(self.norms, (0, grow))
+            self.levels = np.pad(self.levels, ((0, grow), (0, 0)), constant_values=MISSING)
+            self.progress = np.pad(self.progress, ((0, grow), (0, 0)))
+        for employee_id in added:
+            self.employee_ids[len(self.rows)] = employee_id
+            self.rows[employee_id] = len(self.rows)
+        self.active[[self.rows[employee_id] for employee_id, _ in employees]] = [
+            bool(is_active) for _, is_active in employees
+        ]
+
+    def _set_cells(self, cells: Dict[Tuple[int, str], Optional[int]]) -> None:
+        """Set (employee_id, column_id) cells to their levels; None clears a cell"""
+        known = [
+            (self.rows[employee_id], self.columns[column_id], MISSING if level is None else level)
+            for (employee_id, column_id), level in cells.items()
+            if employee_id in self.rows and column_id in self.columns
+        ]
+        if not known:
+            return
+        rows, columns, levels = (np.array(values, dtype=np.int64) for values in zip(*known))
+        self.levels[rows, columns] = levels
+        self.progress[rows, columns] = progress(levels, self.targets[columns], self.column_active[columns])
+        touched = np.unique(rows)
+        self.norms[touched] = np.linalg.norm(self.progress[touched], axis=1)
+
+    def _recompute(self, columns) -> None:
+        """Re-derive progress for whole columns (after a target or status change) and every row norm"""
+        columns = list(columns)
+        if not columns:
+            return
+        count = len(self.rows)
+        self.progress[:count, columns] = progress(
+            self.levels[:count, columns], self.targets[columns], self.column_active[columns]
+        )
+        self.norms[:count] = np.linalg.norm(self.progress[:count], axis=1)
+
+    # Queries
+
+    def _neighbours(self, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-``k`` cosine neighbours of ``rows`` among active employees.
+
+        Returns (rows, similarities), both shaped (len(rows), k) and sorted
+        by similarity; slots without a neighbour have similarity 0.
+        """
+        count = len(self.rows)
+        matrix, norms = self.progress[:count], self.norms[:count]
+        excluded = ~self.active[:count] | (norms == 0)
+        k = max(min(k, count - 1), 0)
+        neighbour_rows = np.zeros((len(rows), k), dtype=np.int64)
+        similarities = np.zeros((len(rows), k), dtype=np.float32)
+        if k == 0:
+            return neighbour_rows, similarities
+
+        for start in range(0, len(rows), SIMILARITY_BATCH_SIZE):
+            batch = rows[start:start + SIMILARITY_BATCH_SIZE]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = (matrix[batch] @ matrix.T) / np.outer(norms[batch], norms)
+            scores[~np.isfinite(scores)] = 0.0
+            scores[:, excluded] = -np.inf
+            scores[np.arange(len(batch)), batch] = -np.inf
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            neighbour_rows[start:start + len(batch)] = np.take_along_axis(top, order, axis=1)
+            similarities[start:start + len(batch)] = np.maximum(np.take_along_axis(top_scores, order, axis=1), 0.0)
+        return neighbour_rows, similarities
+
+    def _rows(self, employee_ids: Sequence[int]) -> np.ndarray:
+        missing = [employee_id for employee_id in employee_ids if employee_id not in self.rows]
+        if missing:
+            raise KeyError(missing[0])
+        return np.array([self.rows[employee_id] for employee_id in employee_ids], dtype=np.int64)
+
+    def similar(self, db: Session, employee_ids: Sequence[int], k: int = 10) -> Dict[int, List[Neighbour]]:
+        """Refresh, then the ``k`` most similar active employees for each id (KeyError for unknown ids)"""
+        with self._lock:
+            self._refresh(db)
+            rows = self._rows(employee_ids)
+            neighbour_rows, similarities = self._neighbours(rows, k)
+            neighbour_ids = self.employee_ids[neighbour_rows]
+        return {
+            employee_id: [
+                Neighbour(int(neighbour_id), round(float(similarity), 4))
+                for neighbour_id, similarity in zip(neighbour_ids[index], similarities[index]) if similarity > 0
+            ]
+            for index, employee_id in enumerate(employee_ids)
+        }
+
+    def recommend(
+        self, db: Session, employee_ids: Sequence[int], limit: int = 5, neighbours: int = RECOMMENDATION_NEIGHBOURS
+    ) -> Dict[int, List[Recommendation]]:
+        """
+        Refresh, then the active columns each employee should train next.
+
+        Each column scores gap x peer progress: how far the employee is from
+        the target, times how far their nearest neighbours got (weighted by
+        similarity). Employees without similar peers fall back to the
+        average progress of all active employees; columns no one has made
+        progress on are not suggested.
+        """
+        with self._lock:
+            self._refresh(db)
+            rows = self._rows(employee_ids)
+            count = len(self.rows)
+            matrix = self.progress[:count]
+            neighbour_rows, similarities = self._neighbours(rows, neighbours)
+            active_rows = self.active[:count]
+            overall = matrix[active_rows].mean(axis=0) if active_rows.any() else np.zeros(len(self.columns), np.float32)
+
+            weight_sums = similarities.sum(axis=1, keepdims=True)
+            peers = np.einsum("bk,bkc->bc", similarities, matrix[neighbour_rows])
+            peers = np.where(weight_sums > 0, peers / np.where(weight_sums > 0, weight_sums, 1), overall)
+            gaps = np.where(self.column_active, 1.0 - matrix[rows], 0.0)
+            scores = np.where(gaps > 0, gaps * peers, -np.inf)
+
+            limit = min(limit, len(self.columns))
+            results: Dict[int, List[Recommendation]] = {}
+            for index, employee_id in enumerate(employee_ids):
+                if limit == 0:
+                    results[employee_id] = []
+                    continue
+                top = np.argpartition(-scores[index], limit - 1)[:limit]
+                top = top[np.argsort(-scores[index][top], kind="stable")]
+                results[employee_id] = [
+                    Recommendation(
+                        column_id=self.column_ids[column],
+                        current_level=None if self.levels[rows[index], column] == MISSING
+                        else int(self.levels[rows[index], column]),
+                        target_level=int(self.targets[column]),
+                        gap=round(float(gaps[index, column]), 4),
+                        score=round(float(scores[index, column]), 4),
+                    )
+                    for column in top if scores[index, column] > 0
+                ]
+        return results
+
+
+skill_matrix = SkillMatrix()
@@ -0,0 +1,260 @@
+"""
+Skill index
+In-memory bitmaps of employee ids per column and level, for multi-criteria talent search
+"""
+
+import logging
+import os
+import threading
+from collections import defaultdict
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Employee, Score, ScoreEvent, ScoreSnapshot
+from .schemas import SkillCondition
+from .versions import DATA_VERSION, get_version
+
+logger = logging.getLogger(__name__)
+
+# Rows read per round trip while building the index
+BUILD_BATCH_SIZE = 10000
+# Catching up on more events than this rebuilds the index instead
+SKILL_INDEX_MAX_REPLAY = int(os.getenv("SKILL_INDEX_MAX_REPLAY", "100000"))
+
+# Set bits per byte value, for skipping through a bitmap a byte at a time
+_BYTE_BITS = bytes(bin(value).count("1") for value in range(256))
+
+
+def bitmap_from_ids(ids: Iterable[int]) -> int:
+    """A bitmap (Python int) with bit ``id`` set for each id"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray((max(ids) >> 3) + 1)
+    for employee_id in ids:
+        bits[employee_id >> 3] |= 1 << (employee_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def bitmap_ids(bitmap: int, skip: int = 0, limit: Optional[int] = None) -> List[int]:
+    """The set bits of ``bitmap`` in ascending order, paged"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) >> 3, "little")
+    ids: List[int] = []
+    for position, byte in enumerate(data):
+        if not byte:
+            continue
+        if skip >= _BYTE_BITS[byte]:
+            skip -= _BYTE_BITS[byte]
+            continue
+        for bit in range(8):
+            if byte >> bit & 1:
+                if skip:
+                    skip -= 1
+                    continue
+                if limit is not None and len(ids) >= limit:
+                    return ids
+                ids.append(position * 8 + bit)
+    return ids
+
+
+def condition_columns(condition: SkillCondition) -> Set[str]:
+    """Every column id a condition refers to"""
+    columns = {condition.column_id} if condition.column_id is not None else set()
+    for child in (condition.all or []) + (condition.any or []) + ([condition.not_] if condition.not_ else []):
+        columns |= condition_columns(child)
+    return columns
+
+
+class SkillIndex:
+    """
+    Bitmaps of employee ids per (column, level) plus employee attributes.
+
+    The index records the data version it reflects. ``refresh`` brings it up
+    to date from the database: the score events and employee rows written
+    since that version are folded in, and a new baseline snapshot (a bulk
+    load without events) or a long backlog rebuilds it from the score
+    table. Every worker process keeps its own copy per database (see
+    ``SkillIndexes``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything; the next refresh rebuilds"""
+        self.version = -1
+        self.baseline_id: Optional[int] = None
+        self.levels: Dict[str, Dict[int, int]] = {}  # column_id -> level -> bitmap
+        self.employees = 0
+        self.active = 0
+        self.departments: Dict[Optional[str], int] = {}
+        self.roles: Dict[str, int] = {}
+
+    def refresh(self, db: Session) -> None:
+        """Bring the index up to the current data version"""
+        with self._lock:
+            self._refresh(db)
+
+    def _refresh(self, db: Session) -> None:
+        version = get_version(db, DATA_VERSION)
+        if version == self.version:
+            return
+        baseline_id = db.query(func.max(ScoreSnapshot.id)).filter(ScoreSnapshot.baseline == True).scalar()
+        if self.version < 0 or version < self.version or baseline_id != self.baseline_id:
+            self._build(db, version, baseline_id)
+            return
+
+        events = db.query(ScoreEvent.employee_id, ScoreEvent.column_id, ScoreEvent.level).filter(
+            ScoreEvent.version > self.version, ScoreEvent.version <= version
+        ).order_by(ScoreEvent.id).limit(SKILL_INDEX_MAX_REPLAY + 1).all()
+        if len(events) > SKILL_INDEX_MAX_REPLAY:
+            self._build(db, version, baseline_id)
+            return
+        self._apply_employees(db.query(Employee.id, Employee.department, Employee.role, Employee.is_active).filter(
+            Employee.version > self.version, Employee.version <= version
+        ))
+        # Only the last write to each cell matters
+        self._apply_cells({(employee_id, column_id): level for employee_id, column_id, level in events})
+        self.version = version
+
+    def _build(self, db: Session, version: int, baseline_id: Optional[int]) -> None:
+        self.reset()
+        self._apply_employees(db.query(Employee.id, Employee.department, Employee.role, Employee.is_active))
+        # Ordered like ix_scores_column_level, so each (column, level) run is read contiguously
+        rows = db.query(Score.column_id, Score.level, Score.employee_id).order_by(
+            Score.column_id, Score.level
+        ).yield_per(BUILD_BATCH_SIZE)
+        for (column_id, level), group in groupby(rows, key=lambda row: (row[0], row[1])):
+            self.levels.setdefault(column_id, {})[level] = bitmap_from_ids(row[2] for row in group)
+        self.version, self.baseline_id = version, baseline_id
+        logger.info("Built skill index at data version %s (%s columns)", version, len(self.levels))
+
+    def _apply_employees(self, rows) -> None:
+        """Set the attributes of the given (id, department, role, is_active) rows"""
+        touched = []
+        active = []
+        departments = defaultdict(list)
+        roles = defaultdict(list)
+        for employee_id, department, role, is_active in rows:
+            touched.append(employee_id)
+            if is_active:
+                active.append(employee_id)
+            departments[department].append(employee_id)
+            roles[role].append(employee_id)
+        if not touched:
+            return
+        mask = bitmap_from_ids(touched)
+        self.employees |= mask
+        self.active = self.active & ~mask | bitmap_from_ids(active)
+        for groups, changed in ((self.departments, departments), (self.roles, roles)):
+            for key, bitmap in list(groups.items()):
+                if bitmap & mask:
+                    groups[key] = bitmap & ~mask
+            for key, ids in changed.items():
+                groups[key] = groups.get(key, 0) | bitmap_from_ids(ids)
+
+    def _apply_cells(self, cells: Dict[Tuple[int, str], Optional[int]]) -> None:
+        """Set each (employee_id, column_id) cell to its level; None clears it"""
+        by_column = defaultdict(list)
+        by_level = defaultdict(list)
+        for (employee_id, column_id), level in cells.items():
+            by_column[column_id].append(employee_id)
+            if level is not None:
+                by_level[(column_id, level)].append(employee_id)
+        for column_id, ids in by_column.items():
+            mask = bitmap_from_ids(ids)
+            levels = self.levels.get(column_id, {})
+            for level, bitmap in list(levels.items()):
+                if bitmap & mask:
+                    levels[level] = bitmap & ~mask
+        for (column_id, level), ids in by_level.items():
+            levels = self.levels.setdefault(column_id, {})
+            levels[level] = levels.get(level, 0) | bitmap_from_ids(ids)
+
+    def _evaluate(self, condition: SkillCondition) -> int:
+        parts = [
+            condition.column_id is not None, condition.all is not None,
+            condition.any is not None, condition.not_ is not None,
+        ]
+        if sum(parts) != 1:
+            raise ValueError("Each condition needs exactly one of column_id, all, any or not")
+        if condition.column_id is not None:
+            result = 0
+            for level, bitmap in self.levels.get(condition.column_id, {}).items():
+                if level >= condition.min_level and (condition.max_level is None or level <= condition.max_level):
+                    result |= bitmap
+            return result
+        if condition.all is not None:
+            result = self.employees
+            for child in condition.all:
+                result &= self._evaluate(child)
+            return result
+        if condition.any is not None:
+            result = 0
+            for child in condition.any:
+                result |= self._evaluate(child)
+            return result
+        return self.employees & ~self._evaluate(condition.not_)
+
+    def search(
+        self,
+        db: Session,
+        condition: SkillCondition,
+        department: Optional[str] = None,
+        role: Optional[str] = None,
+        include_inactive: bool = False,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Tuple[int, List[int]]:
+        """Refresh, then return the number of matching employees and one page of their ids (ascending)"""
+        with self._lock:
+            self._refresh(db)
+            result = self._evaluate(condition)
+            if not include_inactive:
+                result &= self.active
+            if department:
+                result &= self.departments.get(department, 0)
+            if role:
+                result &= self.roles.get(role, 0)
+        return result.bit_count(), bitmap_ids(result, skip, limit)
+
+
+class SkillIndexes:
+    """
+    One ``SkillIndex`` per engine, like the settings cache.
+
+    Read handlers may get a primary or a replica session. A shared copy
+    would see the replica's older data version as a reason to rebuild, and
+    results would flip between stale and fresh under replica lag. Each
+    engine's copy only ever moves forward with that engine.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[object, SkillIndex] = {}  # engine -> index
+
+    def get(self, db: Session) -> SkillIndex:
+        bind = db.get_bind()
+        with self._lock:
+            index = self._indexes.get(bind)
+            if index is None:
+                index = self._indexes[bind] = SkillIndex()
+        return index
+
+    def reset(self) -> None:
+        """Forget every copy; the next refresh of each rebuilds"""
+        with self._lock:
+            self._indexes.clear()
+
+    def refresh(self, db: Session) -> None:
+        self.get(db).refresh(db)
+
+    def search(self, db: Session, condition: SkillCondition, **options) -> Tuple[int, List[int]]:
+        return self.get(db).search(db, condition, **options)
+
+
+skill_index = SkillIndexes()
@@ -0,0 +1,102 @@
+"""
+Startup preparation and readiness
+Creates the schema and seeds data off the request path, tracking when the worker is ready
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from .database import Base, SessionLocal, engine
+from .history import ensure_history_baseline
+from .jobs import fail_interrupted_jobs
+from .rollups import ensure_rollups_backfilled
+from .seed import seed_database
+from .similarity import skill_matrix
+from .skill_index import skill_index
+
+logger = logging.getLogger(__name__)
+
+# Create missing tables on startup (deployments managed by Alembic can turn this off)
+SCHEMA_AUTO_CREATE = os.getenv("SCHEMA_AUTO_CREATE", "true").lower() in ("1", "true", "yes")
+# Seed an empty database on startup (or run ``python -m app.cli seed`` instead)
+SEED_ON_STARTUP = os.getenv("SEED_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+
+class Readiness:
+    """Progress of the startup steps, shared between the background task and /ready"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.schema = False
+            self.seed = False
+            self.error: Optional[str] = None
+
+    def mark(self, step: str):
+        with self._lock:
+            setattr(self, step, True)
+
+    def fail(self, error: Exception):
+        with self._lock:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def ready(self) -> bool:
+        return self.schema and self.seed and self.error is None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"ready": self.ready, "schema": self.schema, "seed": self.seed, "error": self.error}
+
+
+readiness = Readiness()
+
+
+def prepare_database(
+    bind: Engine = engine,
+    session_factory: sessionmaker = SessionLocal,
+    create_schema: bool = SCHEMA_AUTO_CREATE,
+    seed: bool = SEED_ON_STARTUP,
+) -> None:
+    """
+    Create the schema, fail orphaned jobs and seed if configured, then warm
+    the skill index and matrix.
+
+    Failures of the first steps are reported through ``readiness``; a failed
+    warm-up is only logged, since requests build both on demand anyway.
+    """
+    try:
+        if create_schema:
+            Base.metadata.create_all(bind=bind)
+        readiness.mark("schema")
+        with session_factory() as db:
+            # Jobs only run in the process that accepted them; fail those whose process stopped
+            fail_interrupted_jobs(db)
+            # Scores written before the event log existed
+            ensure_history_baseline(db)
+            # Trend rollups for data that predates them
+            ensure_rollups_backfilled(db)
+        if seed:
+            seed_database(session_factory)
+        readiness.mark("seed")
+    except Exception as e:
+        logger.exception("Database preparation failed")
+        readiness.fail(e)
+        return
+
+    # Searches build the index (and suggestions the matrix) on demand too;
+    # this only takes the first build off a request
+    try:
+        with session_factory() as db:
+            skill_index.refresh(db)
+            skill_matrix.refresh(db)
+    except Exception:
+        logger.exception("Warming the skill index failed")
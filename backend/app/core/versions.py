@@ -0,0 +1,54 @@
+"""
+Version counters
+Monotonic counters stored in the database so every worker process can detect changes cheaply
+"""
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import VersionCounter
+
+SETTINGS_VERSION = "settings"
+# Bumped by every write to employees, columns, scores and settings
+DATA_VERSION = "data"
+# Locked by one-off startup steps (history baseline, rollup backfill)
+STARTUP_LOCK = "startup"
+
+
+def get_version(db: Session, name: str) -> int:
+    """Read the current value of a counter (0 if it was never bumped)"""
+    value = db.query(VersionCounter.value).filter(VersionCounter.name == name).scalar()
+    return value or 0
+
+
+def bump_version(db: Session, name: str) -> int:
+    """
+    Increment a counter inside the caller's transaction and return the new value.
+
+    The increment is a single UPDATE, so concurrent writers serialize on the
+    counter row instead of losing updates.
+    """
+    updated = db.query(VersionCounter).filter(VersionCounter.name == name).update(
+        {VersionCounter.value: VersionCounter.value + 1}, synchronize_session=False
+    )
+    if not updated:
+        try:
+            with db.begin_nested():
+                db.add(VersionCounter(name=name, value=1))
+        except IntegrityError:
+            # Another writer created the row first
+            db.query(VersionCounter).filter(VersionCounter.name == name).update(
+                {VersionCounter.value: VersionCounter.value + 1}, synchronize_session=False
+            )
+    return get_version(db, name)
+
+
+def lock_counter(db: Session, name: str) -> None:
+    """
+    Hold a counter row's write lock until the caller's transaction ends.
+
+    A portable stand-in for an advisory lock (a row lock on PostgreSQL, the
+    write lock on SQLite): steps that check, then write take it and check
+    again, so workers starting together run them one after another.
+    """
+    bump_version(db, name)
@@ -5,15 +5,20 @@ Main application entry point with CORS configuration and route registration
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
+from anyio import to_thread
+import asyncio
 import os
 
-from app.api import employees, columns, scores, settings, matrix
-from app.core.database import engine, Base
-from app.core.seed import seed_database
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.api import employees, columns, scores, settings, matrix, live, jobs, search
+from app.core.database import (
+    SessionLocal, engine, read_engine, pool_stats, read_replica_configured, pin_reads_to_primary
+)
+from app.core.startup import prepare_database, readiness
+from app.core.metrics import instrument_request, metrics_registry
+from app.core.jobs import job_runner, run_job_heartbeats
+from app.core.history import run_periodic_snapshots
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -39,6 +44,9 @@ app.include_router(columns.router, prefix="/api/columns", tags=["columns"])
 app.include_router(scores.router, prefix="/api/scores", tags=["scores"])
 app.include_router(settings.router, prefix="/api/settings", tags=["settings"])
 app.include_router(matrix.router, prefix="/api/matrix", tags=["matrix"])
+app.include_router(live.router, prefix="/api/live", tags=["live"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 
 DOCS_CSP = (
     "default-src 'self'; "
@@ -69,6 +77,31 @@ async def apply_docs_csp(request: Request, call_next):
         response.headers["Content-Security-Policy"] = DOCS_CSP
     return response
 
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """After a successful write, keep the client's reads on the primary while replicas catch up."""
+
+    response = await call_next(request)
+    if (
+        request.method in WRITE_METHODS
+        and response.status_code < 400
+        and request.url.path.startswith("/api/")
+        # Set by get_read_db: handlers on the read session never write, whatever the method
+        and not getattr(request.state, "read_only", False)
+        and read_replica_configured()
+    ):
+        pin_reads_to_primary(response)
+    return response
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency and SQL query counts; outermost so it times the other middleware too."""
+
+    return await instrument_request(request, call_next)
+
 @app.get("/")
 async def root():
     """Root endpoint - redirect to API docs"""
@@ -79,14 +112,41 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "employee-development-matrix"}
 
-# Seed database on startup if empty
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe - 503 until the schema exists and seeding has finished"""
+    state = readiness.snapshot()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for the primary and (if configured) replica databases"""
+    health = {"pool": pool_stats(engine)}
+    if read_engine is not None:
+        health["read_pool"] = pool_stats(read_engine)
+    return health
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request and SQL metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+# Worker threads available to synchronous (database-bound) route handlers
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+# Create tables and seed in the background so the worker starts serving immediately
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database with seed data if empty"""
-    try:
-        await seed_database()
-    except Exception as e:
-        print(f"Warning: Could not seed database: {e}")
+    """Size the handler threadpool and prepare the database without blocking startup"""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    app.state.prepare_task = asyncio.create_task(to_thread.run_sync(prepare_database))
+    app.state.snapshot_task = asyncio.create_task(run_periodic_snapshots(SessionLocal))
+    app.state.job_heartbeat_task = asyncio.create_task(run_job_heartbeats(SessionLocal))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop taking background jobs; unfinished ones are failed once their heartbeat goes stale"""
+    job_runner.shutdown(wait=False)
 
 if __name__ == "__main__":
     import uvicorn
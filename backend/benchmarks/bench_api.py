@@ -0,0 +1,159 @@
+"""
+API benchmarks at several organisation sizes
+
+Run from the backend directory:
+    python -m pytest benchmarks/bench_api.py --scales=small,medium
+"""
+
+from datetime import datetime, timezone
+
+BATCH_SIZE = 1000
+
+
+def _employee_ids(client, limit=BATCH_SIZE):
+    return [employee["id"] for employee in client.get(f"/api/employees/?limit={limit}").json()]
+
+
+def test_get_matrix(org, benchmark):
+    def fetch():
+        response = org.get("/api/matrix/")
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_get_matrix_columnar(org, benchmark):
+    def fetch():
+        response = org.get("/api/matrix/?format=columnar")
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_get_matrix_page(org, benchmark):
+    def fetch():
+        response = org.get("/api/matrix/page?limit=100&sort=total_score&descending=true")
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_get_analytics(org, benchmark):
+    def fetch():
+        response = org.get("/api/matrix/analytics")
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_export_csv(org, benchmark):
+    def export():
+        with org.stream("GET", "/api/matrix/export/csv") as response:
+            assert response.status_code == 200
+            for _ in response.iter_bytes():
+                pass
+    benchmark(export)
+
+
+def test_bulk_score_upsert(org, benchmark):
+    employee_ids = _employee_ids(org)
+    column_ids = [column["id"] for column in org.get("/api/columns/").json()]
+    rounds = iter(range(1_000_000))
+
+    def upsert():
+        offset = next(rounds)
+        items = [
+            {"employee_id": employee_id, "column_id": column_ids[(index + offset) % len(column_ids)],
+             "level": (index + offset) % 3}
+            for index, employee_id in enumerate(employee_ids)
+        ]
+        response = org.post("/api/scores/bulk", json={"items": items})
+        assert response.status_code == 200
+    benchmark(upsert)
+
+
+def test_single_score_upsert(org, benchmark):
+    employee_id = _employee_ids(org, limit=1)[0]
+    column_id = org.get("/api/columns/").json()[0]["id"]
+    levels = iter(range(1_000_000))
+
+    def upsert():
+        response = org.post("/api/scores/", json={
+            "employee_id": employee_id, "column_id": column_id, "level": next(levels) % 3
+        })
+        assert response.status_code == 200
+    benchmark(upsert)
+
+
+def test_employee_summaries(org, benchmark):
+    employee_ids = _employee_ids(org)
+
+    def fetch():
+        response = org.post("/api/scores/summaries/employees", json={"ids": employee_ids})
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_column_summary(org, benchmark):
+    column_id = org.get("/api/columns/").json()[0]["id"]
+
+    def fetch():
+        response = org.get(f"/api/scores/column/{column_id}/summary")
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_get_matrix_as_of(org, benchmark):
+    # Runs after the write benchmarks, so the replay has events to apply
+    as_of = datetime.now(timezone.utc).isoformat()
+
+    def fetch():
+        response = org.get("/api/matrix/", params={"as_of": as_of})
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_get_completion_trend(org, benchmark):
+    def fetch():
+        response = org.get("/api/matrix/trends", params={"granularity": "day", "group_by": "department"})
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_skill_search(org, benchmark):
+    column_ids = [column["id"] for column in org.get("/api/columns/").json()[:3]]
+    query = {"all": [
+        {"column_id": column_ids[0], "min_level": 1},
+        {"any": [{"column_id": column_ids[1], "min_level": 2}, {"not": {"column_id": column_ids[2]}}]},
+    ]}
+    # The first search builds the index
+    assert org.post("/api/employees/search", json={"query": query}).status_code == 200
+
+    def fetch():
+        response = org.post("/api/employees/search", json={"query": query, "limit": 100})
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_full_text_search(org, benchmark):
+    def fetch():
+        response = org.get("/api/search/", params={"q": "emp"})
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_similar_employees(org, benchmark):
+    employee_id = org.get("/api/employees/", params={"limit": 1}).json()[0]["id"]
+    # The first request builds the matrix
+    assert org.get(f"/api/employees/{employee_id}/similar").status_code == 200
+
+    def fetch():
+        response = org.get(f"/api/employees/{employee_id}/similar", params={"k": 20})
+        assert response.status_code == 200
+    benchmark(fetch)
+
+
+def test_training_recommendations(org, benchmark):
+    employee_id = org.get("/api/employees/", params={"limit": 1}).json()[0]["id"]
+    assert org.get(f"/api/employees/{employee_id}/recommendations").status_code == 200
+
+    def fetch():
+        response = org.get(f"/api/employees/{employee_id}/recommendations", params={"limit": 10})
+        assert response.status_code == 200
+    benchmark(fetch)
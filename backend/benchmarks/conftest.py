@@ -0,0 +1,160 @@
+"""
+Benchmark harness
+Builds synthetic organisations per scale and records timings to a JSON baseline
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.database import Base, create_db_engine, get_db
+from app.core.datagen import generate_org
+from app.core.models import Settings
+from app.core.schemas import AppSettings
+from app.core.settings_cache import SETTINGS_KEY
+
+# (employees, columns, density) per scale; "large" is ~10M scores
+SCALES = {
+    "small": (1000, 50, 0.3),
+    "medium": (10000, 200, 0.3),
+    "large": (100000, 1000, 0.1),
+}
+DEFAULT_RESULTS = os.path.join(os.path.dirname(__file__), "results", "latest.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--scales", default="small", help="Comma-separated scales: " + ", ".join(SCALES))
+    group.addoption("--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    group.addoption("--save", default=DEFAULT_RESULTS, help="Write results JSON here")
+    group.addoption("--compare", default=None, help="Baseline JSON to compare against")
+    group.addoption("--max-regression", type=float, default=1.25,
+                    help="Fail a benchmark whose median exceeds the baseline by this factor")
+    group.addoption("--data-dir", default=None, help="Keep generated databases here and reuse them")
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = [name.strip() for name in metafunc.config.getoption("scales").split(",") if name.strip()]
+        unknown = set(scales) - set(SCALES)
+        if unknown:
+            raise pytest.UsageError(f"Unknown scales: {', '.join(sorted(unknown))}")
+        metafunc.parametrize("scale", scales, scope="session")
+
+
+RESULTS_KEY = pytest.StashKey[dict]()
+BASELINE_KEY = pytest.StashKey[dict]()
+
+
+def pytest_configure(config):
+    config.stash[RESULTS_KEY] = {}
+    baseline = {}
+    if config.getoption("compare", None):
+        with open(config.getoption("compare")) as f:
+            baseline = json.load(f)["benchmarks"]
+    config.stash[BASELINE_KEY] = baseline
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Write the results JSON and print a comparison table"""
+    collected = config.stash.get(RESULTS_KEY, None)
+    if not collected:
+        return
+    baseline = config.stash[BASELINE_KEY]
+
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "benchmarks": collected,
+    }
+    path = config.getoption("save")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+    terminalreporter.write_sep("-", f"benchmark results ({path})")
+    for name, stats in sorted(collected.items()):
+        line = f"{name:<45} median {stats['median'] * 1000:9.1f} ms  min {stats['min'] * 1000:9.1f} ms"
+        if name in baseline:
+            line += f"  x{stats['median'] / baseline[name]['median']:.2f} vs baseline"
+        terminalreporter.write_line(line)
+
+
+@pytest.fixture
+def benchmark(request):
+    """
+    Time a callable over several rounds (after one warm-up call).
+
+    Records min/median/mean/max seconds under ``<test name>`` and fails if
+    the median regressed past ``--max-regression`` against ``--compare``.
+    """
+    config = request.config
+
+    def run(func, *args, **kwargs):
+        func(*args, **kwargs)
+        timings = []
+        for _ in range(config.getoption("rounds")):
+            started = time.perf_counter()
+            func(*args, **kwargs)
+            timings.append(time.perf_counter() - started)
+        name = request.node.name
+        stats = config.stash[RESULTS_KEY][name] = {
+            "rounds": len(timings),
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings),
+        }
+
+        previous = config.stash[BASELINE_KEY].get(name)
+        if previous:
+            limit = previous["median"] * config.getoption("max_regression")
+            assert stats["median"] <= limit, (
+                f"{name} median {stats['median']:.4f}s exceeds baseline "
+                f"{previous['median']:.4f}s x {config.getoption('max_regression')}"
+            )
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def org(scale, tmp_path_factory, request):
+    """A synthetic organisation of the given scale behind a TestClient"""
+    employees, columns, density = SCALES[scale]
+    data_dir = request.config.getoption("data_dir") or str(tmp_path_factory.mktemp("bench"))
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench_{scale}.db")
+    reuse = os.path.exists(path)
+
+    engine = create_db_engine(f"sqlite:///{path}")
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if not reuse:
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            generate_org(db, employees=employees, columns=columns, density=density)
+            db.add(Settings(key=SETTINGS_KEY, value=AppSettings().dict()))
+            db.commit()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
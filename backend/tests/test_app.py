@@ -0,0 +1,37 @@
+"""
+Tests for application-level behaviour
+"""
+
+import inspect
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import SQLITE_PRAGMAS, create_db_engine, pool_stats
+
+def test_database_routes_run_in_threadpool():
+    """Handlers that take a database session must not be coroutines"""
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        uses_db = "db" in inspect.signature(route.endpoint).parameters
+        if uses_db:
+            assert not inspect.iscoroutinefunction(route.endpoint), route.path
+
+def test_sqlite_engine_applies_pragmas(tmp_path):
+    """File-backed SQLite connections use WAL and wait on locks"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar().lower() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == SQLITE_PRAGMAS["busy_timeout"]
+        stats = pool_stats(engine)
+        assert stats["pool_class"] == "QueuePool"
+        assert stats["checked_out"] == 1
+    engine.dispose()
+
+def test_database_health_reports_pool():
+    """Pool statistics are exposed for sizing"""
+    response = TestClient(app).get("/health/db")
+    assert response.status_code == 200
+    assert "pool_class" in response.json()["pool"]
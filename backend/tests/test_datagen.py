@@ -0,0 +1,69 @@
+"""
+Tests for the synthetic data generator
+"""
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.core.datagen import generate_org
+from app.core.models import Employee, TrainingColumn, Score, EmployeeScoreSummary
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def test_generate_org_is_reproducible(setup_database):
+    """Generated data matches its reported counts and keeps summaries in step"""
+    db = TestingSessionLocal()
+    result = generate_org(db, employees=200, columns=20, density=0.4, seed=7)
+    db.commit()
+
+    assert db.query(Employee).count() == 200
+    assert db.query(TrainingColumn).count() == 20
+    assert db.query(Score).count() == result.scores
+    assert 0 < result.scores < 200 * 20
+    assert db.query(func.sum(EmployeeScoreSummary.total_scores)).scalar() == result.scores
+    departments = db.query(Employee.department, func.count()).group_by(Employee.department).all()
+    assert len(departments) > 1
+    db.close()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    assert generate_org(db, employees=200, columns=20, density=0.4, seed=7) == result
+    db.close()
+
+def test_generate_org_appends(setup_database):
+    """Test a second run adds new employees and columns after the existing ones"""
+    db = TestingSessionLocal()
+    db.add(TrainingColumn(id="gen_x", title="Not generated"))
+    db.commit()
+    generate_org(db, employees=5, columns=3, seed=1)
+    db.commit()
+    generate_org(db, employees=5, columns=2, seed=1)
+    db.commit()
+    assert {column_id for (column_id,) in db.query(TrainingColumn.id)} == {"gen_x", "gen1", "gen2", "gen3", "gen4", "gen5"}
+    assert db.query(Employee).count() == 10
+    assert db.query(func.count(func.distinct(Employee.name))).scalar() == 10
+    # Ids came from the database, so later inserts without one still work
+    db.add(Employee(name="Hired Later", role="Engineer"))
+    db.commit()
+
+    generate_org(db, employees=1, columns=1, seed=1, column_prefix="load")
+    db.commit()
+    assert db.get(TrainingColumn, "load1") is not None
+    db.close()
+
+def test_generate_org_validates_density(setup_database):
+    db = TestingSessionLocal()
+    with pytest.raises(ValueError):
+        generate_org(db, employees=1, columns=1, density=0)
+    db.close()
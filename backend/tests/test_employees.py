@@ -108,6 +108,12 @@ def test_update_employee(setup_database):
     data = response.json()
     assert data["name"] == "Alice Green"
     assert data["role"] == "Senior Developer"
+    
+    # Renaming to another employee's name is rejected
+    client.post("/api/employees/", json={"name": "Bob Stone", "role": "Developer"})
+    response = client.put(f"/api/employees/{employee_id}", json={"name": "Bob Stone"})
+    assert response.status_code == 400
+    assert "already exists" in response.json()["detail"]
 
 def test_delete_employee(setup_database):
     """Test deleting an employee"""
@@ -0,0 +1,202 @@
+"""
+Tests for score history and point-in-time matrix queries
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core import history
+from app.core.history import ensure_history_baseline, prune_snapshots, scores_as_of, snapshot_if_due, take_snapshot
+from app.core.models import Employee, TrainingColumn, Score, ScoreEvent, ScoreSnapshot, ScoreSnapshotRow
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Employee(name="John Doe", role="Engineer", department="Engineering"),
+        Employee(name="Jane Smith", role="Manager", department="Product"),
+        TrainingColumn(id="c1", title="Python", category="Technical", target_level=2),
+        TrainingColumn(id="c2", title="Leadership", category="Soft Skills", target_level=2),
+    ])
+    db.commit()
+    db.close()
+    # Creation timestamps have one-second resolution on SQLite
+    time.sleep(1.1)
+
+def checkpoint() -> datetime:
+    """A moment strictly between the writes before and after it"""
+    time.sleep(0.01)
+    moment = datetime.now(timezone.utc)
+    time.sleep(0.01)
+    return moment
+
+def levels_as_of(moment: datetime) -> dict:
+    response = client.get("/api/matrix/", params={"as_of": moment.isoformat()})
+    assert response.status_code == 200
+    return {(cell["employee_id"], cell["column_id"]): cell["level"] for cell in response.json()["scores"]}
+
+def test_score_writes_append_events(sample_data):
+    """Test every score endpoint records the cell state it wrote"""
+    score_id = client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 1}).json()["id"]
+    client.put(f"/api/scores/{score_id}", json={"notes": "Halfway"})
+    client.post("/api/scores/bulk", json={"items": [{"employee_id": 2, "column_id": "c2", "level": 2}]})
+    client.delete(f"/api/scores/{score_id}")
+
+    db = TestingSessionLocal()
+    events = [
+        (event.employee_id, event.column_id, event.level, event.notes)
+        for event in db.query(ScoreEvent).order_by(ScoreEvent.id)
+    ]
+    db.close()
+    assert events == [
+        (1, "c1", 1, None),
+        (1, "c1", 1, "Halfway"),
+        (2, "c2", 2, None),
+        (1, "c1", None, "Halfway"),
+    ]
+
+@pytest.mark.parametrize("with_snapshot", [False, True])
+def test_matrix_as_of(sample_data, with_snapshot):
+    """Test the matrix is rebuilt as it was, with or without an intervening snapshot"""
+    score_id = client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 1}).json()["id"]
+    client.post("/api/scores/", json={"employee_id": 2, "column_id": "c1", "level": 0})
+    first = checkpoint()
+    client.put(f"/api/scores/{score_id}", json={"level": 2})
+    if with_snapshot:
+        db = TestingSessionLocal()
+        take_snapshot(db)
+        db.commit()
+        db.close()
+    second = checkpoint()
+    client.delete(f"/api/scores/{score_id}")
+    client.post("/api/scores/", json={"employee_id": 2, "column_id": "c2", "level": 2})
+
+    assert levels_as_of(first) == {(1, "c1"): 1, (2, "c1"): 0}
+    assert levels_as_of(second) == {(1, "c1"): 2, (2, "c1"): 0}
+    assert levels_as_of(datetime.now(timezone.utc)) == {(2, "c1"): 0, (2, "c2"): 2}
+
+    # The columnar format and filters work the same way
+    response = client.get("/api/matrix/", params={"as_of": first.isoformat(), "format": "columnar", "department": "Engineering"})
+    # Columns are ordered by title: Leadership, Python
+    assert response.json()["levels"] == ".1"
+
+def test_as_of_excludes_later_employees(sample_data):
+    """Test employees created after the point in time are left out"""
+    moment = checkpoint()
+    time.sleep(1.1)
+    client.post("/api/employees/", json={"name": "New Hire", "role": "Analyst"})
+
+    response = client.get("/api/matrix/", params={"as_of": moment.isoformat()})
+    assert [employee["name"] for employee in response.json()["employees"]] == ["John Doe", "Jane Smith"]
+
+def test_history_starts_at_baseline(sample_data):
+    """Test scores written without events are captured once and bound the history"""
+    db = TestingSessionLocal()
+    db.add(Score(employee_id=1, column_id="c1", level=2))
+    db.commit()
+    before = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    snapshot = ensure_history_baseline(db)
+    assert snapshot.baseline and snapshot.score_count == 1
+    assert ensure_history_baseline(db) is None
+    assert scores_as_of(db, datetime.now(timezone.utc))[(1, "c1")].level == 2
+    db.close()
+
+    response = client.get("/api/matrix/", params={"as_of": before.isoformat()})
+    assert response.status_code == 400
+
+def test_concurrent_starts_take_one_baseline(sample_data, monkeypatch):
+    """Test a worker that waited for the startup lock finds the other worker's baseline"""
+    db = TestingSessionLocal()
+    db.add(Score(employee_id=1, column_id="c1", level=2))
+    db.commit()
+    lock_counter = history.lock_counter
+
+    def lock_after_other_worker(session, name):
+        other = TestingSessionLocal()
+        take_snapshot(other, baseline=True)
+        other.commit()
+        other.close()
+        lock_counter(session, name)
+
+    monkeypatch.setattr(history, "lock_counter", lock_after_other_worker)
+    assert ensure_history_baseline(db) is None
+    assert db.query(ScoreSnapshot).count() == 1
+    db.close()
+
+def test_snapshot_if_due(sample_data):
+    """Test snapshots are only taken after enough events"""
+    client.post("/api/scores/bulk", json={"items": [
+        {"employee_id": 1, "column_id": "c1", "level": 1},
+        {"employee_id": 1, "column_id": "c2", "level": 2},
+    ]})
+    db = TestingSessionLocal()
+    assert snapshot_if_due(db, min_events=3) is None
+    snapshot = snapshot_if_due(db, min_events=2)
+    assert (snapshot.last_event_id, snapshot.score_count) == (2, 2)
+    db.commit()
+    assert snapshot_if_due(db, min_events=1) is None
+    assert db.query(ScoreSnapshot).count() == 1
+    db.close()
+
+def test_prune_snapshots(sample_data):
+    """Test retention keeps baselines, the newest snapshots and one per recent month"""
+    db = TestingSessionLocal()
+    baseline = take_snapshot(db, baseline=True)
+    baseline.taken_at = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    taken = {}
+    for day in [(2025, 1, 5), (2025, 1, 20), (2025, 2, 10), (2025, 3, 1), (2025, 3, 15), (2025, 3, 20)]:
+        snapshot = take_snapshot(db)
+        snapshot.taken_at = datetime(*day, tzinfo=timezone.utc)
+        taken[day] = snapshot.id
+    db.flush()
+
+    pruned = prune_snapshots(db, keep_recent=2, keep_months=2)
+    db.commit()
+    assert sorted(pruned) == [taken[(2025, 1, 5)], taken[(2025, 1, 20)]]
+    assert {snapshot_id for (snapshot_id,) in db.query(ScoreSnapshot.id)} == {
+        baseline.id, taken[(2025, 2, 10)], taken[(2025, 3, 1)], taken[(2025, 3, 15)], taken[(2025, 3, 20)]
+    }
+    assert db.query(ScoreSnapshotRow).filter(ScoreSnapshotRow.snapshot_id.in_(pruned)).count() == 0
+    assert prune_snapshots(db, keep_recent=2, keep_months=2) == []
+    db.close()
+
+def test_import_events_keep_notes(sample_data):
+    """Test imported levels are recorded with the notes the import preserved"""
+    client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 1, "notes": "Started"})
+    content = "Employee ID,Name,Role,Department,Python\n1,John Doe,Engineer,Engineering,2\n"
+    client.post("/api/matrix/import", files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")})
+
+    db = TestingSessionLocal()
+    event = db.query(ScoreEvent).order_by(ScoreEvent.id.desc()).first()
+    assert (event.level, event.notes) == (2, "Started")
+    db.close()
@@ -0,0 +1,207 @@
+"""
+Tests for background export and import jobs
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.jobs import FAILED, RUNNING, JobRunner, fail_interrupted_jobs, job_runner
+from app.core.models import Employee, Job, TrainingColumn, Score
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_runner, "artifact_dir", str(tmp_path))
+    Base.metadata.create_all(bind=engine)
+    yield
+    job_runner.shutdown(wait=True)
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Employee(name="John Doe", role="Engineer", department="Engineering"),
+        Employee(name="Jane Smith", role="Manager", department="Product"),
+        TrainingColumn(id="c1", title="Python", category="Technical", target_level=2),
+    ])
+    db.commit()
+    db.add_all([
+        Score(employee_id=1, column_id="c1", level=2),
+        Score(employee_id=2, column_id="c1", level=1),
+    ])
+    db.commit()
+    db.close()
+
+def wait_for_job(job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+def test_export_job_produces_download(sample_data):
+    """Test an export job writes the same CSV as the inline export"""
+    response = client.post("/api/jobs/exports", json={"format": "csv"})
+    assert response.status_code == 202
+    job = wait_for_job(response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["download_url"] == f"/api/jobs/{job['id']}/download"
+
+    download = client.get(job["download_url"])
+    assert download.status_code == 200
+    assert download.headers["content-type"].startswith("text/csv")
+    assert download.content == client.get("/api/matrix/export/csv").content
+
+def test_json_export_job_applies_filters(sample_data):
+    """Test export parameters are passed to the job"""
+    response = client.post("/api/jobs/exports", json={"format": "json", "department": "Product"})
+    job = wait_for_job(response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["employees"] == 1
+
+    data = client.get(job["download_url"]).json()
+    assert [employee["name"] for employee in data["employees"]] == ["Jane Smith"]
+
+def test_identical_export_requests_share_a_job(sample_data):
+    """Test dedupe on kind, parameters and data version"""
+    first = client.post("/api/jobs/exports", json={"format": "csv"}).json()
+    second = client.post("/api/jobs/exports", json={"format": "csv"}).json()
+    assert second["id"] == first["id"]
+
+    other = client.post("/api/jobs/exports", json={"format": "csv", "role": "Engineer"}).json()
+    assert other["id"] != first["id"]
+    wait_for_job(first["id"])
+    wait_for_job(other["id"])
+
+    # A write moves the data version, so the next export is a new job
+    client.put("/api/scores/1", json={"level": 0})
+    third = client.post("/api/jobs/exports", json={"format": "csv"}).json()
+    assert third["id"] != first["id"]
+    wait_for_job(third["id"])
+
+def test_import_job_reports_result(sample_data):
+    """Test an import job runs the matrix importer and stores its result"""
+    content = "Employee ID,Name,Role,Department,Python\n1,John Doe,Engineer,Engineering,3\n"
+    response = client.post(
+        "/api/jobs/imports",
+        files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")},
+        data={"updated_by": "importer"}
+    )
+    assert response.status_code == 202
+    job = wait_for_job(response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["scores_updated"] == 1
+    assert job["progress"]["rows"] == 1
+    assert job["download_url"] is None
+
+    db = TestingSessionLocal()
+    assert db.query(Score).filter(Score.employee_id == 1).one().level == 3
+    db.close()
+
+    response = client.get(f"/api/jobs/{job['id']}/download")
+    assert response.status_code == 409
+
+def test_failed_import_job(setup_database):
+    """Test handler errors mark the job as failed"""
+    response = client.post("/api/jobs/imports", files={"file": ("matrix.csv", b"", "text/csv")})
+    job = wait_for_job(response.json()["id"])
+    assert job["status"] == "failed"
+    assert "empty" in job["error"]
+
+def test_job_queue_limit(setup_database, monkeypatch):
+    """Test new jobs are refused once the queue is full"""
+    monkeypatch.setattr(job_runner, "queue_limit", 0)
+    response = client.post("/api/jobs/exports", json={"format": "csv"})
+    assert response.status_code == 429
+
+def test_unknown_job(setup_database):
+    assert client.get("/api/jobs/missing").status_code == 404
+
+def test_fail_interrupted_jobs(setup_database):
+    """Test only jobs whose process stopped heartbeating are failed"""
+    now = datetime.now(timezone.utc)
+    db = TestingSessionLocal()
+    db.add_all([
+        Job(id="stale", kind="matrix_export_csv", status="running", params={}, dedupe_key="k1", active_key="k1",
+            data_version=0, owner="other", heartbeat_at=now - timedelta(minutes=10)),
+        Job(id="live", kind="matrix_export_csv", status="running", params={}, dedupe_key="k2", active_key="k2",
+            data_version=0, owner="other", heartbeat_at=now),
+        Job(id="legacy", kind="matrix_export_csv", status="queued", params={}, dedupe_key="k3", data_version=0),
+    ])
+    db.commit()
+    assert fail_interrupted_jobs(db) == 2
+    db.expire_all()
+    assert db.get(Job, "live").status == RUNNING
+    stale = db.get(Job, "stale")
+    assert (stale.status, stale.active_key) == (FAILED, None)
+    assert db.get(Job, "legacy").status == FAILED
+    db.close()
+
+def test_jobs_only_updated_by_their_owner(setup_database):
+    """Test a worker cannot revive a job that was failed as stale, or touch another process's jobs"""
+    runner = JobRunner()
+    db = TestingSessionLocal()
+    db.add(Job(id="mine", kind="matrix_export_csv", status="running", params={}, dedupe_key="k", active_key="k",
+               data_version=0, owner=runner.owner, heartbeat_at=datetime.now(timezone.utc) - timedelta(minutes=1)))
+    db.commit()
+    assert JobRunner().heartbeat(db) == 0
+    assert runner.heartbeat(db) == 1
+    assert not JobRunner()._update(TestingSessionLocal, "mine", status="succeeded")
+
+    fail_interrupted_jobs(db, stale_seconds=-1)
+    assert not runner._update(TestingSessionLocal, "mine", status="succeeded")
+    db.expire_all()
+    assert db.get(Job, "mine").status == FAILED
+    db.close()
+
+def test_one_active_job_per_key(setup_database):
+    """Test the database refuses a second active job with the same key, from any process"""
+    db = TestingSessionLocal()
+    db.add(Job(id="first", kind="matrix_export_csv", status="queued", params={}, dedupe_key="k", active_key="k",
+               data_version=0))
+    db.commit()
+    db.add(Job(id="second", kind="matrix_export_csv", status="queued", params={}, dedupe_key="k", active_key="k",
+               data_version=0))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    # Finished jobs release the key
+    db.add(Job(id="done", kind="matrix_export_csv", status="succeeded", params={}, dedupe_key="k", data_version=0))
+    db.commit()
+    db.close()
+
+def test_prune_removes_expired_jobs(sample_data, tmp_path):
+    """Test finished jobs past retention are deleted with their artifacts"""
+    job = wait_for_job(client.post("/api/jobs/exports", json={"format": "csv"}).json()["id"])
+    db = TestingSessionLocal()
+    artifact_path = db.get(Job, job["id"]).artifact_path
+    assert JobRunner(retention_seconds=3600).prune(db) == 0
+    assert JobRunner(retention_seconds=-1).prune(db) == 1
+    assert db.get(Job, job["id"]) is None
+    db.close()
+    assert not (tmp_path / artifact_path).exists()
@@ -0,0 +1,71 @@
+"""
+Tests for live update events
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.events import EventHub, score_event, employee_event
+from app.core.models import Employee, TrainingColumn
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def sample_data():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(Employee(id=1, name="John Doe", role="Engineer", department="Engineering"))
+    db.add(TrainingColumn(id="c1", title="Python", category="Technical", target_level=2))
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def test_websocket_receives_score_events(sample_data):
+    """Test that a score write is pushed to connected clients"""
+    with client.websocket_connect("/api/live/ws") as websocket:
+        client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 2})
+        events = websocket.receive_json()
+    assert events[0]["type"] == "score"
+    assert (events[0]["employee_id"], events[0]["column_id"], events[0]["level"]) == (1, "c1", 2)
+    assert events[0]["version"] > 0
+
+def test_subscriber_coalesces_and_overflows():
+    """Test per-subscriber coalescing and the resync signal for slow consumers"""
+    async def scenario():
+        hub = EventHub(max_pending=2)
+        subscriber = hub.subscribe()
+
+        # Same cell twice: only the latest state is delivered
+        hub.publish(score_event(1, "c1", 1, 1), score_event(1, "c1", 2, 2))
+        batch = await subscriber.next_batch()
+        assert [event["level"] for event in batch] == [2]
+
+        # More distinct keys than the subscriber may hold
+        hub.publish(employee_event(1, 3), employee_event(2, 4), employee_event(3, 5))
+        batch = await subscriber.next_batch()
+        assert batch == [{"type": "resync", "version": 5}]
+
+        hub.unsubscribe(subscriber)
+        assert hub.subscriber_count == 0
+
+    asyncio.run(scenario())
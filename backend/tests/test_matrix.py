@@ -109,12 +109,55 @@ def test_get_analytics(sample_data):
     assert data["total_employees"] == 2
     assert data["total_trainings"] == 2
 
+def test_get_analytics_aggregates(sample_data):
+    """Test analytics figures computed by the database"""
+    response = client.get("/api/matrix/analytics/")
+    data = response.json()
+
+    counts = {item["level"]: item["count"] for item in data["skill_distribution"]}
+    assert counts == {0: 1, 1: 1, 2: 2}
+    assert data["completion_rate"] == 50.0
+    assert [skill["column_id"] for skill in data["top_skills"]] == ["c1", "c2"]
+    assert data["top_skills"][0]["title"] == "Python"
+    assert len(data["recent_activity"]) == 4
+    assert {"employee_name", "column_title", "level"} <= set(data["recent_activity"][0])
+
+    response = client.get("/api/matrix/analytics/?department=Engineering")
+    data = response.json()
+    counts = {item["level"]: item["count"] for item in data["skill_distribution"]}
+    assert counts == {0: 0, 1: 1, 2: 1}
+    assert data["total_employees"] == 1
+    assert data["top_skills"] == [{"column_id": "c1", "title": "Python", "completed_count": 1}]
+
 def test_export_csv(sample_data):
     """Test CSV export"""
     response = client.get("/api/matrix/export/csv")
     assert response.status_code == 200
     assert response.headers["content-type"] == "text/csv; charset=utf-8"
 
+    lines = response.text.strip().splitlines()
+    # Columns are ordered by sort_order, then title
+    assert lines[0] == "Employee ID,Name,Role,Department,Leadership,Python"
+    assert lines[1] == "1,John Doe,Engineer,Engineering,1,2"
+    assert lines[2] == "2,Jane Smith,Manager,Product,2,0"
+
+def test_iter_matrix_csv_pivots_rows_in_chunks():
+    """Test CSV pivoting of employee-ordered rows with missing cells"""
+    from app.api.matrix import iter_matrix_csv
+
+    columns = [("c1", "Python"), ("c2", "Leadership")]
+    rows = [
+        (1, "A", "Engineer", None, "c2", 1),
+        (2, "B", "Manager", "Product", None, None),
+        (3, "C", "Designer", "Design", "c1", 2),
+        (3, "C", "Designer", "Design", "old", 2),
+    ]
+    chunks = list(iter_matrix_csv(columns, rows, chunk_size=1))
+    assert len(chunks) > 1
+
+    lines = b"".join(chunks).decode("utf-8").strip().splitlines()
+    assert lines[1:] == ["1,A,Engineer,,0,1", "2,B,Manager,Product,0,0", "3,C,Designer,Design,2,0"]
+
 def test_export_json(sample_data):
     """Test JSON export"""
     response = client.get("/api/matrix/export/json")
@@ -124,3 +167,253 @@ def test_export_json(sample_data):
     assert "employees" in data
     assert "columns" in data
     assert "scores" in data
+
+def test_matrix_etag(sample_data):
+    """Test conditional GET on the matrix payload"""
+    response = client.get("/api/matrix/")
+    etag = response.headers["etag"]
+
+    response = client.get("/api/matrix/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    # Filters are a different representation
+    response = client.get("/api/matrix/?department=Engineering", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    # Any write moves the data version
+    client.post("/api/scores/", json={"employee_id": 2, "column_id": "c1", "level": 1})
+    response = client.get("/api/matrix/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_export_etag(sample_data):
+    """Test conditional GET on analytics and exports"""
+    for path in ("/api/matrix/analytics", "/api/matrix/export/csv", "/api/matrix/export/json"):
+        etag = client.get(path).headers["etag"]
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+def test_matrix_changes(sample_data):
+    """Test delta sync since a data version"""
+    version = client.get("/api/matrix/").json()["version"]
+
+    response = client.get(f"/api/matrix/changes?since={version}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["employees"] == [] and data["scores"] == [] and data["settings"] is None
+
+    client.post("/api/scores/", json={"employee_id": 2, "column_id": "c1", "level": 1})
+    client.delete("/api/employees/1")
+    score_id = client.get("/api/scores/?employee_id=2&column_id=c2").json()[0]["id"]
+    client.delete(f"/api/scores/{score_id}")
+    client.put("/api/settings/theme", json={"theme": "dark"})
+
+    data = client.get(f"/api/matrix/changes?since={version}").json()
+    assert data["version"] > version
+    assert [(e["id"], e["is_active"]) for e in data["employees"]] == [(1, False)]
+    assert [(s["employee_id"], s["column_id"], s["level"]) for s in data["scores"]] == [(2, "c1", 1)]
+    assert data["deleted_scores"] == [{"employee_id": 2, "column_id": "c2"}]
+    assert data["settings"]["theme"] == "dark"
+
+    data = client.get(f"/api/matrix/changes?since={data['version']}").json()
+    assert data["employees"] == [] and data["scores"] == [] and data["deleted_scores"] == []
+
+def test_matrix_pages(setup_database):
+    """Test keyset pagination, search and total-score sort"""
+    names = ["Erin", "Bob", "Dana", "Alice", "Carl"]
+    ids = [client.post("/api/employees/", json={"name": name, "role": "Engineer"}).json()["id"] for name in names]
+    client.post("/api/columns/", json={"id": "c1", "title": "Python"})
+    client.post("/api/columns/", json={"id": "c2", "title": "Leadership"})
+    levels = {"Erin": (1, 0), "Bob": (2, 2), "Dana": (0, 1), "Alice": (2, 1), "Carl": (0, 0)}
+    items = [
+        {"employee_id": employee_id, "column_id": column_id, "level": level}
+        for employee_id, name in zip(ids, names)
+        for column_id, level in zip(("c1", "c2"), levels[name])
+    ]
+    client.post("/api/scores/bulk", json={"items": items})
+
+    def collect(query):
+        seen, cursor = [], None
+        while True:
+            url = f"/api/matrix/page?limit=2&{query}" + (f"&cursor={cursor}" if cursor else "")
+            data = client.get(url).json()
+            assert len(data["employees"]) <= 2
+            page_ids = {employee["id"] for employee in data["employees"]}
+            assert {score["employee_id"] for score in data["scores"]} <= page_ids
+            seen += [employee["name"] for employee in data["employees"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                return seen
+
+    assert collect("sort=name") == ["Alice", "Bob", "Carl", "Dana", "Erin"]
+    assert collect("sort=name&descending=true") == ["Erin", "Dana", "Carl", "Bob", "Alice"]
+    # Ties on total score are broken by employee id
+    assert collect("sort=total_score") == ["Carl", "Erin", "Dana", "Alice", "Bob"]
+    assert collect("sort=total_score&descending=true") == ["Bob", "Alice", "Dana", "Erin", "Carl"]
+    assert collect("sort=name&search=a") == ["Alice", "Carl", "Dana"]
+
+    response = client.get("/api/matrix/page?sort=total_score&cursor=" + client.get("/api/matrix/page?limit=1").json()["next_cursor"])
+    assert response.status_code == 400
+
+def test_get_matrix_columnar(sample_data):
+    """Test the columnar matrix representation"""
+    response = client.get("/api/matrix/?format=columnar")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.edm.matrix-columnar+json"
+
+    data = response.json()
+    assert data["employees"]["id"] == [1, 2]
+    assert data["columns"]["id"] == ["c2", "c1"]
+    # Row-major: employee 1 -> (c2=1, c1=2), employee 2 -> (c2=2, c1=0)
+    assert data["levels"] == "1220"
+
+    # Same representation through content negotiation, with a distinct ETag
+    response = client.get("/api/matrix/", headers={"Accept": "application/vnd.edm.matrix-columnar+json"})
+    assert response.json()["levels"] == "1220"
+    assert response.headers["etag"] != client.get("/api/matrix/").headers["etag"]
+
+    client.delete("/api/columns/c1")
+    client.post("/api/columns/", json={"id": "c3", "title": "Agile"})
+    data = client.get("/api/matrix/?format=columnar").json()
+    assert data["columns"]["id"] == ["c3", "c2"]
+    assert data["levels"] == ".1.2"
+
+def test_import_csv_round_trip(sample_data):
+    """Test importing an exported CSV changes nothing"""
+    exported = client.get("/api/matrix/export/csv").content
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", exported, "text/csv")})
+    assert response.status_code == 200
+
+    result = response.json()
+    assert result["rows"] == 2
+    assert result["employees_created"] == 0
+    assert result["employees_updated"] == 0
+    assert result["scores_created"] == 0
+    assert result["scores_updated"] == 0
+    assert result["scores_unchanged"] == 4
+    assert result["error_count"] == 0
+
+def test_import_csv_round_trip_sparse(sample_data):
+    """Test the 0s an export writes for unscored cells do not become scores"""
+    db = TestingSessionLocal()
+    db.add(Employee(name="Bob Wilson", role="Analyst", department="Finance"))
+    db.add(TrainingColumn(id="c3", title="Excel", category="Office", target_level=1))
+    db.commit()
+    db.add(Score(employee_id=3, column_id="c3", level=1))
+    db.commit()
+    db.close()
+    summaries = lambda: client.post("/api/scores/summaries/employees", json={"ids": [1, 2, 3]}).json()
+    before = summaries()
+
+    exported = client.get("/api/matrix/export/csv").content
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", exported, "text/csv")})
+    result = response.json()
+    assert (result["scores_created"], result["scores_updated"], result["scores_unchanged"]) == (0, 0, 9)
+
+    db = TestingSessionLocal()
+    assert db.query(Score).count() == 5
+    db.close()
+    assert summaries() == before
+
+def test_import_csv_matches_employees_by_name(sample_data):
+    """Test rows without a known id update the employee of that name instead of duplicating it"""
+    content = (
+        "Employee ID,Name,Role,Python\n"
+        ",John Doe,Staff Engineer,3\n"
+        "999,Jane Smith,Manager,2\n"
+        "998,New Hire,Analyst,1\n"
+        ",New Hire,Senior Analyst,2\n"
+    )
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")})
+    result = response.json()
+    assert (result["employees_created"], result["employees_updated"], result["error_count"]) == (1, 1, 0)
+
+    db = TestingSessionLocal()
+    assert db.query(Employee).count() == 3
+    assert db.query(Employee).filter(Employee.id == 1).one().role == "Staff Engineer"
+    assert db.query(Score).filter(Score.employee_id == 2, Score.column_id == "c1").one().level == 2
+    # Unknown ids in the file are not used; the database assigns one
+    new_hire = db.query(Employee).filter(Employee.name == "New Hire").one()
+    assert (new_hire.id, new_hire.role) == (3, "Senior Analyst")
+    assert {score.column_id: score.level for score in new_hire.scores} == {"c1": 2}
+    db.close()
+
+def test_import_csv_rejects_duplicate_names(sample_data):
+    """Test an employee cannot be renamed to another employee's name"""
+    content = (
+        "Employee ID,Name,Role\n"
+        "2,John Doe,Engineer\n"
+        "2,Jane Doe,Engineer\n"
+        "1,Jane Doe,Engineer\n"
+    )
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")})
+    result = response.json()
+    assert result["error_count"] == 2
+    assert [(error["row"], error["column"]) for error in result["errors"]] == [(2, "Name"), (4, "Name")]
+
+    db = TestingSessionLocal()
+    assert [name for (name,) in db.query(Employee.name).order_by(Employee.id)] == ["John Doe", "Jane Doe"]
+    db.close()
+
+def test_import_csv_updates_and_creates(sample_data):
+    """Test import updates levels, creates employees and keeps notes"""
+    content = (
+        "﻿Employee ID,Name,Role,Department,Python,c2,Unknown Skill\n"
+        "1,John Doe,Staff Engineer,Engineering,3,,9\n"
+        ",New Hire,Analyst,Finance,1,2\n"
+        "\n"
+    )
+    response = client.post(
+        "/api/matrix/import",
+        files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")},
+        data={"updated_by": "importer"}
+    )
+    assert response.status_code == 200
+
+    result = response.json()
+    assert result["rows"] == 2
+    assert result["employees_created"] == 1
+    assert result["employees_updated"] == 1
+    assert result["scores_created"] == 2
+    assert result["scores_updated"] == 1
+    assert result["unknown_columns"] == ["Unknown Skill"]
+
+    db = TestingSessionLocal()
+    employee = db.query(Employee).filter(Employee.id == 1).one()
+    assert employee.role == "Staff Engineer"
+    score = db.query(Score).filter(Score.employee_id == 1, Score.column_id == "c1").one()
+    assert (score.level, score.notes, score.updated_by) == (3, "Completed", "importer")
+    # Blank cells leave the existing score alone
+    assert db.query(Score).filter(Score.employee_id == 1, Score.column_id == "c2").one().level == 1
+    new_hire = db.query(Employee).filter(Employee.name == "New Hire").one()
+    assert {score.column_id: score.level for score in new_hire.scores} == {"c1": 1, "c2": 2}
+    db.close()
+
+def test_import_csv_reports_row_errors(sample_data):
+    """Test invalid rows and cells are reported without stopping the import"""
+    content = (
+        "Employee ID,Name,Role,Department,Python,Leadership\n"
+        "1,John Doe,Engineer,Engineering,7,2\n"
+        "abc,Someone,Engineer,,1,1\n"
+        ",No Role,,,1,1\n"
+        "2,Jane Smith,Manager,Product,1,2\n"
+    )
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")})
+    assert response.status_code == 200
+
+    result = response.json()
+    assert result["error_count"] == 3
+    assert [(error["row"], error["column"]) for error in result["errors"]] == [
+        (2, "Python"), (3, "Employee ID"), (4, None)
+    ]
+    # Valid cells on the same rows are still applied
+    assert result["scores_updated"] == 2
+    assert result["employees_created"] == 0
+
+def test_import_rejects_unusable_files(setup_database):
+    """Test files without a usable header are rejected"""
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", b"", "text/csv")})
+    assert response.status_code == 400
+
+    response = client.post("/api/matrix/import", files={"file": ("matrix.csv", b"Foo,Bar\n1,2\n", "text/csv")})
+    assert response.status_code == 400
@@ -0,0 +1,80 @@
+"""
+Tests for request instrumentation
+"""
+
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core import metrics
+from app.core.database import get_db, Base
+from app.core.models import Employee
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(Employee(id=1, name="John Doe", role="Engineer"))
+    db.commit()
+    db.close()
+    metrics.metrics_registry.reset()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def test_server_timing_counts_queries(setup_database):
+    """Responses report app and SQL time with the query count"""
+    response = client.get("/api/employees/1")
+    assert response.status_code == 200
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers["Server-Timing"])
+    assert match and int(match.group(1)) >= 1
+    assert response.headers["Server-Timing"].startswith("app;dur=")
+
+def test_metrics_endpoint_uses_route_templates(setup_database):
+    """Metrics are labelled by route template, not by concrete path"""
+    client.get("/api/employees/1")
+    client.get("/api/employees/2")
+
+    text = client.get("/metrics").text
+    labels = 'method="GET",route="/api/employees/{employee_id}"'
+    assert f'edm_http_requests_total{{{labels},status="200"}} 1' in text
+    assert f'edm_http_requests_total{{{labels},status="404"}} 1' in text
+    assert f'edm_http_request_duration_seconds_count{{{labels}}} 2' in text
+    assert f'edm_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    queries = re.search(rf"edm_db_queries_total{{{re.escape(labels)}}} (\d+)", text)
+    assert int(queries.group(1)) >= 2
+
+def test_query_count_threshold_logs_statements(setup_database, monkeypatch, caplog):
+    """Requests above the threshold are logged with their statements"""
+    monkeypatch.setattr(metrics, "QUERY_COUNT_LOG_THRESHOLD", 1)
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        client.get("/api/matrix/")
+    assert any("/api/matrix/" in record.getMessage() and "SELECT" in record.getMessage() for record in caplog.records)
+
+def test_failed_statements_release_their_timer(setup_database):
+    """A statement that raises does not leave its start time on the pooled connection"""
+    with engine.connect() as connection:
+        with pytest.raises(Exception):
+            connection.exec_driver_sql("SELECT * FROM missing_table")
+        assert connection.info.get("edm_query_start") == []
+        connection.exec_driver_sql("SELECT 1")
+        assert connection.info.get("edm_query_start") == []
@@ -0,0 +1,89 @@
+"""
+Tests for read-replica routing
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core import database
+from app.core.database import get_db, Base, READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER
+from app.core.models import Employee
+from app.core.similarity import skill_matrix
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+@pytest.fixture(scope="function")
+def replica(tmp_path, monkeypatch):
+    """A second SQLite file standing in for a lagging replica"""
+    Base.metadata.create_all(bind=engine)
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine)
+    db = sessionmaker(bind=replica_engine)()
+    db.add(Employee(id=1, name="Replica Only", role="Engineer"))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica_engine))
+    yield
+    Base.metadata.drop_all(bind=engine)
+    replica_engine.dispose()
+
+def test_reads_use_replica(replica):
+    """GET handlers read from the replica by default"""
+    client = TestClient(app)
+    response = client.get("/api/employees/")
+    assert [e["name"] for e in response.json()] == ["Replica Only"]
+
+def test_reads_follow_own_writes(replica):
+    """A client that just wrote reads from the primary until the window expires"""
+    client = TestClient(app)
+    response = client.post("/api/employees/", json={"name": "New Hire", "role": "Engineer"})
+    assert response.status_code == 200
+    assert READ_PRIMARY_HEADER in response.headers
+    assert READ_PRIMARY_COOKIE in client.cookies
+
+    response = client.get("/api/employees/")
+    assert [e["name"] for e in response.json()] == ["New Hire"]
+
+    # Header form, for clients without a cookie jar
+    other = TestClient(app)
+    response = other.get("/api/employees/", headers={READ_PRIMARY_HEADER: "0"})
+    assert [e["name"] for e in response.json()] == ["Replica Only"]
+    response = other.get("/api/employees/", headers={READ_PRIMARY_HEADER: "9999999999"})
+    assert [e["name"] for e in response.json()] == ["New Hire"]
+
+def test_read_only_posts_do_not_pin(replica):
+    """Searches and summary lookups sent as POST keep the client on the replica"""
+    client = TestClient(app)
+    response = client.post("/api/employees/search", json={"query": {"all": []}})
+    assert response.status_code == 200
+    assert READ_PRIMARY_HEADER not in response.headers
+    response = client.post("/api/scores/summaries/employees", json={"ids": [1]})
+    assert response.status_code == 200
+    assert READ_PRIMARY_HEADER not in response.headers
+    assert READ_PRIMARY_COOKIE not in client.cookies
+
+def test_skill_matrix_reads_primary(replica):
+    """Similarity endpoints use the primary, which the skill matrix is kept current from"""
+    skill_matrix.reset()
+    db = TestingSessionLocal()
+    db.add(Employee(id=2, name="Primary Only", role="Engineer"))
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    assert client.get("/api/employees/2/similar").status_code == 200
+    assert client.get("/api/employees/2/recommendations").status_code == 200
@@ -0,0 +1,220 @@
+"""
+Tests for completion trend rollups
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core import rollups
+from app.core.rollups import backfill_rollups, ensure_rollups_backfilled, rollup_day, trend_periods
+from app.core.models import Employee, TrainingColumn, Score, ScoreDailyRollup
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Employee(name="John Doe", role="Engineer", department="Engineering"),
+        Employee(name="Jane Smith", role="Manager", department="Product"),
+        TrainingColumn(id="c1", title="Python", category="Technical", target_level=2),
+        TrainingColumn(id="c2", title="Leadership", category="Soft Skills", target_level=1),
+    ])
+    db.commit()
+    db.close()
+
+def rollup_totals() -> dict:
+    """Net cell counts per (department, column, level), dropping days"""
+    db = TestingSessionLocal()
+    totals = {}
+    for rollup in db.query(ScoreDailyRollup):
+        key = (rollup.department, rollup.column_id, rollup.level)
+        totals[key] = totals.get(key, 0) + rollup.delta
+    db.close()
+    return {key: count for key, count in totals.items() if count}
+
+def add_rollups(*rows):
+    db = TestingSessionLocal()
+    db.add_all([
+        ScoreDailyRollup(day=day, department=department, column_id=column_id, level=level, delta=delta)
+        for day, department, column_id, level, delta in rows
+    ])
+    db.commit()
+    db.close()
+
+def test_score_writes_update_rollups(sample_data):
+    """Test creates, level changes and deletes move today's counts"""
+    score_id = client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 1}).json()["id"]
+    client.post("/api/scores/bulk", json={"items": [
+        {"employee_id": 2, "column_id": "c1", "level": 2},
+        {"employee_id": 2, "column_id": "c2", "level": 0},
+    ]})
+    client.put(f"/api/scores/{score_id}", json={"level": 2})
+    client.put(f"/api/scores/{score_id}", json={"notes": "Notes only"})
+    assert rollup_totals() == {
+        ("Engineering", "c1", 2): 1,
+        ("Product", "c1", 2): 1,
+        ("Product", "c2", 0): 1,
+    }
+
+    client.delete(f"/api/scores/{score_id}")
+    assert rollup_totals() == {("Product", "c1", 2): 1, ("Product", "c2", 0): 1}
+
+    db = TestingSessionLocal()
+    assert {rollup.day for rollup in db.query(ScoreDailyRollup)} == {rollup_day()}
+    db.close()
+
+def test_department_change_moves_cells(sample_data):
+    """Test an employee's cells follow them to a new department"""
+    client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 2})
+    client.put("/api/employees/1", json={"department": "Product"})
+    assert rollup_totals() == {("Product", "c1", 2): 1}
+
+    content = "Employee ID,Name,Role,Department,Python\n1,John Doe,Engineer,Research,1\n"
+    client.post("/api/matrix/import", files={"file": ("matrix.csv", content.encode("utf-8"), "text/csv")})
+    assert rollup_totals() == {("Research", "c1", 1): 1}
+
+def test_backfill_matches_incremental_rollups(sample_data):
+    """Test a backfill from the history reproduces the rollups kept on write"""
+    db = TestingSessionLocal()
+    # Scores that predate the event log are picked up from the score table
+    db.add(Score(employee_id=2, column_id="c2", level=1))
+    db.commit()
+    db.close()
+    score_id = client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 0}).json()["id"]
+    client.put(f"/api/scores/{score_id}", json={"level": 2})
+    client.post("/api/scores/", json={"employee_id": 2, "column_id": "c1", "level": 1})
+    incremental = rollup_totals()
+    assert incremental == {("Engineering", "c1", 2): 1, ("Product", "c1", 1): 1}
+
+    db = TestingSessionLocal()
+    assert backfill_rollups(db) > 0
+    db.commit()
+    assert ensure_rollups_backfilled(db) is None
+    db.close()
+    assert rollup_totals() == {**incremental, ("Product", "c2", 1): 1}
+
+def test_concurrent_backfill_runs_once(sample_data, monkeypatch):
+    """Test a worker that waited for the startup lock finds the other worker's backfill"""
+    db = TestingSessionLocal()
+    db.add(Score(employee_id=2, column_id="c2", level=1))
+    db.commit()
+    lock_counter = rollups.lock_counter
+
+    def lock_after_other_worker(session, name):
+        other = TestingSessionLocal()
+        assert backfill_rollups(other) == 1
+        other.commit()
+        other.close()
+        lock_counter(session, name)
+
+    monkeypatch.setattr(rollups, "lock_counter", lock_after_other_worker)
+    assert ensure_rollups_backfilled(db) is None
+    db.close()
+    assert rollup_totals() == {("Product", "c2", 1): 1}
+
+def test_trend_periods():
+    """Test periods are calendar aligned and clipped to the range"""
+    assert trend_periods(date(2024, 1, 3), date(2024, 1, 16), "week") == [
+        (date(2024, 1, 3), date(2024, 1, 7)),
+        (date(2024, 1, 8), date(2024, 1, 14)),
+        (date(2024, 1, 15), date(2024, 1, 16)),
+    ]
+    assert trend_periods(date(2024, 1, 31), date(2024, 3, 1), "month") == [
+        (date(2024, 1, 31), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 1)),
+    ]
+    with pytest.raises(ValueError):
+        trend_periods(date(2000, 1, 1), date(2024, 1, 1), "day")
+
+def test_completion_trend(sample_data):
+    """Test trend points carry the running totals at the end of each period"""
+    add_rollups(
+        (date(2023, 12, 20), "Engineering", "c1", 1, 2),
+        (date(2024, 1, 9), "Engineering", "c1", 1, -1),
+        (date(2024, 1, 9), "Engineering", "c1", 2, 1),
+        (date(2024, 1, 15), "Product", "c2", 1, 1),
+    )
+    response = client.get("/api/matrix/trends", params={"start": "2024-01-03", "end": "2024-01-16"})
+    assert response.status_code == 200
+    points = response.json()["points"]
+    assert [(point["period_start"], point["total"], point["completed"]) for point in points] == [
+        ("2024-01-03", 2, 0),
+        ("2024-01-08", 2, 1),
+        ("2024-01-15", 3, 2),
+    ]
+    assert points[2]["completion_rate"] == 66.67
+
+@pytest.mark.parametrize("params, expected", [
+    ({"group_by": "department"}, [("Engineering", 2, 1), ("Product", 1, 1)]),
+    ({"group_by": "category"}, [("Soft Skills", 1, 1), ("Technical", 2, 1)]),
+    ({"category": "Technical"}, [(None, 2, 1)]),
+    ({"department": "Product"}, [(None, 1, 1)]),
+])
+def test_completion_trend_grouping(sample_data, params, expected):
+    """Test grouped and filtered trends"""
+    add_rollups(
+        (date(2024, 1, 2), "Engineering", "c1", 1, 1),
+        (date(2024, 1, 2), "Engineering", "c1", 2, 1),
+        (date(2024, 1, 2), "Product", "c2", 1, 1),
+    )
+    response = client.get("/api/matrix/trends", params=dict(params, start="2024-01-01", end="2024-01-31", granularity="month"))
+    assert response.status_code == 200
+    assert [
+        (point["group"], point["total"], point["completed"]) for point in response.json()["points"]
+    ] == expected
+
+def test_completion_trend_follows_completion_method(sample_data):
+    """Test trend rates use the configured completion method, like analytics"""
+    client.post("/api/scores/bulk", json={"items": [
+        {"employee_id": 1, "column_id": "c1", "level": 2},
+        {"employee_id": 1, "column_id": "c2", "level": 0},
+    ]})
+    assert client.get("/api/matrix/trends").json()["points"][-1]["completion_rate"] == 50.0
+
+    client.put("/api/settings/", json={
+        "completion_method": "weighted",
+        "category_weights": {"Technical": 3, "Soft Skills": 1}
+    })
+    point = client.get("/api/matrix/trends").json()["points"][-1]
+    assert (point["completed"], point["total"], point["completion_rate"]) == (1, 2, 75.0)
+    assert client.get("/api/matrix/analytics").json()["completion_rate"] == 75.0
+    grouped = client.get("/api/matrix/trends", params={"group_by": "category"}).json()["points"]
+    assert {point["group"]: point["completion_rate"] for point in grouped} == {"Soft Skills": 0, "Technical": 100.0}
+
+def test_completion_trend_defaults_and_errors(sample_data):
+    client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 2})
+    data = client.get("/api/matrix/trends").json()
+    assert data["end"] == rollup_day().isoformat()
+    assert data["start"] == (rollup_day() - timedelta(days=90)).isoformat()
+    assert data["points"][-1]["completed"] == 1
+
+    assert client.get("/api/matrix/trends", params={"start": "2024-02-01", "end": "2024-01-01"}).status_code == 400
+    assert client.get("/api/matrix/trends", params={"start": "1900-01-01", "granularity": "day"}).status_code == 400
@@ -0,0 +1,180 @@
+"""
+Tests for score API endpoints
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.models import Employee, TrainingColumn, Score, EmployeeScoreSummary, ColumnScoreSummary
+from app.core.aggregates import rebuild_summaries
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+
+    db.add(Employee(id=1, name="John Doe", role="Engineer", department="Engineering"))
+    db.add(Employee(id=2, name="Jane Smith", role="Manager", department="Product"))
+    db.add(TrainingColumn(id="c1", title="Python", category="Technical", target_level=2))
+    db.add(TrainingColumn(id="c2", title="Leadership", category="Soft Skills", target_level=2))
+    db.commit()
+
+    db.add(Score(employee_id=1, column_id="c1", level=1, notes="In progress"))
+    db.commit()
+    rebuild_summaries(db)
+    db.commit()
+    db.close()
+
+def test_create_or_update_score(sample_data):
+    """Test upserting a single score"""
+    response = client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 2})
+    assert response.status_code == 200
+    assert response.json()["level"] == 2
+
+    response = client.get("/api/scores/?employee_id=1")
+    assert len(response.json()) == 1
+
+def test_bulk_upsert_scores(sample_data):
+    """Test bulk upsert with created, updated, duplicate and invalid items"""
+    payload = {"items": [
+        {"employee_id": 1, "column_id": "c1", "level": 2, "notes": "Done", "updated_by": "admin"},
+        {"employee_id": 1, "column_id": "c2", "level": 0},
+        {"employee_id": 2, "column_id": "c1", "level": 1},
+        {"employee_id": 2, "column_id": "c1", "level": 2},
+        {"employee_id": 99, "column_id": "c1", "level": 1},
+        {"employee_id": 2, "column_id": "missing", "level": 1},
+    ]}
+    response = client.post("/api/scores/bulk", json=payload)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 2
+    assert data["updated"] == 1
+    assert data["failed"] == 2
+    statuses = [result["status"] for result in data["results"]]
+    assert statuses == ["updated", "created", "duplicate", "created", "error", "error"]
+
+    scores = {(s["employee_id"], s["column_id"]): s for s in client.get("/api/scores/").json()}
+    assert len(scores) == 3
+    assert scores[(1, "c1")]["level"] == 2
+    assert scores[(1, "c1")]["notes"] == "Done"
+    assert scores[(2, "c1")]["level"] == 2
+
+def test_bulk_upsert_rejects_empty_batch(setup_database):
+    """Test that an empty batch is a validation error"""
+    response = client.post("/api/scores/bulk", json={"items": []})
+    assert response.status_code == 422
+
+def _summary_rows(db):
+    return (
+        [(s.employee_id, s.total_scores, s.level_0, s.level_1, s.level_2, s.completed)
+         for s in db.query(EmployeeScoreSummary).order_by(EmployeeScoreSummary.employee_id)],
+        [(s.column_id, s.total_scores, s.level_0, s.level_1, s.level_2, s.completed)
+         for s in db.query(ColumnScoreSummary).order_by(ColumnScoreSummary.column_id)],
+        [e.total_score for e in db.query(Employee).order_by(Employee.id)],
+    )
+
+def test_summaries_follow_score_writes(sample_data):
+    """Test incremental summary maintenance against a full rebuild"""
+    client.post("/api/scores/", json={"employee_id": 1, "column_id": "c1", "level": 2})
+    client.post("/api/scores/bulk", json={"items": [
+        {"employee_id": 1, "column_id": "c2", "level": 0},
+        {"employee_id": 2, "column_id": "c1", "level": 1},
+        {"employee_id": 2, "column_id": "c2", "level": 2},
+    ]})
+    score_id = client.get("/api/scores/?employee_id=2&column_id=c1").json()[0]["id"]
+    client.put(f"/api/scores/{score_id}", json={"level": 2})
+    score_id = client.get("/api/scores/?employee_id=1&column_id=c2").json()[0]["id"]
+    client.delete(f"/api/scores/{score_id}")
+
+    response = client.get("/api/scores/employee/2/summary")
+    assert response.json() == {
+        "employee_id": 2, "total_scores": 2, "completed": 2,
+        "in_progress": 0, "not_trained": 0, "completion_rate": 100.0
+    }
+    response = client.get("/api/scores/column/c2/summary")
+    assert response.json()["total_scores"] == 1
+    assert response.json()["completion_rate"] == 100.0
+
+    db = TestingSessionLocal()
+    incremental = _summary_rows(db)
+    rebuild_summaries(db)
+    db.commit()
+    assert _summary_rows(db) == incremental
+    db.close()
+
+def test_batch_employee_summaries(sample_data):
+    """Test fetching summaries for several employees at once"""
+    client.post("/api/scores/", json={"employee_id": 1, "column_id": "c2", "level": 2})
+
+    response = client.post("/api/scores/summaries/employees", json={"ids": [2, 1, 99]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["employee_id"] for s in data] == [2, 1]
+    assert data[0]["total_scores"] == 0
+    assert data[1]["total_scores"] == 2
+    assert data[1]["completed"] == 1
+
+def test_completion_follows_target_level(sample_data):
+    """Test completion against column target levels, including target changes"""
+    client.post("/api/scores/bulk", json={"items": [
+        {"employee_id": 1, "column_id": "c1", "level": 3},
+        {"employee_id": 1, "column_id": "c2", "level": 1},
+        {"employee_id": 2, "column_id": "c1", "level": 2},
+    ]})
+    assert client.get("/api/scores/employee/1/summary").json()["completed"] == 1
+
+    client.put("/api/columns/c2", json={"target_level": 1})
+    client.put("/api/columns/c1", json={"target_level": 3})
+    assert client.get("/api/scores/employee/1/summary").json()["completed"] == 2
+    assert client.get("/api/scores/employee/2/summary").json()["completed"] == 0
+    assert client.get("/api/scores/column/c1/summary").json()["completed"] == 1
+
+    db = TestingSessionLocal()
+    incremental = _summary_rows(db)
+    rebuild_summaries(db)
+    db.commit()
+    assert _summary_rows(db) == incremental
+    db.close()
+
+def test_weighted_completion_rate(sample_data):
+    """Test the weighted completion method using category weights"""
+    client.post("/api/scores/bulk", json={"items": [
+        {"employee_id": 1, "column_id": "c1", "level": 2},
+        {"employee_id": 1, "column_id": "c2", "level": 0},
+    ]})
+    assert client.get("/api/scores/employee/1/summary").json()["completion_rate"] == 50.0
+
+    client.put("/api/settings/", json={
+        "completion_method": "weighted",
+        "category_weights": {"Technical": 3, "Soft Skills": 1}
+    })
+    assert client.get("/api/scores/employee/1/summary").json()["completion_rate"] == 75.0
+    response = client.post("/api/scores/summaries/employees", json={"ids": [1]})
+    assert response.json()[0]["completion_rate"] == 75.0
+    assert client.get("/api/matrix/analytics").json()["completion_rate"] == 75.0
@@ -0,0 +1,133 @@
+"""
+Tests for full-text search over employees and score notes
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.models import Employee, TrainingColumn, Score
+from app.core.search import create_search_index, drop_search_index
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Employee(name="John Doe", role="Engineer", department="Engineering"),
+        Employee(name="Jane Smith", role="Manager", department="Product"),
+        Employee(name="Johanna Berg", role="Analyst", department="Finance"),
+        TrainingColumn(id="c1", title="Python", category="Technical", target_level=2),
+        TrainingColumn(id="c2", title="Leadership", category="Soft Skills", target_level=2),
+    ])
+    db.commit()
+    db.add_all([
+        Score(employee_id=1, column_id="c1", level=2, notes="Passed the PCAP certification"),
+        Score(employee_id=2, column_id="c2", level=1, notes="Enrolled in leadership certification"),
+        Score(employee_id=3, column_id="c1", level=1),
+    ])
+    db.commit()
+    db.close()
+
+def search(q, **params) -> dict:
+    response = client.get("/api/search/", params=dict(params, q=q))
+    assert response.status_code == 200
+    return response.json()
+
+def test_search_employees_by_prefix(sample_data):
+    """Test name, role and department words match as prefixes"""
+    data = search("joh")
+    assert data["total"] == 2
+    assert {hit["employee_name"] for hit in data["results"]} == {"John Doe", "Johanna Berg"}
+    assert all(hit["type"] == "employee" for hit in data["results"])
+
+    hit = search("engineer")["results"][0]
+    assert (hit["employee_id"], hit["department"]) == (1, "Engineering")
+    assert "[Engineer]" in hit["snippet"]
+
+    # Every word has to match
+    assert [hit["employee_id"] for hit in search("john engineering")["results"]] == [1]
+    assert search("john finance")["total"] == 0
+
+def test_search_score_notes(sample_data):
+    """Test notes hits carry the column and are ranked with employee hits"""
+    data = search("certification", type="score_note")
+    assert data["total"] == 2
+    assert {(hit["employee_id"], hit["column_title"]) for hit in data["results"]} == {(1, "Python"), (2, "Leadership")}
+    pcap = search("pcap")["results"]
+    assert [(hit["type"], hit["column_id"], hit["level"]) for hit in pcap] == [("score_note", "c1", 2)]
+    assert pcap[0]["snippet"] == "Passed the [PCAP] certification"
+
+    # Column titles are not indexed, only the notes
+    assert {hit["type"] for hit in search("leadership")["results"]} == {"score_note"}
+    ranks = [hit["rank"] for hit in search("certification")["results"]]
+    assert ranks == sorted(ranks, reverse=True)
+
+def test_search_follows_writes(sample_data):
+    """Test the triggers keep the index in step with inserts, updates and deletes"""
+    client.post("/api/employees/", json={"name": "Priya Nair", "role": "Designer", "department": "Design"})
+    assert search("priya")["total"] == 1
+    client.put("/api/employees/4", json={"role": "Researcher"})
+    assert search("designer")["total"] == 0
+    assert search("researcher")["total"] == 1
+
+    client.put("/api/scores/3", json={"notes": "AWS certification booked"})
+    client.put("/api/scores/1", json={"notes": "Retook the exam"})
+    assert {hit["employee_id"] for hit in search("certification")["results"]} == {2, 3}
+    client.delete("/api/scores/2")
+    assert [hit["employee_id"] for hit in search("certification")["results"]] == [3]
+
+    client.post("/api/scores/bulk", json={"items": [{"employee_id": 2, "column_id": "c1", "level": 2, "notes": "Python mentor"}]})
+    assert search("mentor")["results"][0]["employee_id"] == 2
+
+def test_search_excludes_inactive(sample_data):
+    client.delete("/api/employees/1")
+    assert search("john")["total"] == 0
+    assert search("pcap")["total"] == 0
+    assert search("john", include_inactive=True)["total"] == 1
+
+def test_search_pagination(sample_data):
+    first = search("certification", limit=1)
+    second = search("certification", limit=1, skip=1)
+    assert first["total"] == second["total"] == 2
+    assert first["results"][0]["employee_id"] != second["results"][0]["employee_id"]
+    assert search("certification", skip=5) == {"total": 2, "results": []}
+
+def test_search_ignores_query_syntax(sample_data):
+    """Test FTS operators and punctuation in the query are treated as plain words"""
+    assert search('john"* (')["total"] == 1
+    assert search('doe OR smith')["total"] == 0
+    assert search("!!!") == {"total": 0, "results": []}
+    assert client.get("/api/search/", params={"q": ""}).status_code == 422
+
+def test_create_search_index_indexes_existing_rows(sample_data):
+    """Test adding the index to a populated database (the migration path)"""
+    with engine.begin() as connection:
+        drop_search_index(connection)
+        create_search_index(connection)
+    assert search("pcap")["total"] == 1
+    assert search("johanna")["total"] == 1
@@ -0,0 +1,101 @@
+"""
+Tests for seeding and startup readiness
+"""
+
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import Base
+from app.core.models import Employee, Score, EmployeeScoreSummary
+from app.core import seed
+from app.core.seed import DEFAULT_SAMPLE_DATA, iter_seed_records, seed_database
+from app.core.skill_index import skill_index
+from app.core.startup import prepare_database, readiness
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.mark.parametrize("read_size", [1, 7, 4096])
+def test_iter_seed_records_streams_sections(read_size):
+    """Records are yielded in order regardless of how the file is chunked"""
+    text = json.dumps({
+        "version": 2,
+        "employees": [{"id": 1, "name": "A"}, {"id": 22, "name": "B"}],
+        "columns": [],
+        "scores": [{"employeeId": 22, "columnId": "c1", "level": 2}]
+    }, indent=2)
+    records = list(iter_seed_records(io.StringIO(text), read_size=read_size))
+    assert records == [
+        ("employees", {"id": 1, "name": "A"}),
+        ("employees", {"id": 22, "name": "B"}),
+        ("scores", {"employeeId": 22, "columnId": "c1", "level": 2}),
+    ]
+
+def test_iter_seed_records_rejects_truncated_file():
+    with pytest.raises(ValueError):
+        list(iter_seed_records(io.StringIO('{"employees": [{"id": 1}')))
+
+def test_seed_database_bulk_loads_file(setup_database, tmp_path):
+    """Seeding loads every section once and derives summaries"""
+    seed_file = tmp_path / "seed.json"
+    seed_file.write_text(json.dumps(DEFAULT_SAMPLE_DATA))
+
+    assert seed_database(TestingSessionLocal, path=str(seed_file)) is True
+    assert seed_database(TestingSessionLocal, path=str(seed_file)) is False
+
+    db = TestingSessionLocal()
+    assert db.query(Employee).count() == len(DEFAULT_SAMPLE_DATA["employees"])
+    assert db.query(Score).count() == len(DEFAULT_SAMPLE_DATA["scores"])
+    assert db.get(EmployeeScoreSummary, 1).total_scores == 3
+    db.close()
+
+def test_seed_database_loses_race(setup_database, monkeypatch):
+    """A worker whose seed inserts collide with another worker's treats the database as seeded"""
+    load_seed_records = seed.load_seed_records
+
+    def racing_load(db, records):
+        other = TestingSessionLocal()
+        other.add(Employee(id=1, name="Seeded Elsewhere", role="Engineer"))
+        other.commit()
+        other.close()
+        return load_seed_records(db, records)
+
+    monkeypatch.setattr(seed, "load_seed_records", racing_load)
+    assert seed_database(TestingSessionLocal) is False
+
+def test_ready_reports_startup_progress(setup_database):
+    """/ready is 503 until schema and seed are done, unlike /health"""
+    readiness.reset()
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").status_code == 200
+
+    prepare_database(bind=engine, session_factory=TestingSessionLocal)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "schema": True, "seed": True, "error": None}
+
+def test_warm_up_failure_keeps_worker_ready(setup_database, monkeypatch):
+    """A failed skill index build is logged; the migrated, seeded worker stays ready"""
+    readiness.reset()
+
+    def broken_refresh(db):
+        raise RuntimeError("index build failed")
+
+    monkeypatch.setattr(skill_index, "refresh", broken_refresh)
+    prepare_database(bind=engine, session_factory=TestingSessionLocal)
+    assert client.get("/ready").status_code == 200
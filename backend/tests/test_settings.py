@@ -0,0 +1,70 @@
+"""
+Tests for settings API endpoints and the settings cache
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.models import Settings
+from app.core.settings_cache import settings_cache
+from app.core.versions import SETTINGS_VERSION, bump_version
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    settings_cache.invalidate()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def test_get_settings_defaults(setup_database):
+    """Test default settings when none are stored"""
+    response = client.get("/api/settings/")
+    assert response.status_code == 200
+    assert response.json()["theme"] == "light"
+
+    response = client.get("/api/settings/levels")
+    assert [level["level"] for level in response.json()] == [0, 1, 2]
+
+def test_update_theme_invalidates_cache(setup_database):
+    """Test that writers are visible immediately through the cache"""
+    assert client.get("/api/settings/theme").json() == "light"
+
+    response = client.put("/api/settings/theme", json={"theme": "dark"})
+    assert response.status_code == 200
+
+    assert client.get("/api/settings/theme").json() == "dark"
+    assert client.get("/api/settings/").json()["theme"] == "dark"
+
+def test_cache_detects_writes_from_other_workers(setup_database):
+    """Test that a version bump made outside this process is picked up"""
+    assert client.get("/api/settings/theme").json() == "light"
+
+    # Simulate another worker: write the row and bump the version directly
+    db = TestingSessionLocal()
+    db.add(Settings(key="app_settings", value={"theme": "dark"}))
+    db.commit()
+    assert client.get("/api/settings/theme").json() == "light"
+
+    bump_version(db, SETTINGS_VERSION)
+    db.commit()
+    db.close()
+    assert client.get("/api/settings/theme").json() == "dark"
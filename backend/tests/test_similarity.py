@@ -0,0 +1,147 @@
+"""
+Tests for the skill matrix, similar employees and training recommendations
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.datagen import generate_org
+from app.core.models import Employee, TrainingColumn, Score
+from app.core.similarity import MISSING, SkillMatrix, progress, skill_matrix
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    skill_matrix.reset()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Employee(name="John Doe", role="Engineer", department="Engineering"),
+        Employee(name="Jane Smith", role="Engineer", department="Engineering"),
+        Employee(name="Bob Wilson", role="Analyst", department="Finance"),
+        Employee(name="Alice Brown", role="Engineer", department="Engineering"),
+        TrainingColumn(id="c1", title="Python", category="Technical", target_level=2),
+        TrainingColumn(id="c2", title="SQL", category="Technical", target_level=2),
+        TrainingColumn(id="c3", title="Docker", category="Technical", target_level=2),
+        TrainingColumn(id="c4", title="Excel", category="Office", target_level=2),
+    ])
+    db.commit()
+    db.add_all([
+        Score(employee_id=1, column_id="c1", level=2),
+        Score(employee_id=1, column_id="c2", level=2),
+        Score(employee_id=2, column_id="c1", level=2),
+        Score(employee_id=2, column_id="c2", level=2),
+        Score(employee_id=2, column_id="c3", level=2),
+        Score(employee_id=3, column_id="c4", level=2),
+        Score(employee_id=4, column_id="c1", level=2),
+        Score(employee_id=4, column_id="c3", level=1),
+    ])
+    db.commit()
+    db.close()
+
+def similar(employee_id, **params) -> list:
+    response = client.get(f"/api/employees/{employee_id}/similar", params=params)
+    assert response.status_code == 200
+    return [(item["employee"]["id"], item["similarity"]) for item in response.json()]
+
+def recommendations(employee_id, **params) -> list:
+    response = client.get(f"/api/employees/{employee_id}/recommendations", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+def test_progress_normalizes_against_targets():
+    levels = np.array([[MISSING, 0, 1, 3], [2, 2, 2, 2]], dtype=np.int8)
+    targets = np.array([2, 2, 0, 4])
+    active = np.array([True, True, True, False])
+    assert progress(levels, targets, active).tolist() == [[0, 0, 1, 0], [1, 1, 1, 0]]
+
+def test_similar_employees(sample_data):
+    """Test neighbours are ranked by cosine similarity, without self or unrelated profiles"""
+    data = similar(1)
+    assert [employee_id for employee_id, _ in data] == [2, 4]
+    assert data[0][1] == pytest.approx(2 / np.sqrt(6), abs=1e-4)
+    assert data[1][1] == pytest.approx(1 / np.sqrt(2.5), abs=1e-4)
+    assert [employee_id for employee_id, _ in similar(1, k=1)] == [2]
+    assert [employee_id for employee_id, _ in similar(3)] == []
+
+def test_recommendations_follow_peers(sample_data):
+    """Test gaps that similar employees have closed rank first and finished columns are skipped"""
+    data = recommendations(1)
+    assert [item["column_id"] for item in data] == ["c3"]
+    assert data[0]["title"] == "Docker"
+    assert (data[0]["current_level"], data[0]["target_level"], data[0]["gap"]) == (None, 2, 1.0)
+
+    # Both neighbours finished SQL, only one finished Docker (which is half done already)
+    data = recommendations(4)
+    assert [item["column_id"] for item in data] == ["c2", "c3"]
+    assert (data[1]["current_level"], data[1]["gap"]) == (1, 0.5)
+    assert data[0]["score"] > data[1]["score"]
+    assert [item["column_id"] for item in recommendations(4, limit=1)] == ["c2"]
+
+def test_inactive_employees_and_columns_are_ignored(sample_data):
+    client.delete("/api/employees/2")
+    assert [employee_id for employee_id, _ in similar(1)] == [4]
+    client.delete("/api/columns/c3")
+    assert recommendations(1) == []
+    assert [item["column_id"] for item in recommendations(4)] == ["c2"]
+
+def test_matrix_patched_without_rebuild(sample_data, monkeypatch):
+    """Test score, employee and column writes after the first build are applied in place"""
+    assert [employee_id for employee_id, _ in similar(3)] == []
+    builds = []
+    monkeypatch.setattr(SkillMatrix, "_build", lambda self, *args: builds.append(args))
+
+    client.post("/api/scores/", json={"employee_id": 4, "column_id": "c4", "level": 2})
+    client.post("/api/employees/", json={"name": "Priya Nair", "role": "Analyst", "department": "Finance"})
+    client.post("/api/scores/bulk", json={"items": [{"employee_id": 5, "column_id": "c4", "level": 1}]})
+    assert [employee_id for employee_id, _ in similar(3)] == [5, 4]
+
+    client.delete("/api/scores/8")
+    client.put("/api/columns/c4", json={"target_level": 4})
+    data = similar(4)
+    assert data[0][0] == 1
+    assert dict(data)[3] == pytest.approx(0.5 / np.sqrt(1.25), abs=1e-4)
+    assert builds == []
+
+def test_batched_queries_match_single(sample_data, monkeypatch):
+    """Test the batched matrix path gives each employee the same answer as one-at-a-time calls"""
+    monkeypatch.setattr("app.core.similarity.SIMILARITY_BATCH_SIZE", 8)
+    db = TestingSessionLocal()
+    generate_org(db, employees=40, columns=6, density=0.5, seed=3)
+    db.commit()
+    employee_ids = [employee_id for (employee_id,) in db.query(Employee.id).order_by(Employee.id)]
+    batched = skill_matrix.similar(db, employee_ids, k=5)
+    suggested = skill_matrix.recommend(db, employee_ids, limit=3)
+    for employee_id in employee_ids[::7]:
+        assert skill_matrix.similar(db, [employee_id], k=5) == {employee_id: batched[employee_id]}
+        assert skill_matrix.recommend(db, [employee_id], limit=3) == {employee_id: suggested[employee_id]}
+    db.close()
+
+def test_unknown_employee(setup_database):
+    assert client.get("/api/employees/999/similar").status_code == 404
+    assert client.get("/api/employees/999/recommendations").status_code == 404
@@ -0,0 +1,140 @@
+"""
+Tests for the skill index and employee skill search
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.datagen import generate_org
+from app.core.models import Employee, TrainingColumn, Score
+from app.core.schemas import SkillCondition
+from app.core.skill_index import SkillIndex, bitmap_from_ids, bitmap_ids, skill_index
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    skill_index.reset()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def sample_data(setup_database):
+    """Create sample data for testing"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Employee(name="John Doe", role="Engineer", department="Engineering"),
+        Employee(name="Jane Smith", role="Manager", department="Product"),
+        Employee(name="Bob Wilson", role="Engineer", department="Engineering"),
+        TrainingColumn(id="c1", title="Python", category="Technical", target_level=2),
+        TrainingColumn(id="c2", title="Leadership", category="Soft Skills", target_level=2),
+    ])
+    db.commit()
+    db.add_all([
+        Score(employee_id=1, column_id="c1", level=2),
+        Score(employee_id=1, column_id="c2", level=1),
+        Score(employee_id=2, column_id="c1", level=3),
+        Score(employee_id=2, column_id="c2", level=2),
+        Score(employee_id=3, column_id="c1", level=1),
+    ])
+    db.commit()
+    db.close()
+
+def search(query, **options) -> list:
+    response = client.post("/api/employees/search", json=dict(options, query=query))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] >= len(data["employees"])
+    return [employee["id"] for employee in data["employees"]]
+
+def test_bitmap_helpers():
+    bitmap = bitmap_from_ids([3, 8, 9, 100])
+    assert bitmap_ids(bitmap) == [3, 8, 9, 100]
+    assert bitmap_ids(bitmap, skip=1, limit=2) == [8, 9]
+    assert bitmap_ids(bitmap, skip=3) == [100]
+    assert bitmap_ids(0) == []
+
+def test_search_conditions(sample_data):
+    """Test min-level predicates combined with AND, OR and NOT"""
+    python_2 = {"column_id": "c1", "min_level": 2}
+    leadership_1 = {"column_id": "c2", "min_level": 1}
+    assert search({"all": [python_2, leadership_1]}) == [1, 2]
+    assert search({"all": [python_2, leadership_1]}, department="Engineering") == [1]
+    assert search({"any": [{"column_id": "c1", "max_level": 1}, {"column_id": "c2", "min_level": 2}]}) == [2, 3]
+    assert search({"not": {"column_id": "c2"}}) == [3]
+    assert search({"all": []}, role="Engineer") == [1, 3]
+    assert search({"column_id": "c1"}, skip=1, limit=1) == [2]
+
+def test_search_sees_later_writes(sample_data, monkeypatch):
+    """Test writes after the first build are folded in without a rebuild"""
+    assert search({"column_id": "c2", "min_level": 2}) == [2]
+    builds = []
+    monkeypatch.setattr(SkillIndex, "_build", lambda self, *args: builds.append(args))
+
+    client.post("/api/scores/", json={"employee_id": 3, "column_id": "c2", "level": 2})
+    client.put("/api/scores/4", json={"level": 0})
+    assert search({"column_id": "c2", "min_level": 2}) == [3]
+
+    client.delete("/api/scores/5")
+    client.put("/api/employees/1", json={"department": "Product"})
+    client.delete("/api/employees/2")
+    assert search({"column_id": "c1"}) == [1]
+    assert search({"all": []}, department="Product") == [1]
+    assert search({"all": []}, include_inactive=True) == [1, 2, 3]
+    assert builds == []
+
+def test_bulk_load_rebuilds_index(sample_data):
+    """Test scores loaded without events (a new baseline snapshot) trigger a rebuild"""
+    assert search({"all": []}) == [1, 2, 3]
+    db = TestingSessionLocal()
+    result = generate_org(db, employees=5, columns=2, density=1.0, seed=1)
+    db.commit()
+    db.close()
+    response = client.post("/api/employees/search", json={"query": {"all": []}})
+    assert response.json()["total"] == 3 + result.employees
+
+def test_index_per_database(sample_data, tmp_path, monkeypatch):
+    """Test a lagging replica gets its own copy instead of rewinding the primary's"""
+    client.put("/api/employees/1", json={"role": "Staff Engineer"})
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine)
+    primary, replica = TestingSessionLocal(), sessionmaker(bind=replica_engine)()
+    everyone = SkillCondition(all=[])
+    assert skill_index.search(primary, everyone) == (3, [1, 2, 3])
+    assert skill_index.search(replica, everyone) == (0, [])
+
+    builds = []
+    monkeypatch.setattr(SkillIndex, "_build", lambda self, *args: builds.append(args))
+    for _ in range(2):
+        assert skill_index.search(primary, everyone, role="Staff Engineer") == (1, [1])
+        assert skill_index.search(replica, everyone) == (0, [])
+    assert builds == []
+    primary.close()
+    replica.close()
+    replica_engine.dispose()
+
+def test_invalid_search(sample_data):
+    response = client.post("/api/employees/search", json={"query": {"column_id": "missing"}})
+    assert response.status_code == 400
+    assert "missing" in response.json()["detail"]
+
+    response = client.post("/api/employees/search", json={"query": {"column_id": "c1", "not": {"column_id": "c2"}}})
+    assert response.status_code == 400
@@ -1,15 +1,20 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Filter, X, Search } from 'lucide-react';
 import type { FilterOptions } from '../types';
 
 interface FilterToolbarProps {
   onFilterChange: (filters: FilterOptions) => void;
+  onSearch?: (query: string) => void;
   departments: string[];
   roles: string[];
 }
 
+// Wait this long after the last keystroke before searching
+const SEARCH_DEBOUNCE_MS = 300;
+
 const FilterToolbar: React.FC<FilterToolbarProps> = ({
   onFilterChange,
+  onSearch,
   departments,
   roles,
 }) => {
@@ -17,6 +22,13 @@ const FilterToolbar: React.FC<FilterToolbarProps> = ({
     active_only: true,
   });
   const [showFilters, setShowFilters] = useState(false);
+  const [query, setQuery] = useState('');
+
+  useEffect(() => {
+    if (!onSearch) return;
+    const timer = window.setTimeout(() => onSearch(query.trim()), SEARCH_DEBOUNCE_MS);
+    return () => window.clearTimeout(timer);
+  }, [query]);
 
   const handleFilterChange = (newFilters: Partial<FilterOptions>) => {
     const updatedFilters = { ...filters, ...newFilters };
@@ -69,7 +81,9 @@ const FilterToolbar: React.FC<FilterToolbarProps> = ({
             <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 h-4 w-4 text-gray-400" />
             <input
               type="text"
-              placeholder="Search employees..."
+              placeholder="Search employees and notes..."
+              value={query}
+              onChange={(e) => setQuery(e.target.value)}
               className="pl-10 pr-4 py-2 border border-gray-300 dark:border-gray-600 rounded-md text-sm bg-white dark:bg-gray-700 text-gray-900 dark:text-white placeholder-gray-500 dark:placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-transparent"
             />
           </div>
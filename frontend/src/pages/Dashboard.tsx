@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useMatrix } from '../contexts/MatrixContext';
 import { useAuth } from '../contexts/AuthContext';
 import MatrixGrid from '../components/MatrixGrid';
@@ -8,9 +8,13 @@ import EmployeeModal from '../components/EmployeeModal';
 import TrainingColumnModal from '../components/TrainingColumnModal';
 import ExportModal from '../components/ExportModal';
 import { Plus, Download } from 'lucide-react';
-import { matrixApi } from '../services/api';
+import { matrixApi, searchApi } from '../services/api';
 import type { AnalyticsData, FilterOptions } from '../types';
 
+// Search hits fetched per request (the API's maximum) and in total
+const SEARCH_PAGE_SIZE = 100;
+const SEARCH_MAX_RESULTS = 1000;
+
 const Dashboard: React.FC = () => {
   const { state: matrixState, loadMatrix, setFilters } = useMatrix();
   const { isAdmin, isManager } = useAuth();
@@ -18,6 +22,12 @@ const Dashboard: React.FC = () => {
   const [showEmployeeModal, setShowEmployeeModal] = useState(false);
   const [showColumnModal, setShowColumnModal] = useState(false);
   const [showExportModal, setShowExportModal] = useState(false);
+  // Employees matching the search box (null = no search)
+  const [searchIds, setSearchIds] = useState<Set<number> | null>(null);
+  // Total matches when there were more than SEARCH_MAX_RESULTS
+  const [searchTotal, setSearchTotal] = useState<number | null>(null);
+  // Bumped per search, so responses to older queries are ignored
+  const searchRequest = useRef(0);
 
   // External reload trigger (e.g., after delete/update)
   useEffect(() => {
@@ -54,6 +64,33 @@ const Dashboard: React.FC = () => {
     setFilters(filters);
   };
 
+  // Matching and ranking happen on the server; the grid only shows the hits
+  const handleSearch = async (query: string) => {
+    const request = ++searchRequest.current;
+    if (!query) {
+      setSearchIds(null);
+      setSearchTotal(null);
+      return;
+    }
+    try {
+      const ids = new Set<number>();
+      let fetched = 0;
+      let total = 0;
+      do {
+        const data = await searchApi.search(query, { type: 'employee', skip: fetched, limit: SEARCH_PAGE_SIZE });
+        if (request !== searchRequest.current) return;
+        data.results.forEach(hit => ids.add(hit.employee_id));
+        fetched += data.results.length;
+        total = data.total;
+        if (data.results.length < SEARCH_PAGE_SIZE) break;
+      } while (fetched < Math.min(total, SEARCH_MAX_RESULTS));
+      setSearchIds(ids);
+      setSearchTotal(total > fetched ? total : null);
+    } catch (error) {
+      if (request === searchRequest.current) console.error('Search failed:', error);
+    }
+  };
+
   const handleExport = async (format: 'csv' | 'json') => {
     try {
       if (format === 'csv') {
@@ -159,6 +196,7 @@ const Dashboard: React.FC = () => {
       {/* Filter Toolbar */}
       <FilterToolbar
         onFilterChange={handleFilterChange}
+        onSearch={handleSearch}
         departments={matrixState.data?.employees?.map(emp => emp.department).filter((dept): dept is string => Boolean(dept)) || []}
         roles={matrixState.data?.employees?.map(emp => emp.role) || []}
       />
@@ -169,11 +207,15 @@ const Dashboard: React.FC = () => {
         <div className="bg-white dark:bg-gray-800 rounded-xl shadow-soft border border-gray-200 dark:border-gray-700 overflow-hidden">
           <div className="px-6 py-4 border-b border-gray-200 dark:border-gray-700 bg-gradient-to-r from-gray-50 to-gray-100 dark:from-gray-700 dark:to-gray-800">
             <h3 className="text-lg font-semibold text-gray-900 dark:text-white">Training Matrix</h3>
-            <p className="text-sm text-gray-600 dark:text-gray-400">Employee progress across training modules</p>
+            <p className="text-sm text-gray-600 dark:text-gray-400">
+              {searchIds && searchTotal !== null
+                ? `Showing the first ${searchIds.size} of ${searchTotal} matching employees`
+                : 'Employee progress across training modules'}
+            </p>
           </div>
           <div className="p-6">
             <MatrixGrid
-              employees={matrixState.data?.employees || []}
+              employees={(matrixState.data?.employees || []).filter(emp => !searchIds || searchIds.has(emp.id))}
               columns={matrixState.data?.columns || []}
               scores={matrixState.data?.scores || []}
               settings={matrixState.data?.settings}
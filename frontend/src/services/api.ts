@@ -6,6 +6,8 @@ import type {
   Score,
   MatrixData,
   AnalyticsData,
+  CompletionTrend,
+  TrendOptions,
   AppSettings,
   CreateEmployeeRequest,
   UpdateEmployeeRequest,
@@ -14,7 +16,15 @@ import type {
   CreateScoreRequest,
   UpdateScoreRequest,
   FilterOptions,
-  ExportOptions
+  ExportOptions,
+  MatrixImportResult,
+  Job,
+  SkillSearchRequest,
+  SkillSearchResult,
+  SimilarEmployee,
+  TrainingRecommendation,
+  SearchOptions,
+  SearchResults
 } from '../types';
 
 // Create axios instance with base configuration
@@ -71,6 +81,21 @@ export const employeeApi = {
     return response.data;
   },
 
+  searchBySkills: async (request: SkillSearchRequest): Promise<SkillSearchResult> => {
+    const response = await api.post('/employees/search', request);
+    return response.data;
+  },
+
+  getSimilar: async (id: number, k = 10): Promise<SimilarEmployee[]> => {
+    const response = await api.get(`/employees/${id}/similar`, { params: { k } });
+    return response.data;
+  },
+
+  getRecommendations: async (id: number, limit = 5): Promise<TrainingRecommendation[]> => {
+    const response = await api.get(`/employees/${id}/recommendations`, { params: { limit } });
+    return response.data;
+  },
+
   create: async (data: CreateEmployeeRequest): Promise<Employee> => {
     const response = await api.post('/employees/', data);
     return response.data;
@@ -175,6 +200,11 @@ export const scoreApi = {
     const response = await api.get(`/scores/column/${columnId}/summary`);
     return response.data;
   },
+
+  getEmployeeSummaries: async (employeeIds: number[]) => {
+    const response = await api.post('/scores/summaries/employees', { ids: employeeIds });
+    return response.data;
+  },
 };
 
 // Matrix API
@@ -184,6 +214,7 @@ export const matrixApi = {
     if (filters?.department) params.append('department', filters.department);
     if (filters?.role) params.append('role', filters.role);
     if (filters?.active_only !== undefined) params.append('active_only', filters.active_only.toString());
+    if (filters?.as_of) params.append('as_of', filters.as_of);
     
     const response = await api.get(`/matrix/?${params.toString()}`);
     return response.data;
@@ -197,6 +228,16 @@ export const matrixApi = {
     return response.data;
   },
 
+  getTrends: async (options?: TrendOptions): Promise<CompletionTrend> => {
+    const params = new URLSearchParams();
+    Object.entries(options ?? {}).forEach(([key, value]) => {
+      if (value) params.append(key, value);
+    });
+    
+    const response = await api.get(`/matrix/trends?${params.toString()}`);
+    return response.data;
+  },
+
   exportCsv: async (options?: ExportOptions): Promise<Blob> => {
     const params = new URLSearchParams();
     if (options?.department) params.append('department', options.department);
@@ -216,6 +257,42 @@ export const matrixApi = {
     const response = await api.get(`/matrix/export/json?${params.toString()}`);
     return response.data;
   },
+
+  importMatrix: async (file: File, updatedBy?: string): Promise<MatrixImportResult> => {
+    const form = new FormData();
+    form.append('file', file);
+    if (updatedBy) form.append('updated_by', updatedBy);
+    
+    const response = await api.post('/matrix/import', form);
+    return response.data;
+  },
+};
+
+// Background jobs API
+export const jobApi = {
+  startExport: async (options: ExportOptions): Promise<Job> => {
+    const response = await api.post('/jobs/exports', options);
+    return response.data;
+  },
+
+  startImport: async (file: File, updatedBy?: string): Promise<Job> => {
+    const form = new FormData();
+    form.append('file', file);
+    if (updatedBy) form.append('updated_by', updatedBy);
+    
+    const response = await api.post('/jobs/imports', form);
+    return response.data;
+  },
+
+  getJob: async (id: string): Promise<Job> => {
+    const response = await api.get(`/jobs/${id}`);
+    return response.data;
+  },
+
+  downloadArtifact: async (id: string): Promise<Blob> => {
+    const response = await api.get(`/jobs/${id}/download`, { responseType: 'blob' });
+    return response.data;
+  },
 };
 
 // Settings API
@@ -249,4 +326,17 @@ export const settingsApi = {
   },
 };
 
+// Full-text search API
+export const searchApi = {
+  search: async (query: string, options?: SearchOptions): Promise<SearchResults> => {
+    const params = new URLSearchParams({ q: query });
+    Object.entries(options ?? {}).forEach(([key, value]) => {
+      if (value !== undefined) params.append(key, String(value));
+    });
+    
+    const response = await api.get(`/search/?${params.toString()}`);
+    return response.data;
+  },
+};
+
 export default api;
@@ -61,6 +61,7 @@ export interface AppSettings {
   theme: 'light' | 'dark';
   default_target_level: number;
   completion_method: 'average' | 'weighted';
+  category_weights?: Record<string, number>;
   show_avatars: boolean;
   compact_view: boolean;
 }
@@ -92,6 +93,99 @@ export interface AnalyticsData {
   }>;
 }
 
+export type TrendGranularity = 'day' | 'week' | 'month';
+export type TrendGroupBy = 'department' | 'category';
+
+export interface TrendPoint {
+  period_start: string; // ISO date, UTC
+  period_end: string;
+  group: string | null;
+  total: number;
+  completed: number;
+  completion_rate: number;
+}
+
+export interface CompletionTrend {
+  start: string;
+  end: string;
+  granularity: TrendGranularity;
+  group_by: TrendGroupBy | null;
+  points: TrendPoint[];
+}
+
+export interface TrendOptions {
+  start?: string;
+  end?: string;
+  granularity?: TrendGranularity;
+  group_by?: TrendGroupBy;
+  department?: string;
+  category?: string;
+}
+
+export interface SkillCondition {
+  column_id?: string;
+  min_level?: number;
+  max_level?: number;
+  all?: SkillCondition[];
+  any?: SkillCondition[];
+  not?: SkillCondition;
+}
+
+export interface SkillSearchRequest {
+  query: SkillCondition;
+  department?: string;
+  role?: string;
+  include_inactive?: boolean;
+  skip?: number;
+  limit?: number;
+}
+
+export interface SkillSearchResult {
+  total: number;
+  employees: Employee[];
+}
+
+export interface SimilarEmployee {
+  employee: Employee;
+  similarity: number;
+}
+
+export interface TrainingRecommendation {
+  column_id: string;
+  title: string;
+  category?: string;
+  current_level?: number;
+  target_level: number;
+  gap: number;
+  score: number;
+}
+
+export type SearchHitType = 'employee' | 'score_note';
+
+export interface SearchHit {
+  type: SearchHitType;
+  employee_id: number;
+  employee_name: string;
+  department?: string;
+  column_id?: string;
+  column_title?: string;
+  level?: number;
+  snippet: string; // Matched terms wrapped in [ and ]
+  rank: number;
+}
+
+export interface SearchResults {
+  total: number;
+  results: SearchHit[];
+}
+
+export interface SearchOptions {
+  type?: SearchHitType;
+  include_inactive?: boolean;
+  skip?: number;
+  limit?: number;
+}
+
 export interface User {
   id: number;
   username: string;
@@ -151,6 +245,7 @@ export interface FilterOptions {
   department?: string;
   role?: string;
   active_only?: boolean;
+  as_of?: string; // ISO 8601 timestamp for a point-in-time view
 }
 
 export interface ExportOptions {
@@ -158,3 +253,38 @@ export interface ExportOptions {
   department?: string;
   role?: string;
 }
+
+export interface MatrixImportError {
+  row: number;
+  column?: string;
+  message: string;
+}
+
+export interface MatrixImportResult {
+  rows: number;
+  employees_created: number;
+  employees_updated: number;
+  scores_created: number;
+  scores_updated: number;
+  scores_unchanged: number;
+  unknown_columns: string[];
+  error_count: number;
+  errors: MatrixImportError[];
+}
+
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface Job {
+  id: string;
+  kind: string;
+  status: JobStatus;
+  params: Record<string, any>;
+  data_version: number;
+  progress?: Record<string, any>;
+  result?: Record<string, any>;
+  error?: string;
+  created_at?: string;
+  started_at?: string;
+  finished_at?: string;
+  download_url?: string;
+}